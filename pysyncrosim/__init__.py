@@ -4,6 +4,9 @@ from pysyncrosim.project import Project
 from pysyncrosim.scenario import Scenario
 from pysyncrosim.raster import Raster
 from pysyncrosim.folder import Folder
+from pysyncrosim.batch import Batch
+from pysyncrosim.handle import RunHandle
+from pysyncrosim.scheduler import Scheduler
 from pysyncrosim.environment import runtime_data_folder
 from pysyncrosim.environment import runtime_temp_folder
 from pysyncrosim.environment import progress_bar
@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+import subprocess
+
+# Console worker host entry point. This module is not imported by the
+# pysyncrosim package, so `python -m pysyncrosim._worker_main` runs it
+# without importing it twice.
+
+class _StandInConsole(object):
+    # Local stand-in for SyncroSim.Console.exe used to exercise the worker
+    # protocol without a SyncroSim installation. Recognized arguments:
+    #   --version      prints a SyncroSim version string
+    #   --processid    prints the process ID of the worker host
+    #   --sleep=<s>    waits for <s> seconds before responding
+    #   --fail         exits with return code 1 and an error message
+    # Any other arguments are echoed back on stdout.
+
+    version = "3.1.0"
+
+    def __call__(self, args):
+        stdout = ""
+        stderr = ""
+        returncode = 0
+
+        for arg in args:
+            if arg.startswith("--sleep="):
+                time.sleep(float(arg.split("=", 1)[1]))
+
+        if "--version" in args:
+            stdout = "Version is: %s\r\n" % self.version
+        elif "--processid" in args:
+            stdout = "%d\r\n" % os.getpid()
+        elif "--fail" in args:
+            stderr = "Stand-in console failure: %s\r\n" % " ".join(args)
+            returncode = 1
+        else:
+            stdout = " ".join(args) + "\r\n"
+
+        return subprocess.CompletedProcess(args=args, returncode=returncode,
+                                           stdout=stdout.encode("utf-8"),
+                                           stderr=stderr.encode("utf-8"))
+
+def serve(console, stdin, stdout):
+    """
+    Answers console worker requests until stdin is closed. Each request is
+    one JSON line with the request "id" and console "args". Each response
+    is one JSON line with the "id", "returncode", and the number of
+    "stdout" and "stderr" bytes, followed by these bytes.
+
+    Parameters
+    ----------
+    console : Function
+        Function called with the console arguments of a request that
+        returns a subprocess.CompletedProcess with binary stdout and stderr.
+    stdin : Binary stream
+        Stream the requests are read from.
+    stdout : Binary stream
+        Stream the responses are written to.
+
+    Returns
+    -------
+    None.
+
+    """
+    for line in stdin:
+        if not line.strip():
+            continue
+
+        request = json.loads(line)
+
+        try:
+            result = console(request["args"])
+            returncode = result.returncode
+            out = result.stdout
+            err = result.stderr
+        except Exception as e:
+            returncode = 1
+            out = b""
+            err = str(e).encode("utf-8")
+
+        header = {"id": request.get("id"), "returncode": returncode,
+                  "stdout": len(out), "stderr": len(err)}
+        stdout.write((json.dumps(header) + "\n").encode("utf-8"))
+        stdout.write(out)
+        stdout.write(err)
+        stdout.flush()
+
+def main(argv=None):
+    # Only the stand-in console is hosted here; hosts that keep SyncroSim
+    # loaded call serve() with their own console function
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv != ["--standin"]:
+        raise ValueError("Usage: python -m pysyncrosim._worker_main --standin")
+
+    serve(_StandInConsole(), sys.stdin.buffer, sys.stdout.buffer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import subprocess
+import contextvars
+import pandas as pd
+
+# Batches entered in the current thread or asyncio task; console calls made
+# elsewhere on the same Session are not deferred
+_active_batches = contextvars.ContextVar("active_batches", default=())
+
+class Batch(object):
+    """
+    A class to represent a batch of SyncroSim console commands that modify a
+    Library.
+
+    """
+    # Console commands that do not return information used by pysyncrosim
+    # and can therefore be deferred until the end of the batch
+    _deferrable = [("--setprop",),
+                   ("--add", "--dependency"),
+                   ("--remove", "--dependency"),
+                   ("--move", "--scenario")]
+
+    def __init__(self, library):
+        """
+        Initializes a pysyncrosim Batch instance. Use `Library.batch()` to
+        create a Batch.
+
+        Parameters
+        ----------
+        library : Library
+            pysyncrosim Library instance.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__library = library
+        self.__commands = []
+        self.__results = None
+        self.__active = False
+        self.__token = None
+
+    def __enter__(self):
+        self.__commands = []
+        self.__results = None
+        self.__active = True
+        self.__token = _active_batches.set(_active_batches.get() + (self,))
+        self.__library.session._Session__start_batch(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__library.session._Session__end_batch(self)
+        _active_batches.reset(self.__token)
+        self.__active = False
+
+        # Discard the queued commands if the batch did not complete
+        if exc_type is not None:
+            self.__commands = []
+            return False
+
+        self.run()
+        return False
+
+    @property
+    def library(self):
+        """
+        Retrieves the Library associated with this Batch.
+
+        Returns
+        -------
+        Library
+            SyncroSim Library class instance.
+
+        """
+        return self.__library
+
+    @property
+    def commands(self):
+        """
+        Retrieves the console commands queued in this Batch.
+
+        Returns
+        -------
+        List
+            List of console argument lists.
+
+        """
+        return [list(args) for args in self.__commands]
+
+    @property
+    def results(self):
+        """
+        Retrieves the results of the queued console commands once the Batch
+        has run.
+
+        Returns
+        -------
+        pandas.DataFrame
+            DataFrame with one row per queued command, including the console
+            call that executed it (Call), its ReturnCode, Output, and Error.
+
+        """
+        return self.__results
+
+    def add(self, args):
+        """
+        Queues a console command in this Batch.
+
+        Parameters
+        ----------
+        args : List
+            Console arguments.
+
+        Returns
+        -------
+        None.
+
+        """
+        if not isinstance(args, list) or not all(
+                isinstance(arg, str) for arg in args):
+            raise TypeError("args must be a List of Strings")
+        self.__commands.append(list(args))
+
+    def run(self):
+        """
+        Runs the queued console commands. Consecutive commands that can be
+        combined are sent to the console as one call.
+
+        Raises
+        ------
+        RuntimeError
+            Raises error listing every console call that failed. All calls
+            are attempted before the error is raised.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Results of the queued console commands.
+
+        """
+        calls = self.__merge_commands(self.__commands)
+
+        rows = []
+        errors = []
+
+        for call_id, (args, queued) in enumerate(calls):
+            try:
+                result = self.__library.session._Session__call_console(args)
+                returncode = result.returncode
+                output = result.stdout.decode("utf-8")
+                error = ""
+            except RuntimeError as e:
+                returncode = 1
+                output = ""
+                error = str(e)
+                errors.append(f"{args}: {error.strip()}")
+
+            for i in queued:
+                rows.append({"Args": self.__commands[i],
+                             "Call": call_id,
+                             "ReturnCode": returncode,
+                             "Output": output,
+                             "Error": error})
+
+        self.__commands = []
+        self.__results = pd.DataFrame(
+            rows, columns=["Args", "Call", "ReturnCode", "Output", "Error"])
+
+        # Reload Library information modified by the batch; the console
+        # calls above have invalidated the cached lists
+        self.__library._Library__init_projects()
+        self.__library._Library__init_scenarios()
+
+        if len(errors) > 0:
+            raise RuntimeError(f"{len(errors)} of {len(calls)} batched "
+                               "console calls failed:\n" + "\n".join(errors))
+
+        return self.__results
+
+    def __accepts(self, args):
+        # Checks if a console command modifies this Library and can be
+        # deferred
+        if not self.__active or self not in _active_batches.get():
+            return False
+        if "--lib=%s" % self.__library.location not in args:
+            return False
+        return any(all(word in args for word in command)
+                   for command in self._deferrable)
+
+    def __defer(self, args, decode):
+        # Queues a console command and returns a successful placeholder
+        self.__commands.append(list(args))
+        if decode is True:
+            return ""
+        return subprocess.CompletedProcess(args=list(args), returncode=0,
+                                           stdout=b"", stderr=b"")
+
+    def __merge_commands(self, commands):
+        # Combines consecutive commands on the same target into one call
+        calls = []
+
+        for i, args in enumerate(commands):
+            kind = self.__command_kind(args)
+            if len(calls) > 0 and kind is not None:
+                last_args, last_queued = calls[-1]
+                if self.__command_kind(last_args) == kind and \
+                        self.__target(last_args) == self.__target(args):
+                    calls[-1] = (self.__combine(kind, last_args, args),
+                                 last_queued + [i])
+                    continue
+            calls.append((list(args), [i]))
+
+        return calls
+
+    def __command_kind(self, args):
+        if "--setprop" in args:
+            return "setprop"
+        if "--add" in args and "--dependency" in args:
+            return "dependency"
+        return None
+
+    def __target(self, args):
+        return [arg for arg in args if arg.split("=")[0] in
+                ["--lib", "--sid", "--pid", "--fid"]]
+
+    def __combine(self, kind, first, second):
+        if kind == "setprop":
+            # Later property values replace earlier ones
+            combined = list(first)
+            for arg in second:
+                key = arg.split("=")[0]
+                existing = [i for i, a in enumerate(combined)
+                            if a.split("=")[0] == key]
+                if len(existing) > 0:
+                    combined[existing[0]] = arg
+                else:
+                    combined.append(arg)
+            return combined
+
+        # Combine dependency IDs into a single --dids argument
+        dids = []
+        for args in [first, second]:
+            for arg in args:
+                if arg.startswith("--did=") or arg.startswith("--dids="):
+                    dids += arg.split("=", 1)[1].split(",")
+        combined = [arg for arg in first if not arg.startswith("--did")]
+        return combined + ["--dids=%s" % ",".join(dict.fromkeys(dids))]
@@ -0,0 +1,635 @@
+import os
+import sqlite3
+import contextlib
+import urllib.request
+import pandas as pd
+import numpy as np
+
+class LibraryDatabase(object):
+    """
+    A class to read SyncroSim Library information directly from the Library
+    file. The Library is opened in read-only mode and is never modified;
+    SQLite locking still applies, so reads see a consistent state while
+    other processes write to the Library. Methods raise a LookupError when
+    the information cannot be resolved from the file, in which case the
+    console should be used instead.
+
+    """
+    # Library tables used for Project, Scenario, and Folder listings, with
+    # the columns of the console listings, in order, and the table columns
+    # they are read from. The first column is the key.
+    _listings = {"projects": ("core_Project",
+                              [("Id", "ProjectId"), ("Name", "Name"),
+                               ("Owner", "Owner"),
+                               ("DateLastModified", "DateLastModified"),
+                               ("IsReadOnly", "IsReadOnly")]),
+                 "scenarios": ("core_Scenario",
+                               [("Id", "ScenarioId"),
+                                ("ProjectId", "ProjectId"),
+                                ("Name", "Name"), ("Owner", "Owner"),
+                                ("DateLastModified", "DateLastModified"),
+                                ("IsReadOnly", "IsReadOnly"),
+                                ("IsResult", "IsResult"),
+                                ("ParentId", "ParentId")]),
+                 "folders": ("core_Folder",
+                             [("Id", "FolderId"), ("Name", "Name"),
+                              ("ProjectId", "ProjectId"),
+                              ("Owner", "Owner"),
+                              ("LastModified", "DateLastModified"),
+                              ("IsReadOnly", "IsReadOnly")])}
+
+    # Format of the modification dates in console listings
+    _date_format = "%Y-%m-%d %H:%M:%S"
+
+    # Tables listing Scenario dependencies; Scenarios with dependencies
+    # inherit data that is not stored under their own ID
+    _dependency_tables = ["core_ScenarioDependency", "core_Dependency"]
+
+    # Columns that link Datasheet records to their scope
+    _scope_columns = {"Project": "ProjectId", "Scenario": "ScenarioId"}
+
+    # SQL expressions of the partial aggregates that can be combined across
+    # groups of rows. The sum of squared deviations (m2) is taken from the
+    # group mean in a second pass, which keeps the variance accurate.
+    _aggregates = {"count": "COUNT({col})", "sum": "SUM({col})",
+                   "mean": "AVG({col})",
+                   "m2": "SUM(({col} - {mean}) * ({col} - {mean}))",
+                   "min": "MIN({col})", "max": "MAX({col})"}
+
+    def __init__(self, location):
+        """
+        Initializes a pysyncrosim LibraryDatabase instance.
+
+        Parameters
+        ----------
+        location : String
+            Filepath to Library location on disk.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__location = location
+        self.__uri = "file:%s?mode=ro" % \
+            urllib.request.pathname2url(os.path.abspath(location))
+
+    @property
+    def location(self):
+        """
+        Retrieves the location of the Library file.
+
+        Returns
+        -------
+        String
+            Filepath to Library location on disk.
+
+        """
+        return self.__location
+
+    def projects(self):
+        """
+        Retrieves the Projects in the Library.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Project information, in the same format as the console listing.
+
+        """
+        return self.__listing("projects")
+
+    def scenarios(self, pid=None):
+        """
+        Retrieves the Scenarios in the Library.
+
+        Parameters
+        ----------
+        pid : Int, optional
+            Only return the Scenarios in this Project. The default is None.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Scenario information, in the same format as the console listing.
+
+        """
+        return self.__listing("scenarios", pid)
+
+    def folders(self):
+        """
+        Retrieves the Folders in the Library.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Folder information, in the same format as the console listing.
+
+        """
+        return self.__listing("folders")
+
+    def datasheet(self, name, columns, scope="Library", ids=(),
+                  empty=False, include_key=False, filter_column=None,
+                  filter_value=None, chunksize=None, include_scope_id=False,
+                  usecols=None, limit=None, offset=0, predicates=None):
+        """
+        Retrieves a Datasheet from the Library.
+
+        Parameters
+        ----------
+        name : String
+            Datasheet name.
+        columns : pandas.DataFrame
+            Datasheet columns, as listed by the console with
+            `--list --columns`.
+        scope : String, optional
+            Datasheet scope. Options include "Library", "Project", or
+            "Scenario". The default is "Library".
+        ids : Tuple, optional
+            Project or Scenario IDs for Project and Scenario scopes. Records
+            of all given IDs are returned. The default is ().
+        empty : Logical, optional
+            Return an empty Datasheet. The default is False.
+        include_key : Logical, optional
+            Include the primary key of the Datasheet. The default is False.
+        filter_column : String, optional
+            Column to filter the Datasheet by. The default is None.
+        filter_value : String, optional
+            Value of the filter_column to keep. The default is None.
+        chunksize : Int, optional
+            If given, returns an iterator of DataFrames with at most this 
+            many rows each. The default is None.
+        include_scope_id : Logical, optional
+            Include the ProjectId or ScenarioId column first. The default is
+            False.
+        usecols : List, optional
+            Only return these columns, in this order. The default is None.
+        limit : Int, optional
+            Only return at most this many rows. The default is None.
+        offset : Int, optional
+            Number of rows to skip. The default is 0.
+        predicates : Dictionary, optional
+            Lists or Ranges of values to keep, keyed by column. Values of
+            lookup columns may be IDs or names and Logicals may be given as
+            Yes/No. The default is None.
+
+        Raises
+        ------
+        LookupError
+            Raises error if the Datasheet cannot be resolved from the Library
+            file.
+
+        Returns
+        -------
+        pandas.DataFrame or Iterator of pandas.DataFrame
+            Datasheet, in the same format as the console export.
+
+        """
+        conn = self.__connect()
+
+        # Resolve the query before returning, so Datasheets that cannot be
+        # read from the file are reported before any chunk is read
+        try:
+            query, params, converters = self.__datasheet_query(
+                conn, name, columns, scope, ids, empty, include_key,
+                filter_column, filter_value, include_scope_id, usecols,
+                limit, offset, predicates)
+        except BaseException:
+            conn.close()
+            raise
+
+        if chunksize is None:
+            with contextlib.closing(conn):
+                ds = pd.read_sql_query(query, conn, params=params)
+            return self.__display_values(ds, converters)
+
+        return self.__iter_datasheet(conn, query, params, converters,
+                                     chunksize)
+
+    def datasheets(self, columns, scope="Library", ids=(), empty=False,
+                   include_key=False):
+        """
+        Retrieves several Datasheets from the Library in one read 
+        transaction.
+
+        Parameters
+        ----------
+        columns : Dictionary
+            Datasheet columns, as listed by the console with
+            `--list --columns`, keyed by Datasheet name.
+        scope : String, optional
+            Datasheet scope. Options include "Library", "Project", or
+            "Scenario". The default is "Library".
+        ids : Tuple, optional
+            Project or Scenario IDs for Project and Scenario scopes. The 
+            default is ().
+        empty : Logical, optional
+            Return empty Datasheets. The default is False.
+        include_key : Logical, optional
+            Include the primary key of the Datasheets. The default is False.
+
+        Returns
+        -------
+        Dictionary
+            Datasheets keyed by name, in the same format as the console 
+            export. Datasheets that cannot be resolved from the Library file
+            are left out.
+
+        """
+        datasheets = {}
+
+        with contextlib.closing(self.__connect()) as conn:
+            conn.execute("BEGIN")
+            for name, sheet_columns in columns.items():
+                try:
+                    query, params, converters = self.__datasheet_query(
+                        conn, name, sheet_columns, scope, ids, empty,
+                        include_key, None, None, False)
+                except LookupError:
+                    continue
+                ds = pd.read_sql_query(query, conn, params=params)
+                datasheets[name] = self.__display_values(ds, converters)
+            conn.rollback()
+
+        return datasheets
+
+    def aggregate(self, name, columns, scope="Library", ids=(), by=(),
+                  aggregates=None, predicates=None):
+        """
+        Aggregates the rows of a Datasheet by group in the Library file.
+
+        Parameters
+        ----------
+        name : String
+            Datasheet name.
+        columns : pandas.DataFrame
+            Datasheet columns, as listed by the console with
+            `--list --columns`.
+        scope : String, optional
+            Datasheet scope. Options include "Library", "Project", or
+            "Scenario". The default is "Library".
+        ids : Tuple, optional
+            Project or Scenario IDs for Project and Scenario scopes. The
+            default is ().
+        by : List, optional
+            Columns to group by. The default is ().
+        aggregates : Dictionary, optional
+            Tuples of an aggregate ("count", "sum", "mean", "m2", "min", or
+            "max") and a column, keyed by output column. "m2" is the sum of
+            squared deviations from the group mean. The default is None.
+        predicates : Dictionary, optional
+            Lists or Ranges of values to keep, keyed by column. The default
+            is None.
+
+        Raises
+        ------
+        LookupError
+            Raises error if the Datasheet cannot be resolved from the Library
+            file.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per group, with the group columns in the same format as
+            the console export.
+
+        """
+        aggregates = aggregates or {}
+
+        with contextlib.closing(self.__connect()) as conn:
+            table_columns = self.__table_info(conn, name)
+            missing = [col for col in list(by) + [
+                col for _, col in aggregates.values()]
+                if col not in table_columns]
+            if len(missing) > 0:
+                raise LookupError(f"columns {missing} not in table {name}")
+
+            where, params = self.__scope_filter(conn, name, table_columns,
+                                                scope, ids)
+            predicate_where, predicate_params = self.__predicate_filter(
+                conn, name, predicates, columns, table_columns)
+            where += predicate_where
+            params += predicate_params
+
+            query = self.__aggregate_query(name, by, aggregates, where)
+            ds = pd.read_sql_query(query, conn, params=params)
+            converters = self.__display_converters(conn, list(by), columns,
+                                                   table_columns)
+
+        return self.__display_values(ds, converters)
+
+    def __aggregate_query(self, name, by, aggregates, where):
+        # Groups the filtered rows; when deviations are needed, the rows
+        # are joined with the means of their group first
+        used = list(dict.fromkeys(list(by) + [
+            col for _, col in aggregates.values()]))
+        rows = "SELECT %s FROM \"%s\"" % (
+            ", ".join('"%s"' % col for col in used), name)
+        if len(where) > 0:
+            rows += " WHERE " + " AND ".join(where)
+
+        m2_cols = list(dict.fromkeys(col for kind, col in aggregates.values()
+                                     if kind == "m2"))
+        query = "WITH r AS (%s) " % rows
+        source = "r"
+        if len(m2_cols) > 0:
+            means = ", ".join('AVG("%s") AS "%s"' % (col, col)
+                              for col in m2_cols)
+            if len(by) > 0:
+                query += ", m AS (SELECT %s, %s FROM r GROUP BY %s) " % (
+                    ", ".join('"%s"' % col for col in by), means,
+                    ", ".join('"%s"' % col for col in by))
+                source = "r JOIN m ON " + " AND ".join(
+                    'r."%s" IS m."%s"' % (col, col) for col in by)
+            else:
+                query += ", m AS (SELECT %s FROM r) " % means
+                source = "r CROSS JOIN m"
+
+        group = ", ".join('r."%s"' % col for col in by)
+        select = ['r."%s" AS "%s"' % (col, col) for col in by] + [
+            '%s AS "%s"' % (self._aggregates[kind].format(
+                col='r."%s"' % col, mean='m."%s"' % col), output)
+            for output, (kind, col) in aggregates.items()]
+
+        query += "SELECT %s FROM %s" % (", ".join(select), source)
+        if len(by) > 0:
+            query += " GROUP BY %s ORDER BY %s" % (group, group)
+
+        return query
+
+    def __iter_datasheet(self, conn, query, params, converters, chunksize):
+        # Keeps the connection open until the last chunk has been read
+        with contextlib.closing(conn):
+            for chunk in pd.read_sql_query(query, conn, params=params,
+                                           chunksize=chunksize):
+                yield self.__display_values(chunk, converters)
+
+    def __datasheet_query(self, conn, name, columns, scope, ids, empty,
+                          include_key, filter_column, filter_value,
+                          include_scope_id, usecols=None, limit=None,
+                          offset=0, predicates=None):
+        table_columns = self.__table_info(conn, name)
+        key = self.__primary_key(table_columns, name)
+        where, params = self.__scope_filter(conn, name, table_columns,
+                                            scope, ids)
+
+        select = self.__select_columns(columns, table_columns, key,
+                                       include_key)
+        if include_scope_id and scope in self._scope_columns:
+            select = [self._scope_columns[scope]] + select
+        if usecols is not None:
+            missing = [col for col in usecols if col not in select]
+            if len(missing) > 0:
+                raise LookupError(f"columns {missing} not in export")
+            select = [col for col in select if col not in usecols and
+                      col in self._scope_columns.values()] + list(usecols)
+
+        if filter_column is not None:
+            if filter_column not in table_columns:
+                raise LookupError(f"{filter_column} not in table {name}")
+            where.append('"%s" = ?' % filter_column)
+            params.append(filter_value)
+
+        predicate_where, predicate_params = self.__predicate_filter(
+            conn, name, predicates, columns, table_columns)
+        where += predicate_where
+        params += predicate_params
+
+        query = "SELECT %s FROM \"%s\"" % (
+            ", ".join('"%s"' % col for col in select), name)
+        if len(where) > 0:
+            query += " WHERE " + " AND ".join(where)
+        if include_scope_id and scope in self._scope_columns:
+            query += ' ORDER BY "%s", "%s"' % (self._scope_columns[scope],
+                                               key)
+        else:
+            query += ' ORDER BY "%s"' % key
+        if empty:
+            query += " LIMIT 0"
+        elif limit is not None or offset > 0:
+            query += " LIMIT %d OFFSET %d" % (
+                -1 if limit is None else limit, offset)
+
+        converters = self.__display_converters(conn, select, columns,
+                                               table_columns)
+
+        return query, params, converters
+
+    def __connect(self):
+        # Opens the Library without locking or modifying it
+        if not os.path.isfile(self.__location):
+            raise LookupError(f"Library file {self.__location} not found")
+        return sqlite3.connect(self.__uri, uri=True)
+
+    def __tables(self, conn):
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        return [row[0] for row in rows]
+
+    def __table_info(self, conn, table):
+        # Returns the declared type and primary key flag of each column
+        rows = conn.execute('PRAGMA table_info("%s")' % table).fetchall()
+        if len(rows) == 0:
+            raise LookupError(f"table {table} not in Library")
+        return {row[1]: (row[2].upper(), row[5]) for row in rows}
+
+    def __primary_key(self, table_columns, table):
+        keys = [col for col, (_, pk) in table_columns.items() if pk > 0]
+        if len(keys) != 1:
+            raise LookupError(f"table {table} has no single primary key")
+        return keys[0]
+
+    def __listing(self, kind, pid=None):
+        table, columns = self._listings[kind]
+
+        with contextlib.closing(self.__connect()) as conn:
+            table_columns = self.__table_info(conn, table)
+            missing = [col for _, col in columns
+                       if col not in table_columns]
+            if len(missing) > 0:
+                raise LookupError(f"table {table} is missing {missing}")
+
+            query = "SELECT %s FROM \"%s\"" % (", ".join(
+                '"%s" AS "%s"' % (col, output) for output, col in columns),
+                table)
+            params = []
+            if pid is not None:
+                query += " WHERE ProjectId = ?"
+                params.append(int(pid))
+            query += " ORDER BY \"%s\"" % columns[0][1]
+
+            listing = pd.read_sql_query(query, conn, params=params)
+
+        # Match the console listing format
+        for output, col in columns:
+            if output.startswith("Is"):
+                listing[output] = self.__yes_no(listing[output])
+            elif col == "DateLastModified":
+                listing[output] = self.__format_dates(listing[output])
+
+        return listing
+
+    def __format_dates(self, values):
+        # Dates that cannot be parsed are kept as stored
+        dates = pd.to_datetime(values, errors="coerce")
+        return dates.dt.strftime(self._date_format).where(dates.notna(),
+                                                          values)
+
+    def __scope_filter(self, conn, name, table_columns, scope, ids):
+        if scope == "Library":
+            return [], []
+
+        scope_column = self._scope_columns.get(scope)
+        if scope_column not in table_columns:
+            raise LookupError(f"table {name} is not {scope} scoped")
+        if len(ids) == 0:
+            raise LookupError(f"no ID given for {scope} scope")
+
+        scope_ids = [int(scope_id) for scope_id in ids]
+
+        if scope == "Scenario":
+            for scope_id in scope_ids:
+                if self.__has_dependencies(conn, scope_id):
+                    raise LookupError(f"Scenario {scope_id} has dependencies")
+
+        return ['"%s" IN (%s)' % (scope_column,
+                                  ", ".join("?" for i in scope_ids))], \
+            scope_ids
+
+    def __has_dependencies(self, conn, sid):
+        tables = self.__tables(conn)
+        for table in self._dependency_tables:
+            if table in tables:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM \"%s\" WHERE ScenarioId = ?" % table,
+                    [sid]).fetchone()
+                return row[0] > 0
+
+        # Dependencies cannot be ruled out
+        return True
+
+    def __select_columns(self, columns, table_columns, key, include_key):
+        # Selects the exported columns in the order listed by the console
+        if "Name" not in columns.columns:
+            raise LookupError("column listing has no Name column")
+
+        select = []
+        for col in columns["Name"]:
+            if col == key or col in self._scope_columns.values():
+                continue
+            if col not in table_columns:
+                raise LookupError(f"column {col} not in Library table")
+            select.append(col)
+
+        if include_key:
+            select = [key] + select
+
+        return select
+
+    def __predicate_filter(self, conn, name, predicates, columns,
+                           table_columns):
+        where = []
+        params = []
+
+        for col, values in (predicates or {}).items():
+            if col not in table_columns:
+                raise LookupError(f"{col} not in table {name}")
+            clause, values = self.__predicate(conn, col, values, columns,
+                                              table_columns)
+            where.append(clause)
+            params += values
+
+        return where, params
+
+    def __predicate(self, conn, col, values, columns, table_columns):
+        # Compiles the values to keep into a condition on the stored values
+        if len(values) == 0:
+            return "0", []
+        if isinstance(values, range):
+            return '"%s" BETWEEN ? AND ?' % col, [values[0], values[-1]]
+
+        lookup = self.__lookup_table(columns, col, self.__tables(conn))
+        boolean = lookup is None and self.__is_boolean(
+            self.__column_data_types(columns), col, table_columns)
+        stored = []
+        names = []
+
+        for value in values:
+            if boolean and isinstance(value, str):
+                stored.append(int(value == "Yes"))
+            elif lookup is not None and isinstance(value, str):
+                names.append(value)
+            else:
+                stored.append(value)
+
+        clauses = []
+        if len(stored) > 0:
+            clauses.append('"%s" IN (%s)' % (
+                col, ", ".join("?" for value in stored)))
+        if len(names) > 0:
+            lookup_columns = self.__table_info(conn, lookup)
+            lookup_key = self.__primary_key(lookup_columns, lookup)
+            clauses.append('"%s" IN (SELECT "%s" FROM "%s" WHERE Name IN '
+                           '(%s))' % (col, lookup_key, lookup,
+                                      ", ".join("?" for value in names)))
+
+        return "(%s)" % " OR ".join(clauses), stored + names
+
+    def __is_boolean(self, data_types, col, table_columns):
+        return data_types.get(col) == "BOOLEAN" or \
+            "BOOL" in table_columns[col][0] or \
+            table_columns[col][0] == "BIT"
+
+    def __display_converters(self, conn, select, columns, table_columns):
+        # Finds the functions that replace lookup IDs with names and logical
+        # values with Yes/No, as in the console export
+        tables = self.__tables(conn)
+        data_types = self.__column_data_types(columns)
+        converters = {}
+
+        for col in select:
+
+            lookup = self.__lookup_table(columns, col, tables)
+
+            if lookup is not None:
+                lookup_columns = self.__table_info(conn, lookup)
+                lookup_key = self.__primary_key(lookup_columns, lookup)
+                if "Name" not in lookup_columns:
+                    raise LookupError(f"lookup table {lookup} has no Name")
+                names = dict(conn.execute(
+                    'SELECT "%s", Name FROM "%s"' % (lookup_key, lookup)
+                    ).fetchall())
+                converters[col] = lambda values, names=names: \
+                    values.map(names)
+
+            elif self.__is_boolean(data_types, col, table_columns):
+                converters[col] = self.__yes_no
+
+        return converters
+
+    def __display_values(self, ds, converters):
+        for col, converter in converters.items():
+            ds[col] = converter(ds[col])
+        return ds
+
+    def __column_data_types(self, columns):
+        type_columns = [col for col in columns.columns
+                        if col.replace(" ", "").lower() == "datatype"]
+        if len(type_columns) == 0:
+            return {}
+        return dict(zip(columns["Name"],
+                        columns[type_columns[0]].astype(str).str.upper()))
+
+    def __lookup_table(self, columns, col, tables):
+        if "Formula1" not in columns.columns:
+            return None
+        formula = columns.loc[columns["Name"] == col, "Formula1"]
+        if len(formula) == 0 or not isinstance(formula.values[0], str):
+            return None
+        if formula.values[0] in tables:
+            return formula.values[0]
+        return None
+
+    def __yes_no(self, values):
+        return values.map(lambda x: np.nan if pd.isna(x)
+                          else ("Yes" if int(x) != 0 else "No"))
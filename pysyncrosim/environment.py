@@ -100,7 +100,7 @@ def progress_bar(report_type="step", iteration=None, timestep=None,
             assert timestep % 1 == 0
             print(
                 f"ssim-task-status=Simulating -> Iteration is {iteration}" +
-                " - Timestep is {timestep}\r\n",
+                f" - Timestep is {timestep}\r\n",
                 flush=True)
         except AssertionError or TypeError:
             raise TypeError("iteration and timestep must be Integers")
@@ -187,10 +187,17 @@ class Folder(object):
             self.__library = ssimobject.library
 
     def __get_folder_data(self):
+        data = self.__library._Library__cached("folders",
+                                               self.__load_folder_data)
+        return data.copy()
+
+    def __load_folder_data(self):
+        data = self.__library._Library__read_database("folders")
+        if data is not None:
+            return data
         args = ["--lib=%s" % self.__library.location, "--list", "--folders"]
-        data = self.__library.session._Session__call_console(args, decode=True, csv=True)
-        data =  pd.read_csv(io.StringIO(data))
-        return data
+        result = self.__library.session._Session__call_console(args, csv=True)
+        return self.__library._Library__read_console_csv(result.stdout)
     
     def __get_parent_folder_id(self):
 
@@ -0,0 +1,142 @@
+import threading
+import concurrent.futures
+
+class RunHandle(object):
+    """
+    A class to represent a Scenario run in the background. Use
+    `Scenario.run_async()` to create a RunHandle.
+
+    """
+    def __init__(self, scenario, copy_external_inputs=False, timeout=None,
+                 on_event=None):
+        """
+        Initializes a pysyncrosim RunHandle instance and starts the run.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            pysyncrosim Scenario instance to run.
+        copy_external_inputs : Logical, optional
+            If False, then a copy of external input files is not created for
+            each job. The default is False.
+        timeout : Float, optional
+            Number of seconds after which the run is stopped. The default is
+            None.
+        on_event : Function, optional
+            Function called with the progress events of the run. The default
+            is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__scenario = scenario
+        self.__cancel = threading.Event()
+        self.__future = concurrent.futures.Future()
+        self.__thread = threading.Thread(
+            target=self.__run, args=(copy_external_inputs, timeout, on_event),
+            daemon=True)
+        self.__thread.start()
+
+    @property
+    def scenario(self):
+        """
+        Retrieves the Scenario being run.
+
+        Returns
+        -------
+        Scenario
+            SyncroSim Scenario class instance.
+
+        """
+        return self.__scenario
+
+    def cancel(self, wait=True):
+        """
+        Stops the run. The console and all processes it started are stopped
+        and the incomplete Results Scenario is deleted.
+
+        Parameters
+        ----------
+        wait : Logical, optional
+            If True, waits until the run has been stopped. The default is
+            True.
+
+        Returns
+        -------
+        Logical
+            False if the run had already ended. If wait is True, whether the
+            run was stopped, as it may end before the console is stopped. 
+            Otherwise True.
+
+        """
+        if self.__future.done():
+            return False
+
+        self.__cancel.set()
+        if wait:
+            self.__thread.join()
+            return self.cancelled()
+
+        return True
+
+    def cancelled(self):
+        """
+        Retrieves whether the run was stopped by `cancel()`.
+
+        Returns
+        -------
+        Logical
+
+        """
+        return self.__future.done() and isinstance(
+            self.__future.exception(), concurrent.futures.CancelledError)
+
+    def done(self):
+        """
+        Retrieves whether the run has ended.
+
+        Returns
+        -------
+        Logical
+
+        """
+        return self.__future.done()
+
+    def result(self, timeout=None):
+        """
+        Waits for the run to end and returns its Results Scenario.
+
+        Parameters
+        ----------
+        timeout : Float, optional
+            Number of seconds to wait. The run continues if the wait times
+            out. The default is None, which waits until the run ends.
+
+        Raises
+        ------
+        concurrent.futures.CancelledError
+            Raises error if the run was cancelled.
+        TimeoutError
+            Raises error if the run or the wait timed out.
+        RuntimeError
+            Raises error if the run failed.
+
+        Returns
+        -------
+        Scenario
+            Results Scenario.
+
+        """
+        return self.__future.result(timeout)
+
+    def __run(self, copy_external_inputs, timeout, on_event):
+        scn = self.__scenario
+        try:
+            result_scn = scn.library._Library__run_scenario(
+                scn, copy_external_inputs, on_event, timeout, self.__cancel)
+        except BaseException as e:
+            self.__future.set_exception(e)
+        else:
+            self.__future.set_result(result_scn)
@@ -5,7 +5,7 @@ import io
 
 def library(name, session=None, packages=None,
             force_update=False, overwrite=False, use_conda=None,
-            use_ssim_env=True):
+            use_ssim_env=True, use_sqlite=False, check_modified=True):
     """
     Creates a new SyncroSim Library and opens it as a Library
     class instance.
@@ -34,6 +34,12 @@ def library(name, session=None, packages=None,
     use_ssim_env : Logical, optional
         If True (Default), will use the currently running SyncroSim environment if
         available. If False, will not use the currently running SyncroSim environment.
+    use_sqlite : Logical, optional
+        If True, reads Datasheets and Project, Scenario, and Folder listings
+        directly from the Library file where possible. The default is False.
+    check_modified : Logical, optional
+        If True, checks the Library file for changes made by other processes
+        before using cached Library information. The default is True.
 
     Returns
     -------
@@ -42,7 +48,8 @@ def library(name, session=None, packages=None,
 
     """
     _validate_library_inputs(name, session, packages, force_update, 
-                             overwrite, use_conda, use_ssim_env)
+                             overwrite, use_conda, use_ssim_env, use_sqlite,
+                             check_modified)
 
     if session is None:
         session = ps.Session()
@@ -51,7 +58,8 @@ def library(name, session=None, packages=None,
 
     if os.path.exists(loc) and overwrite is False and packages is None:
         _check_library_update(session, loc, force_update)
-        return ps.Library(location=loc, session=session, use_ssim_env=use_ssim_env)
+        return ps.Library(location=loc, session=session, use_ssim_env=use_ssim_env,
+                          use_sqlite=use_sqlite, check_modified=check_modified)
     
     args = ["--create", "--library", "--name=%s" % loc]
     
@@ -80,10 +88,12 @@ def library(name, session=None, packages=None,
     _check_library_update(session, loc, force_update)
         
     return ps.Library(location=loc, session=session, use_conda=use_conda, 
-                      packages=packages, use_ssim_env=use_ssim_env)
+                      packages=packages, use_ssim_env=use_ssim_env,
+                      use_sqlite=use_sqlite, check_modified=check_modified)
 
 def _validate_library_inputs(name, session, packages, force_update, 
-                             overwrite, use_conda, use_ssim_env):
+                             overwrite, use_conda, use_ssim_env, use_sqlite,
+                             check_modified):
     """
     Validates input types for the create_library function
     """
@@ -106,6 +116,10 @@ def _validate_library_inputs(name, session, packages, force_update,
         raise TypeError("use_conda must be None or a Logical")
     if use_ssim_env is not None and not isinstance(use_ssim_env, bool):
         raise TypeError("use_ssim_env must be None or a Logical")
+    if not isinstance(use_sqlite, bool):
+        raise TypeError("use_sqlite must be a Logical")
+    if not isinstance(check_modified, bool):
+        raise TypeError("check_modified must be a Logical")
 
     # Check if packages currently installed
     if packages is not None:
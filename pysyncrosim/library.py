@@ -5,10 +5,19 @@ import numpy as np
 import shutil
 import os
 import io
+import asyncio
+import threading
+import concurrent.futures
+import contextlib
+import importlib.util
 import tempfile
+import sqlite3
+import urllib.request
+import weakref
 import pysyncrosim as ps
 from pysyncrosim import helper
 from pysyncrosim.environment import _environment
+from pysyncrosim.database import LibraryDatabase
 
 pd.set_option("display.max_columns", 50)
 
@@ -22,7 +31,7 @@ class Library(object):
     __datasheets = None
     
     def __init__(self, location=None, session=None, use_conda=None, packages=None,
-                 use_ssim_env=True):
+                 use_ssim_env=True, use_sqlite=False, check_modified=True):
         """
         Initializes a pysyncrosim Library instance.
 
@@ -43,6 +52,17 @@ class Library(object):
             If set to False, will not use the currently running SyncroSim environment.
             If set to True (Default), will use the currently running SyncroSim environment if 
             available.
+        use_sqlite : Logical, optional
+            If True, reads Datasheets and Project, Scenario, and Folder 
+            listings directly from the Library file in read-only mode, and 
+            uses the console only for information that cannot be read from 
+            the file. The default is False.
+        check_modified : Logical, optional
+            If True, checks the modification time and size of the Library 
+            file before using cached Library information, so changes made by
+            other processes are picked up. Changes made through pysyncrosim 
+            in this process are always picked up. If False, call `refresh()`
+            after other processes modify the Library. The default is True.
 
         Returns
         -------
@@ -70,6 +90,23 @@ class Library(object):
         if self.__session is None:
             self.__session = ps.Session()
 
+        self.use_sqlite = use_sqlite
+        self.check_modified = check_modified
+        self.__database = LibraryDatabase(self.__location)
+        self.__cache = {}
+        self.__lock = threading.RLock()
+        self.__csv_engine = "c"
+        self.__where_chunksize = 100000
+        self.__metric_partials = {"sum": ["sum"], "mean": ["mean"],
+                                  "var": ["mean", "m2"],
+                                  "std": ["mean", "m2"], "min": ["min"],
+                                  "max": ["max"]}
+        self.__stream_imports = False
+        self.__import_writers = {}
+        self.__import_errors = {}
+        self.__active_runs = {}
+        self.__claimed_results = set()
+
         if self.__use_conda is not None:
             self.__init_conda()
 
@@ -135,6 +172,97 @@ class Library(object):
         """
         return self.__location
     
+    @property
+    def use_sqlite(self):
+        """
+        Gets or sets whether information is read directly from the Library 
+        file.
+
+        Returns
+        -------
+        Logical
+            use_sqlite status.
+
+        """
+        return self.__use_sqlite
+
+    @use_sqlite.setter
+    def use_sqlite(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("use_sqlite must be a Logical")
+        self.__use_sqlite = value
+
+    @property
+    def check_modified(self):
+        """
+        Gets or sets whether the Library file is checked for changes before 
+        cached Library information is used.
+
+        Returns
+        -------
+        Logical
+            check_modified status.
+
+        """
+        return self.__check_modified
+
+    @check_modified.setter
+    def check_modified(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("check_modified must be a Logical")
+        self.__check_modified = value
+
+    @property
+    def csv_engine(self):
+        """
+        Gets or sets the parser used for Datasheets and listings returned by 
+        the console. Options are "c" (default) and "pyarrow". The pyarrow 
+        parser is faster for large Datasheets and requires the optional 
+        pyarrow package; it may infer different column types, e.g. for 
+        dates. Chunked reads always use the "c" parser.
+
+        Returns
+        -------
+        String
+            Name of the parser.
+
+        """
+        return self.__csv_engine
+
+    @csv_engine.setter
+    def csv_engine(self, value):
+        if value not in ["c", "pyarrow"]:
+            raise ValueError("csv_engine must be 'c' or 'pyarrow'")
+        if value == "pyarrow" and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("csv_engine 'pyarrow' requires the pyarrow "
+                              "package")
+        self.__csv_engine = value
+
+    @property
+    def stream_imports(self):
+        """
+        Gets or sets whether Datasheets saved to this Library are streamed 
+        to the console through a named pipe instead of being written to a 
+        temporary CSV file first. Requires named pipes, which are not 
+        available on Windows. The default is False.
+
+        Returns
+        -------
+        Logical
+            Whether saved Datasheets are streamed to the console.
+
+        """
+        return self.__stream_imports
+
+    @stream_imports.setter
+    def stream_imports(self, value):
+        if not isinstance(value, bool):
+            raise TypeError("stream_imports must be a Logical")
+        if value is True and not hasattr(os, "mkfifo"):
+            raise RuntimeError("stream_imports requires named pipes, which "
+                               "are not available on this platform")
+        self.__stream_imports = value
+
     @property
     def environment(self):
         """
@@ -178,8 +306,11 @@ class Library(object):
 
         """
         args = ["--list", "--packages", "--lib=%s" % self.location, "--csv"]
-        pkgs = self.session._Session__call_console(args, decode=True, csv=True)
-        pkgs =  pd.read_csv(io.StringIO(pkgs))
+        pkgs = self.__cached(
+            "packages",
+            lambda: self.session._Session__call_console(args, csv=True),
+            schema=True)
+        pkgs = self.__read_console_csv(pkgs.stdout)
         return pkgs
     
     @property
@@ -400,8 +531,7 @@ class Library(object):
         if overwrite is True:
             self.delete(project=name)
         
-        if self.__projects is None:
-            self.__init_projects()
+        self.__init_projects()
           
         p = self.__get_project(name=name, pid=pid)
         
@@ -527,7 +657,9 @@ class Library(object):
         
     def datasheets(self, name=None, summary=True, optional=False, empty=False,
                    scope="Library", filter_column=None, filter_value=None,
-                   include_key=False, show_full_paths=False, return_hidden=False, *ids):
+                   include_key=False, show_full_paths=False, return_hidden=False, *ids,
+                   chunksize=None, sids=None, as_dict=False, max_workers=None,
+                   columns=None, limit=None, offset=0, where=None):
         """
         Retrieves a DataFrame of Library Datasheets.
 
@@ -559,6 +691,44 @@ class Library(object):
         return_hidden : Logical, optional
             If set to True, returns all records in a Datasheet, including those
             hidden from the user. Results in a slower query. Default is False. 
+        chunksize : Int, optional
+            If given, returns an iterator that yields the Datasheet as 
+            DataFrames of at most this many rows, parsed while the Datasheet 
+            is read, so large Datasheets never have to fit in memory at once. 
+            Requires a Datasheet name. The default is None.
+        sids : List of Ints, optional
+            Scenario IDs. If given, returns the Scenario Datasheet `name` for
+            all of these Scenarios in one DataFrame, with a ScenarioId column 
+            identifying the Scenario of each row. The Datasheet is read in 
+            one export where possible. The default is None.
+        as_dict : Logical, optional
+            If `summary=False`, returns a dictionary of Datasheet DataFrames 
+            keyed by Datasheet name instead of a list. The default is False.
+        max_workers : Int, optional
+            If `summary=False`, the number of Datasheets exported from the 
+            console at the same time. Datasheets read from the Library file 
+            when `use_sqlite=True` are all read at once. The default is None,
+            which exports one Datasheet at a time.
+        columns : List of Strings, optional
+            Only return these columns of the Datasheet `name`, in this order.
+            The default is None, which returns all columns.
+        limit : Int, optional
+            Only return at most this many rows of the Datasheet `name`. The 
+            console is stopped once these rows have been read. The default 
+            is None, which returns all rows.
+        offset : Int, optional
+            Number of rows of the Datasheet `name` to skip before returning 
+            rows. The default is 0.
+        where : Dictionary, optional
+            Only return the rows of the Datasheet `name` that match all of 
+            these filters, keyed by column name. Each value is a String, 
+            number, or Logical to match, or a List or Range of values to 
+            match any of (e.g. `{"Iteration": range(1, 11), "Timestep": 
+            [10, 20], "StratumId": "Forest"}`). Values of lookup columns 
+            may be given by name. With `use_sqlite=True` the filters are 
+            part of the query. Otherwise one Integer filter is passed to the
+            console and the other rows are dropped as the export is parsed.
+            The default is None.
 
         Returns
         -------
@@ -566,18 +736,28 @@ class Library(object):
             If `optional=False`, then returns a DataFrame of Datasheet 
             information including Package, Name, and Display Name.
             If `optional=True`, also returns Scope, Is Single, and Is Output.
+            If `chunksize` is given, returns an iterator of DataFrames.
+            If `summary=False`, returns a list of DataFrames, or a dictionary
+            if `as_dict=True`.
 
         """
         
         self.__validate_datasheets_inputs(name, summary, optional, empty,
                                           filter_column, include_key,
-                                          return_hidden)
+                                          return_hidden, chunksize, sids,
+                                          as_dict, max_workers, columns,
+                                          limit, offset, where)
+        
+        where = self.__normalize_where(where)
         
-        # TODO: Instead of setting to None here, make sure datasheets are 
-        # refreshed when updates are made - saves computational time
-        self.__datasheets = None        
         # TODO: Check if datasheet exists in desired scope
         
+        if sids is not None:
+            
+            sids = [int(sid) for sid in sids]
+            scope = "Scenario"
+            ids = ()
+        
         args = self.__initialize_export_args(scope, ids, empty, include_key, show_full_paths)
         
         if name is None:
@@ -592,7 +772,7 @@ class Library(object):
             if summary is False:
                 
                 ds_list = self.__return_list_of_full_datasheets(
-                    scope, args, return_hidden, ids)
+                    scope, args, return_hidden, ids, as_dict, max_workers)
                     
                 return ds_list
         
@@ -604,14 +784,47 @@ class Library(object):
             if filter_column is not None:
             
                 filter_column, filter_value = self.__find_filter_column_args(
-                    filter_column, filter_value, name, scope, ids)
+                    filter_column, filter_value, name, scope,
+                    ids if sids is None else (sids[0],))
                 
                 args += ["--filtercol=%s" % filter_column + "=" + filter_value]
+                
+            if where is not None:
+                
+                # The console can filter by one ID or number, unless 
+                # filter_column already takes the console filter
+                pushed = None
+                if filter_column is None:
+                    where, pushed = self.__split_where(where)
+                
+                if pushed is not None:
+                    
+                    filter_column, filter_value = \
+                        self.__find_filter_column_args(
+                            *pushed, name, scope,
+                            ids if sids is None else (sids[0],))
+                    
+                    args += ["--filtercol=%s" % filter_column + "=" +
+                             filter_value]
+                
+                where = self.__where_lookup_names(
+                    name, where, scope, ids if sids is None else (sids[0],))
+                    
+            rows = (columns, limit, offset, where)
+                
+            if sids is not None:
+                
+                ds = self.__query_datasheet_for_scenarios(name, sids, args,
+                                                          return_hidden,
+                                                          where)
+                ds = self.__select_rows(ds, *rows[:3])
                         
-            if return_hidden:
-                ds = self.__slow_query_datasheet(name, scope, ids)               
+            elif return_hidden:
+                ds = self.__slow_query_datasheet(name, scope, ids,
+                                                 chunksize, rows)
             else:
-                ds = self.__fast_query_datasheet(name, scope, args)            
+                ds = self.__fast_query_datasheet(name, scope, args,
+                                                 chunksize, rows)
             
             return ds
         
@@ -765,7 +978,7 @@ class Library(object):
                                   force=force)
     
     def save_datasheet(self, name, data, append=False, force=False, 
-                       scope="Library", *ids):
+                       scope="Library", *ids, key_columns=None):
         """
         Saves a pandas DataFrane as a SyncroSim Datasheet.
 
@@ -790,46 +1003,45 @@ class Library(object):
         *ids : Int
             If Project- or Scenario-scoped, requires the Project or Scenario
             IDs.
+        key_columns : List of Strings, optional
+            Columns that identify each row. If given, the DataFrame is 
+            compared with the stored Datasheet by these columns and only 
+            saved if rows were inserted, updated, or deleted. If rows were 
+            only inserted, just these rows are appended; otherwise the 
+            Datasheet is rewritten. If rows were deleted, the other stored 
+            rows are not compared and are all counted as updated. Cannot be
+            combined with `append=True`. The default is None.
+
+        Raises
+        ------
+        RuntimeError
+            Raises error if `stream_imports` is True and writing the data to
+            the console fails, in which case the Datasheet may only hold 
+            part of the data.
 
         Returns
         -------
-        None.
+        None or Dictionary
+            If `key_columns` is given, returns the number of "inserted", 
+            "updated", and "deleted" rows.
 
         """
-        # Type checks
-        if not isinstance(name, str):
-            raise TypeError("name must be a String")
-        if not isinstance(data, pd.DataFrame):
-            raise TypeError("data must be a pandas DataFrame")
-        if not isinstance(append, bool):
-            raise TypeError("append must be a Logical")
-        if not isinstance(force, bool):
-            raise TypeError("force must be a Logical")
-        if not isinstance(scope, str):
-            raise TypeError("scope must be a String")
+        self.__validate_save_datasheet_inputs(name, data, append, force,
+                                              scope, key_columns)
           
         # Check if datasheet name is valid
         self.__check_datasheet_name(name)
 
         # Convert boolean values to "Yes"/"No"
-        for col in data:
-            if data[col].dtype == bool:
-                data[col] = data[col].map({True: "Yes", False: "No"})
+        self.__convert_logical_columns(data)
+        
+        if key_columns is not None and self.__environment is False:
+            return self.__save_datasheet_changes(name, data, force, scope,
+                                                 ids, key_columns)
             
         # Check if running in a SyncroSim environment from the user interface
         if self.__environment is True:
-            e = _environment()
-            transfer_dir = e.transfer_directory.item()
-            
-            # If running from user interface, save data to transfer directory
-            if (transfer_dir is not None) & (append is False):
-                fpath = os.path.join(transfer_dir, 'SSIM_OVERWRITE-{}.csv'.format(name))
-                data.to_csv(fpath, index=False)
-                return
-            elif (transfer_dir is not None) & (append is True):
-                fpath = os.path.join(transfer_dir, 'SSIM_APPEND-{}.csv'.format(name))
-                data.to_csv(fpath, index=False)
-                return
+            self.__save_datasheet_to_transfer(name, data, append)
         
         # Otherwise export the data to SyncroSim
         else:
@@ -849,30 +1061,105 @@ class Library(object):
 
                 fpath = self.__save_datasheet_to_temp(data)
 
-                args = ["--import", "--lib=%s" % self.location,
-                        "--sheet=%s" % name, 
-                        "--file=%s" % fpath]
-
-                if append:
-                    args += ["--append"]
-                if scope == "Project":
-                    args += ["--pid=%d" % ids]
-                if scope == "Scenario":
-                    args += ["--sid=%d" % ids]
+                args = self.__build_import_args(name, fpath, append, scope,
+                                                ids)
 
                 result = self.__session._Session__call_console(args)
+                self.__check_datasheet_pipe(name, fpath)
                 
                 if result.returncode == 0:
                     print(f"{name} saved successfully")
 
             finally:
                 if fpath is not None:
-                    shutil.rmtree(os.path.dirname(fpath), ignore_errors=True)
+                    self.__remove_datasheet_temp(fpath)
+                    
+    def save_datasheets(self, data, append=False, force=False,
+                        scope="Library", *ids):
+        """
+        Saves several pandas DataFrames as SyncroSim Datasheets. Either all
+        Datasheets are saved, or none are: if saving a Datasheet fails, the
+        Datasheets already saved are restored to their previous values 
+        before the error is raised.
+
+        Parameters
+        ----------
+        data : Dictionary
+            DataFrames of Datasheet values, keyed by Datasheet name. 
+            Datasheets are saved in the order of the dictionary.
+        append : Logical, optional
+            If set to True, appends the DataFrames to the existing 
+            Datasheets. Default is False.
+        force : Logical, optional
+            If set to True while append is False, overwrites the existing
+            Datasheets. Default is False.
+        scope : String, optional
+            Scope of the Datasheets. The default is "Library".
+        *ids : Int
+            If Project- or Scenario-scoped, requires the Project or Scenario
+            IDs.
+
+        Raises
+        ------
+        ValueError
+            Raises error before saving anything if a Project or Library 
+            Datasheet would be overwritten or deleted while `force=False`.
+
+        Returns
+        -------
+        None.
+
+        """
+        if not isinstance(data, dict):
+            raise TypeError("data must be a Dictionary of pandas DataFrames")
+        for name, ds in data.items():
+            self.__validate_save_datasheet_inputs(name, ds, append, force,
+                                                  scope)
+            self.__check_datasheet_name(name)
+            if self.__validate_delete_datasheet(
+                    force, append, scope, ds) == "warn":
+                raise ValueError(
+                    "force must be True to overwrite or delete an existing "
+                    "Project or Library Datasheet")
+            
+        # Datasheets saved from the user interface are transferred on exit
+        if self.__environment is True:
+            for name, ds in data.items():
+                self.save_datasheet(name, ds, append, force, scope, *ids)
+            return
+        
+        # Keep the current values to restore them if a save fails
+        args = self.__initialize_export_args(scope, ids, False, False, False)
+        previous = {name: self.__fast_query_datasheet(name, scope, args)
+                    for name in data}
+        saved = []
+        
+        try:
+            for name, ds in data.items():
+                saved.append(name)
+                self.save_datasheet(name, ds, append, force, scope, *ids)
+        except BaseException:
+            for name in reversed(saved):
+                self.__restore_datasheet(name, previous[name], scope, ids)
+            raise
             
     def run(self, scenarios=None, project=None,
-            copy_external_inputs=False):
+            copy_external_inputs=False, max_workers=None, executor=None,
+            on_event=None, timeout=None, shard=False):
         """
         Runs a list of Scenario objects.
+        
+        If `max_workers` or `executor` is given, the Scenarios of this 
+        Library are run concurrently, each in its own console process. 
+        Looking up the Results Scenarios is serialized, and a failed run 
+        does not stop the others. To run the Scenarios of several Libraries 
+        at once, pass the same executor to `run()` of each Library.
+        
+        If `shard=True`, the Scenarios are split between copies of this
+        Library, so concurrent runs do not write to the same file. Each copy
+        runs its Scenarios one after the other, and the Results Scenarios
+        are copied back into this Library, with their external files, as
+        they finish. The copies are removed when all runs have ended.
 
         Parameters
         ----------
@@ -887,30 +1174,99 @@ class Library(object):
             is created for each job. Applies only when jobs > 1. The number of 
             jobs is set using the 'core_Multiprocessing' datasheet. The default is
             False.
+        max_workers : Int, optional
+            Maximum number of Scenarios to run at the same time. The default 
+            is None.
+        executor : concurrent.futures.Executor, optional
+            Thread-backed executor used to run the Scenarios, e.g. a 
+            ThreadPoolExecutor shared between Libraries. The default is None.
+        on_event : Function, optional
+            Function called with the progress events of each running 
+            Scenario, identified by their ScenarioId. See `Scenario.run()`.
+            When Scenarios run concurrently, it is called from several 
+            threads. The default is None.
+        timeout : Float, optional
+            Number of seconds after which the run of each Scenario is 
+            stopped, together with all processes it started. See 
+            `Scenario.run()`. The default is None.
+        shard : Logical, optional
+            If True, runs the Scenarios of this Library on `max_workers` 
+            copies of the Library. If `max_workers` is None, one copy is made
+            per processor, up to the number of Scenarios. The default is 
+            False.
 
         Returns
         -------
         result_dict : Dictionary
-            Dictionary of Results Scenarios.
+            Dictionary of Results Scenarios. If `max_workers`, `executor`, or
+            `shard` is given, a Dictionary mapping each Scenario ID to its 
+            Results Scenario, or to the exception raised by its run.
 
         """
 
         self.__validate_run_inputs(scenarios, project,
-                                   copy_external_inputs)
+                                   copy_external_inputs, max_workers,
+                                   executor, shard)
+        
+        if on_event is not None and not callable(on_event):
+            raise TypeError("on_event must be a function or None")
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(
+                    timeout, (int, float)):
+                raise TypeError("timeout must be None or a number")
+            if timeout <= 0:
+                raise ValueError("timeout must be greater than 0")
         
         scenario_list = self.__generate_scenarios_list_to_run(scenarios,
                                                               project)
+        
+        if shard:
+            return self.__run_sharded(scenario_list, copy_external_inputs,
+                                      max_workers, on_event, timeout)
+        
+        if max_workers is not None or executor is not None:
+            return self.__run_concurrently(scenario_list, copy_external_inputs,
+                                           max_workers, executor, on_event,
+                                           timeout)
 
         # Collect output from all runs
         result_list = [scn.run(
-            copy_external_inputs=copy_external_inputs
-            ) for scn in scenario_list]
+            copy_external_inputs=copy_external_inputs, on_event=on_event,
+            timeout=timeout) for scn in scenario_list]
             
         if len(result_list) == 1:
             return result_list[0]
         else:                
             return result_list
         
+    def batch(self):
+        """
+        Creates a Batch that collects console commands modifying this Library
+        and runs them in as few console calls as possible. Use as a context
+        manager; the queued commands run when the block exits.
+        
+        Commands that set properties (e.g. owner, description, read-only
+        status), add or remove Scenario dependencies, or move Scenarios into
+        Folders are deferred. Consecutive property changes or dependency
+        additions on the same target are combined into a single call. If the
+        Session has console workers, the remaining calls are sent to them. 
+        Information that is read from the Library inside the block does not
+        reflect the deferred changes until the batch has run.
+
+        Raises
+        ------
+        RuntimeError
+            Raises error listing every console call that failed, after all
+            calls have been attempted.
+
+        Returns
+        -------
+        Batch
+            pysyncrosim Batch class instance.
+
+        """
+        return ps.Batch(self)
+        
     def update(self):
         """
         Updates a SyncroSim Library.
@@ -965,6 +1321,279 @@ class Library(object):
         else:
             return self.location
 
+    def refresh(self):
+        """
+        Clears the cached Project, Scenario, Folder, and Datasheet 
+        information of this Library, so it is read again from the Library.
+        Only needed when the Library is modified by another process and 
+        `check_modified` is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__cache = {}
+        self.__init_projects()
+        self.__init_scenarios()
+
+    async def adatasheets(self, name=None, summary=True, optional=False,
+                          empty=False, scope="Library", filter_column=None,
+                          filter_value=None, include_key=False,
+                          show_full_paths=False, return_hidden=False, *ids):
+        """
+        Retrieves a DataFrame of Library Datasheets without blocking the
+        asyncio event loop. Takes the same arguments as `datasheets()`.
+
+        Datasheet exports and Datasheet listings are awaited directly on the
+        console process. Filtered, hidden, and full Datasheet queries are run
+        in a worker thread.
+
+        Parameters
+        ----------
+        name : String, optional
+            Datasheet name. The default is None.
+        summary : Logical, optional
+            When set to True return a dataframe of all available package and
+            SyncroSim core Datasheets. When set to False returns a list of 
+            Datasheet dataframes. The default is True.
+        optional : Logical, optional
+            Return optional columns. The default is False.
+        empty : Logical, optional
+            Return an empty Datasheet. The default is False.
+        scope : String, optional
+            Datasheet scope. Options include "Library", "Project", or 
+            "Scenario". The default is "Library".
+        filter_column : String
+            The column to filter the output Datasheet by. The default is None.
+        filter_value : String, Int, or Logical
+            The value to filter the filter_column by. The default is None.
+        include_key : Logical, optional
+            Whether to include the primary key of the Datasheet, corresponding
+            to the SQL database. Default is False.
+        show_full_paths : Logical, optional
+            If set to True, returns the full path of any external files in the 
+            Datasheet. Default is False.
+        return_hidden : Logical, optional
+            If set to True, returns all records in a Datasheet, including those
+            hidden from the user. Results in a slower query. Default is False. 
+
+        Returns
+        -------
+        pandas.DataFrame
+            See `datasheets()`.
+
+        """
+        self.__validate_datasheets_inputs(name, summary, optional, empty,
+                                          filter_column, include_key,
+                                          return_hidden)
+        
+        if name is not None and filter_column is None and not return_hidden:
+            
+            name = self.__check_datasheet_name(name)
+            args = self.__initialize_export_args(scope, ids, empty,
+                                                 include_key, show_full_paths)
+            args = self.__build_fast_query_args(name, args)
+            
+            return await self.__aconsole_to_csv(args)
+        
+        if name is None and summary is True and (
+                optional is False or scope != "Scenario"):
+            
+            args = self.__build_list_datasheets_args(scope)
+            ds_frame = await self.__aconsole_to_csv(args)
+            
+            if optional is False:
+                return ds_frame.iloc[:, 1:4]
+            
+            return ds_frame
+        
+        return await asyncio.to_thread(
+            self.datasheets, name, summary, optional, empty, scope,
+            filter_column, filter_value, include_key, show_full_paths,
+            return_hidden, *ids)
+    
+    async def asave_datasheet(self, name, data, append=False, force=False,
+                              scope="Library", *ids):
+        """
+        Saves a pandas DataFrame as a SyncroSim Datasheet without blocking
+        the asyncio event loop. Takes the same arguments as 
+        `save_datasheet()`.
+
+        Parameters
+        ----------
+        name : String
+            Name of the Datasheet.
+        data : pandas DataFrame
+            DataFrame of Datasheet values.
+        append : Logical, optional
+            If set to True, appends the DataFrame to the existing 
+            Datasheet (if the Datasheet accepts multiple rows). If False,
+            then the user must also specify force as True to overwrite
+            the existing Datasheet. Default is False.
+        force : Logical, optional
+            If set to True while append is False, overwrites the existing
+            Datasheet. Default is False.
+        scope : String, optional
+            Scope of the Datasheet. The default is "Library".
+        *ids : Int
+            If Project- or Scenario-scoped, requires the Project or Scenario
+            IDs.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__validate_save_datasheet_inputs(name, data, append, force,
+                                              scope)
+        self.__check_datasheet_name(name)
+        self.__convert_logical_columns(data)
+        
+        if self.__environment is True:
+            self.__save_datasheet_to_transfer(name, data, append)
+            return
+        
+        fpath = None
+        
+        try:
+            delete_or_warn = self.__validate_delete_datasheet(force, append,
+                                                              scope, data)
+
+            if delete_or_warn == "delete":
+                await self.__adelete_datasheet(scope, name, ids)
+                if data.empty:
+                    return
+            elif delete_or_warn == "warn":
+                print("WARNING: The force argument must be set to True " 
+                      "to overwrite or delete an existing Project or Library "
+                      "Datasheet.")
+                return
+            
+            fpath = await asyncio.to_thread(self.__save_datasheet_to_temp,
+                                            data)
+            
+            args = self.__build_import_args(name, fpath, append, scope, ids)
+            result = await self.session._Session__acall_console(args)
+            await asyncio.to_thread(self.__check_datasheet_pipe, name, fpath)
+            
+            if result.returncode == 0:
+                print(f"{name} saved successfully")
+                
+        finally:
+            if fpath is not None:
+                await asyncio.to_thread(self.__remove_datasheet_temp, fpath)
+    
+    async def ascenarios(self, name=None, project=None, sid=None, pid=None,
+                         overwrite=False, optional=False, summary=None,
+                         results=False):
+        """
+        Retrieves a Scenario or DataFrame of Scenarios in this Library without
+        blocking the asyncio event loop. Takes the same arguments as 
+        `scenarios()`.
+
+        Scenario summaries are awaited directly on the console process.
+        Creating or opening Scenario instances is run in a worker thread.
+
+        Parameters
+        ----------
+        name : String, Int, or List of these, optional
+            Scenario name. The default is None.
+        project : Project, String, or Int, optional
+            Project the Scenario belongs to. The default is None.
+        sid : Int or List of Ints, optional
+            Scenario ID. The default is None.
+        pid : Int, optional
+            Project ID. The default is None.
+        overwrite : Logical, optional
+            Overwrites an existing Scenario. The default is False.
+        optional : Logical, optional
+            Return optional information. The default is False.
+        summary : Logical, optional
+            When name and sid is None, if True, returns a DataFrame of 
+            information on existing Scenarios. Otherwise returns a list of 
+            Scenario class instances.
+        results : Logical, optional
+            Return only a list of Results Scenarios. The default is False.
+
+        Returns
+        -------
+        Scenario, List of Scenarios, or pandas.DataFrame
+            See `scenarios()`.
+
+        """
+        self.__validate_scenarios_inputs(name, sid, project, pid, overwrite,
+                                         optional, summary, results)
+        
+        if name is None and sid is None and summary is not False:
+            
+            args = self.__build_list_scenarios_args(pid)
+            scenarios = await self.__aconsole_to_csv(args)
+            scenarios.rename(columns={"Id": "ScenarioId"}, inplace=True)
+            self.__scenarios = scenarios
+            
+            return self.__extract_scenario_summary(optional, results, None,
+                                                   None)
+        
+        return await asyncio.to_thread(self.scenarios, name, project, sid,
+                                       pid, overwrite, optional, summary,
+                                       results)
+    
+    async def arun(self, scenarios=None, project=None,
+                   copy_external_inputs=False):
+        """
+        Runs a list of Scenario objects without blocking the asyncio event 
+        loop. Takes the same arguments as `run()`. Scenarios in this Library 
+        are run one after the other, so runs of different Libraries can be 
+        awaited concurrently.
+
+        Parameters
+        ----------
+        scenarios : Scenario, String, Int, or List
+            List of Scenrios, SyncroSim Scenario instance, name of Scenario,
+            or Scenario ID.
+        project : Project, optional
+            SyncroSim Project instance, name of Project, or Project ID.
+        copy_external_inputs : Logical, optional
+            If False, then a copy of external input files (e.g. GeoTIFF files)
+            is not created for each job. The default is False.
+
+        Returns
+        -------
+        Scenario or List of Scenarios
+            Results Scenario(s).
+
+        """
+        self.__validate_run_inputs(scenarios, project,
+                                   copy_external_inputs)
+        
+        scenario_list = await asyncio.to_thread(
+            self.__generate_scenarios_list_to_run, scenarios, project)
+        
+        result_list = []
+        
+        for scn in scenario_list:
+            
+            args = scn._Scenario__build_run_args(copy_external_inputs)
+            
+            try:
+                print(f"Running Scenario [{scn.sid}] {scn.name}")
+                result = await self.session._Session__acall_console(args)
+                
+                if result.returncode == 0:
+                    print("Run successful")
+                    
+            except RuntimeError as e:
+                print(e)
+                
+            result_list.append(
+                await asyncio.to_thread(self.__find_run_result, scn))
+            
+        if len(result_list) == 1:
+            return result_list[0]
+        else:
+            return result_list
+
     def __init_conda(self):
         args = ["--setprop", "--lib=%s" % self.location]
 
@@ -980,8 +1609,7 @@ class Library(object):
     def __retrieve_lib_packages(self):
         # Retrieves current packages being used by the library
         args = ["--list", "--datasheets", "--lib=%s" % self.location]
-        result = self.session._Session__call_console(args, decode=True, csv=True)
-        result =  pd.read_csv(io.StringIO(result))
+        result = self.__console_to_csv(args)
         return np.unique(result["Package"]).tolist()
 
     def __create_conda_env(self, packages):
@@ -1015,25 +1643,64 @@ class Library(object):
                 
     def __init_projects(self): 
         # Retrieves a list of Projects
-        args = ["--list", "--projects", "--lib=%s" % self.__location]
-        self.__projects = self.__console_to_csv(args)
-        self.__projects.rename(columns={"Id": "ProjectId"}, inplace=True)
+        self.__projects = self.__cached("projects",
+                                        self.__load_projects).copy()
+        
+    def __load_projects(self):
+        projects = self.__read_database("projects")
+        if projects is None:
+            args = ["--list", "--projects", "--lib=%s" % self.__location]
+            projects = self.__console_to_csv(args)
+        return projects.rename(columns={"Id": "ProjectId"})
             
     def __init_scenarios(self, pid=None):
-        # Retrieves a list of Scenarios
+        # Retrieves a list of Scenarios, filtered from the cached list of all
+        # Scenarios in the Library
+        scenarios = self.__cached("scenarios", self.__load_scenarios)
+        if pid is not None:
+            scenarios = scenarios[
+                scenarios["ProjectId"] == pid].reset_index(drop=True)
+        self.__scenarios = scenarios.copy()
+        
+    def __get_scenario_info(self, sid):
+        # Retrieves the information of one Scenario from the cached list of
+        # all Scenarios in the Library
+        scenarios = self.__cached("scenarios", self.__load_scenarios)
+        return scenarios[scenarios["ScenarioId"] == sid]
+        
+    def __load_scenarios(self):
+        scenarios = self.__read_database("scenarios")
+        if scenarios is None:
+            args = self.__build_list_scenarios_args()
+            scenarios = self.__console_to_csv(args)
+        return scenarios.rename(columns={"Id": "ScenarioId"})
+        
+    def __build_list_scenarios_args(self, pid=None):
+        
         args = ["--list", "--scenarios", "--lib=%s" % self.__location]
         if pid is not None:
             args += ["--pid=%d" % pid]
-        self.__scenarios = self.__console_to_csv(args)
-        self.__scenarios.rename(columns={"Id": "ScenarioId"}, inplace=True)
+            
+        return args
             
     def __init_datasheets(self, scope, summary, name=None, args=None):
         # Retrieves a list of Datasheets
-        if self.__datasheets is None:
-            if summary is True:
-                args = ["--list", "--datasheets", "--lib=%s" % self.__location,
-                        "--scope=%s" % scope, "--includesys"]
-            self.__datasheets = self.__console_to_csv(args)    
+        if summary is True:
+            self.__datasheets = self.__list_datasheets(scope)
+        else:
+            self.__datasheets = self.__console_to_csv(args)
+            
+    def __list_datasheets(self, scope):
+        # Returns the Datasheets of a scope without replacing the listing 
+        # used by other calls
+        args = self.__build_list_datasheets_args(scope)
+        return self.__cached(("datasheets", scope),
+                             lambda: self.__console_to_csv(args), schema=True)
+            
+    def __build_list_datasheets_args(self, scope):
+        
+        return ["--list", "--datasheets", "--lib=%s" % self.__location,
+                "--scope=%s" % scope, "--includesys"]
             
     def __check_datasheet_name(self, name):
         # Appends package name to Datasheet name
@@ -1150,12 +1817,50 @@ class Library(object):
         
     def __console_to_csv(self, args, index_col=None):
         # Turns console output into a pd.DataFrame
-        console_output = self.session._Session__call_console(
-            args,
-            decode=True,
-            csv=True)
+        result = self.session._Session__call_console(args, csv=True)
+        
+        return self.__read_console_csv(result.stdout, index_col)
+    
+    def __read_console_csv(self, stdout, index_col=None):
+        # Parses the console output bytes directly, without decoding them
+        # into an intermediate string
+        return pd.read_csv(io.BytesIO(stdout), index_col=index_col,
+                           engine=self.__csv_engine)
+    
+    def __console_to_csv_chunks(self, args, chunksize, columns=None,
+                                where=None):
+        # Parses console output in chunks while the console writes it
+        with self.session._Session__stream_console(args, csv=True) as stdout:
+            with pd.read_csv(stdout, chunksize=chunksize,
+                             usecols=self.__where_usecols(columns, where)
+                             ) as reader:
+                for chunk in reader:
+                    chunk = self.__match_where(chunk, where)
+                    yield self.__select_rows(chunk, columns)
+    
+    def __remove_file(self, fpath):
+        if os.path.exists(fpath):
+            os.remove(fpath)
+    
+    def __read_csv_file_chunks(self, fpath, chunksize, columns=None,
+                               where=None):
+        # Reads an exported file in chunks and removes it afterwards
+        try:
+            with pd.read_csv(fpath, chunksize=chunksize,
+                             usecols=self.__where_usecols(columns, where)
+                             ) as reader:
+                for chunk in reader:
+                    chunk = self.__match_where(chunk, where)
+                    yield self.__select_rows(chunk, columns)
+        finally:
+            if os.path.exists(fpath):
+                os.remove(fpath)
+    
+    async def __aconsole_to_csv(self, args, index_col=None):
+        # Turns console output into a pd.DataFrame without blocking
+        result = await self.session._Session__acall_console(args, csv=True)
         
-        return pd.read_csv(io.StringIO(console_output), index_col=index_col)
+        return self.__read_console_csv(result.stdout, index_col)
     
     def __validate_pid(self, pid, name):
         
@@ -1411,7 +2116,10 @@ class Library(object):
     
     def __validate_datasheets_inputs(self, name, summary, optional, empty,
                                      filter_column, include_key, 
-                                     return_hidden):
+                                     return_hidden, chunksize=None,
+                                     sids=None, as_dict=False,
+                                     max_workers=None, columns=None,
+                                     limit=None, offset=0, where=None):
             
         if name is not None and not isinstance(name, str):
             raise TypeError("name must be a String")
@@ -1427,9 +2135,121 @@ class Library(object):
             raise TypeError("include_key must be a Logical")
         if not isinstance(return_hidden, bool):
             raise TypeError("return_hidden must be a Logical")
+        if chunksize is not None:
+            if not isinstance(chunksize, int) or isinstance(chunksize, bool):
+                raise TypeError("chunksize must be None or an Integer")
+            if chunksize < 1:
+                raise ValueError("chunksize must be at least 1")
+            if name is None:
+                raise ValueError("chunksize requires a Datasheet name")
+        if sids is not None:
+            if not isinstance(sids, list) or not all(
+                    isinstance(sid, (int, np.integer)) for sid in sids):
+                raise TypeError("sids must be a List of Integers")
+            if len(sids) == 0:
+                raise ValueError("sids must contain at least one Scenario ID")
+            if name is None:
+                raise ValueError("sids requires a Datasheet name")
+            if chunksize is not None:
+                raise ValueError("chunksize cannot be combined with sids")
+        if not isinstance(as_dict, bool):
+            raise TypeError("as_dict must be a Logical")
+        if max_workers is not None:
+            if not isinstance(max_workers, int) or isinstance(max_workers,
+                                                              bool):
+                raise TypeError("max_workers must be None or an Integer")
+            if max_workers < 1:
+                raise ValueError("max_workers must be at least 1")
+        if columns is not None:
+            if not isinstance(columns, list) or not all(
+                    isinstance(col, str) for col in columns):
+                raise TypeError("columns must be a List of Strings")
+            if len(columns) == 0:
+                raise ValueError("columns must contain at least one column")
+        if limit is not None:
+            if not isinstance(limit, int) or isinstance(limit, bool):
+                raise TypeError("limit must be None or an Integer")
+            if limit < 0:
+                raise ValueError("limit must be at least 0")
+        if not isinstance(offset, int) or isinstance(offset, bool):
+            raise TypeError("offset must be an Integer")
+        if offset < 0:
+            raise ValueError("offset must be at least 0")
+        if name is None and (columns is not None or limit is not None or
+                             offset > 0):
+            raise ValueError("columns, limit, and offset require a "
+                             "Datasheet name")
+        if chunksize is not None and (limit is not None or offset > 0):
+            raise ValueError("limit and offset cannot be combined with "
+                             "chunksize")
+        if where is not None:
+            self.__validate_where(where)
+            if name is None:
+                raise ValueError("where requires a Datasheet name")
+    
+    def __validate_where(self, where):
+        
+        if where is None:
+            return
+        if not isinstance(where, dict) or not all(
+                isinstance(col, str) for col in where):
+            raise TypeError("where must be a Dictionary keyed by column "
+                            "name")
+        for values in where.values():
+            if not isinstance(values, range) and not np.isscalar(
+                    values) and (not isinstance(values, (list, tuple, set))
+                                 or not all(np.isscalar(value)
+                                            for value in values)):
+                raise TypeError("where values must be Strings, numbers, "
+                                "Logicals, Lists, or Ranges")
+            
+    def __validate_aggregate_inputs(self, by, metrics, where):
+        
+        if not isinstance(by, list) or len(by) == 0 or not all(
+                isinstance(col, str) for col in by):
+            raise TypeError("by must be a non-empty List of Strings")
+        if not isinstance(metrics, dict) or len(metrics) == 0 or not all(
+                isinstance(col, str) for col in metrics):
+            raise TypeError("metrics must be a non-empty Dictionary keyed "
+                            "by column name")
+        for stats in metrics.values():
+            for stat in stats if isinstance(stats, list) else [stats]:
+                if isinstance(stat, float):
+                    if not 0 <= stat <= 1:
+                        raise ValueError("quantiles must be between 0 and 1")
+                elif stat not in ["count", "sum", "mean", "min", "max",
+                                  "var", "std", "median"]:
+                    raise ValueError(f"metric {stat} not supported")
+        self.__validate_where(where)
+            
+    def __validate_save_datasheet_inputs(self, name, data, append, force,
+                                         scope, key_columns=None):
+        
+        if not isinstance(name, str):
+            raise TypeError("name must be a String")
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError("data must be a pandas DataFrame")
+        if not isinstance(append, bool):
+            raise TypeError("append must be a Logical")
+        if not isinstance(force, bool):
+            raise TypeError("force must be a Logical")
+        if not isinstance(scope, str):
+            raise TypeError("scope must be a String")
+        if key_columns is not None:
+            if not isinstance(key_columns, list) or not all(
+                    isinstance(col, str) for col in key_columns):
+                raise TypeError("key_columns must be a List of Strings")
+            if len(key_columns) == 0 or not set(key_columns).issubset(
+                    data.columns):
+                raise ValueError("key_columns must be columns of data")
+            if data.duplicated(subset=key_columns).any():
+                raise ValueError("key_columns must identify each row of data")
+            if append:
+                raise ValueError("key_columns cannot be combined with append")
             
     def __validate_run_inputs(self, scenarios, project,
-                               copy_external_inputs):
+                               copy_external_inputs, max_workers=None,
+                               executor=None, shard=False):
     
         if scenarios is not None and not isinstance(
                 scenarios, ps.Scenario) and not isinstance(
@@ -1447,6 +2267,22 @@ class Library(object):
                 "project must be Project instance, String, or Integer")
         if not isinstance(copy_external_inputs, bool):
             raise TypeError("copy_external_inputs must be a Logical")
+        if max_workers is not None:
+            if not isinstance(max_workers, int) or isinstance(max_workers,
+                                                              bool):
+                raise TypeError("max_workers must be None or an Integer")
+            if max_workers < 1:
+                raise ValueError("max_workers must be at least 1")
+        if executor is not None and not isinstance(
+                executor, concurrent.futures.Executor):
+            raise TypeError(
+                "executor must be None or a concurrent.futures.Executor")
+        if max_workers is not None and executor is not None:
+            raise ValueError("Specify either max_workers or executor")
+        if not isinstance(shard, bool):
+            raise TypeError("shard must be a Logical")
+        if shard and executor is not None:
+            raise ValueError("Specify either shard or executor")
             
     
     def __initialize_export_args(self, scope, ids, empty, include_key, show_full_paths):
@@ -1479,10 +2315,7 @@ class Library(object):
                              "filter_column by")
         
         # Check if filter_column exists in Datasheet
-        check_args = ["--list", "--columns",
-                      "--lib=%s" % self.location, 
-                      "--sheet=%s" % name]
-        ds_cols = self.__console_to_csv(check_args)
+        ds_cols = self.__get_datasheet_columns(name)
         
         if filter_column not in ds_cols.Name.values:
             raise ValueError(
@@ -1496,9 +2329,9 @@ class Library(object):
                 
             # Initialize Datasheets summary
             # TODO: find out why Library and project scoped datasheets not showing up
-            self.__init_datasheets(scope=scope, summary=True)
+            datasheets = self.__list_datasheets(scope)
             
-            ds_row = self.__datasheets[self.__datasheets.Name == name]
+            ds_row = datasheets[datasheets.Name == name]
             
             if ds_row["Is Output"].values[0] == "Yes":
                 input_sheet_name = ds_cols[
@@ -1508,34 +2341,42 @@ class Library(object):
             else:
                 input_sheet_name = name
             
-            input_datasheet = self.__slow_query_datasheet(input_sheet_name,
-                                                          scope, ids)
+            primary_key, lookup = self.__lookup_ids(input_sheet_name,
+                                                    filter_column, scope, ids)
             
-            if (input_datasheet[filter_column] != filter_value).all():
+            if filter_value not in lookup:
                 raise ValueError(f"filter_value {filter_value} does not "+
                                  f"exist in filter_column {filter_column}")
             
             # Get primary key and ID for filter column/value
-            primary_key = input_datasheet.columns[0]
-            primary_value = input_datasheet[
-                input_datasheet[filter_column] == filter_value
-                ][primary_key].values[0]
             filter_column = primary_key
-            filter_value = primary_value
+            filter_value = lookup[filter_value]
         
         finally:
-
-            self.__datasheets = None
             
             return filter_column, str(filter_value)
         
+    def __lookup_ids(self, name, column, scope, ids):
+        # Maps the values of a Datasheet column to the primary key of their
+        # first row. The map is kept until the Library is modified.
+        def load():
+            ds = self.__slow_query_datasheet(name, scope, ids)
+            primary_key = ds.columns[0]
+            ds = ds.drop_duplicates(column)
+            return primary_key, dict(zip(ds[column], ds[primary_key]))
+        
+        return self.__cached(("lookup", name, column, scope, tuple(ids)),
+                             load)
+        
     def __find_datasheets_with_all_cols(self, ids):
         
         # Find out if datasheets contain any data
         optional_args = ["--list", "--datasources",
                          "--lib=%s" % self.location,
                          "--sid=%d" % ids]
-        optional_cols = self.__console_to_csv(optional_args)
+        optional_cols = self.__cached(
+            ("datasources", ids),
+            lambda: self.__console_to_csv(optional_args))
         optional_cols = optional_cols.replace(
             {"No": False, "Yes": True}).infer_objects(copy=False)
         
@@ -1572,35 +2413,525 @@ class Library(object):
             return optional_ds
     
     def __return_list_of_full_datasheets(self, scope, args, return_hidden,
-                                         ids):
+                                         ids, as_dict=False,
+                                         max_workers=None):
 
         self.__init_datasheets(scope=scope, summary=True)
         d_summary = self.__datasheets.copy()
-                        
-        ds_list = []
         
+        # Core LNG package datasheet cannot be exported
+        names = [self.__check_datasheet_name(ds) for ds in d_summary["Name"]
+                 if ds != "core_LNGPackage"]
         
-        for ds in d_summary["Name"]:
+        # Read all Datasheets available in the Library file at once
+        if return_hidden:
+            ds_dict = {}
+        else:
+            ds_dict = self.__read_database_datasheets(names, scope, args)
             
-            ds = self.__check_datasheet_name(ds)
-
-            # Core LNG package datasheet cannot be exported
-            if ds == "core_LNGPackage":
+        remaining = [ds for ds in names if ds not in ds_dict]
+        
+        if return_hidden:
+            query = lambda ds: self.__slow_query_datasheet(ds, scope, ids)
+        else:
+            query = lambda ds: self.__console_to_csv(
+                self.__build_fast_query_args(ds, args))
+        
+        if max_workers is None:
+            for ds in remaining:
+                ds_dict[ds] = query(ds)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                ds_dict.update(zip(remaining, executor.map(query, remaining)))
+        
+        # Keep the order of the Datasheet listing
+        ds_dict = {ds: ds_dict[ds] for ds in names}
+        
+        if as_dict:
+            return ds_dict
+            
+        return list(ds_dict.values())
+    
+    def __fast_query_datasheet(self, name, scope, args, chunksize=None,
+                               rows=(None, None, 0, None)):
+        
+        ds = self.__read_database_datasheet(name, scope, args, chunksize,
+                                            rows)
+        if ds is not None:
+            return ds
+        
+        fast_query_args = self.__build_fast_query_args(name, args)
+        columns, limit, offset, where = rows
+        
+        if chunksize is not None:
+            return self.__console_to_csv_chunks(fast_query_args, chunksize,
+                                                columns, where)
+        
+        if rows == (None, None, 0, None):
+            return self.__console_to_csv(fast_query_args)
+        
+        # Only parse the requested rows and columns, and stop the console 
+        # once the last requested row has been read
+        with self.session._Session__stream_console(
+                fast_query_args, csv=True,
+                read_all=limit is None) as stdout:
+            return self.__read_rows(stdout, *rows)
+    
+    def __read_rows(self, source, columns, limit, offset, where):
+        # Parses the requested rows and columns of an export
+        if where is None:
+            ds = pd.read_csv(source, **self.__read_rows_options(
+                columns, limit, offset))
+            return self.__select_rows(ds, columns)
+        
+        # Rows that do not match are dropped chunk by chunk, and parsing 
+        # stops once the last requested row has been found
+        matches = []
+        found = 0
+        with pd.read_csv(source, chunksize=self.__where_chunksize,
+                         usecols=self.__where_usecols(columns, where)
+                         ) as reader:
+            for chunk in reader:
+                chunk = self.__match_where(chunk, where)
+                matches.append(chunk)
+                found += len(chunk)
+                if limit is not None and found >= offset + limit:
+                    break
+        
+        ds = pd.concat(matches, ignore_index=True)
+        return self.__select_rows(ds, columns, limit, offset)
+    
+    def __where_usecols(self, columns, where):
+        # Columns to parse so that the filtered columns can be matched
+        if columns is None or where is None:
+            return columns
+        return columns + [col for col in where if col not in columns]
+    
+    def __match_where(self, ds, where):
+        # Keeps the rows that match all filters. Exported Logicals are 
+        # Yes/No and lookup columns hold names.
+        if where is None:
+            return ds
+        
+        mask = pd.Series(True, index=ds.index)
+        for col, values in where.items():
+            if isinstance(values, range):
+                mask &= ds[col].between(values.start, values.stop - 1)
+            else:
+                values = [("Yes" if value else "No")
+                          if isinstance(value, bool) else value
+                          for value in values]
+                mask &= ds[col].isin(values)
+        
+        return ds[mask]
+    
+    def __normalize_where(self, where):
+        # Turns every filter into a List or a Range of step 1 of plain 
+        # Python values
+        if where is None or len(where) == 0:
+            return None
+        
+        normalized = {}
+        for col, values in where.items():
+            if isinstance(values, range) and values.step == 1:
+                normalized[col] = values
+                continue
+            if np.isscalar(values):
+                values = [values]
+            normalized[col] = [value.item() if isinstance(value, np.generic)
+                               else value for value in values]
+            
+        return normalized
+    
+    def __where_lookup_names(self, name, where, scope, ids):
+        # Exported lookup columns hold names, so IDs given for them are 
+        # replaced by the names of the lookup Datasheet rows
+        if where is None:
+            return None
+        
+        ds_cols = self.__get_datasheet_columns(name)
+        if "Formula1" not in ds_cols.columns:
+            return where
+        lookups = dict(zip(ds_cols.Name, ds_cols.Formula1))
+        
+        converted = {}
+        for col, values in where.items():
+            lookup = lookups.get(col)
+            has_ids = isinstance(values, range) or any(
+                isinstance(value, int) and not isinstance(value, bool)
+                for value in values)
+            if not has_ids or not self.__is_datasheet_name(lookup):
+                converted[col] = values
                 continue
             
+            _, name_ids = self.__lookup_ids(lookup, "Name", scope, ids)
+            id_names = {int(key): key_name
+                        for key_name, key in name_ids.items()}
+            
+            if isinstance(values, range):
+                converted[col] = [key_name for key, key_name
+                                  in id_names.items() if key in values]
+            else:
+                converted[col] = [
+                    id_names.get(value, value) if isinstance(value, int)
+                    and not isinstance(value, bool) else value
+                    for value in values]
+                
+        return converted
+    
+    def __is_datasheet_name(self, name):
+        # Formula1 holds the lookup Datasheet of a column, or a validation
+        # value for other columns
+        if not isinstance(name, str):
+            return False
+        return any((self.__list_datasheets(scope).Name == name).any()
+                   for scope in ["Library", "Project", "Scenario"])
+    
+    def __split_where(self, where):
+        # Separates one Integer filter that the console can apply itself
+        for col, values in where.items():
+            if isinstance(values, list) and len(values) == 1 and \
+                    isinstance(values[0], int) and \
+                    not isinstance(values[0], bool):
+                rest = {key: value for key, value in where.items()
+                        if key != col}
+                return rest if len(rest) > 0 else None, (col, values[0])
+        
+        return where, None
+    
+    def __read_rows_options(self, columns, limit, offset):
+        # Options of pd.read_csv that only parse the requested rows and 
+        # columns. The pyarrow parser cannot skip or limit rows.
+        options = {"usecols": columns, "nrows": limit,
+                   "engine": self.__csv_engine}
+        if offset > 0:
+            options["skiprows"] = range(1, offset + 1)
+        if limit is not None or offset > 0:
+            options["engine"] = "c"
+        return options
+    
+    def __select_rows(self, ds, columns=None, limit=None, offset=0):
+        # Returns the requested columns, in the requested order, and rows
+        if columns is not None:
+            # Rows of several Scenarios keep their ScenarioId
+            if "ScenarioId" in ds.columns and "ScenarioId" not in columns:
+                columns = ["ScenarioId"] + columns
+            ds = ds[columns]
+        if limit is not None or offset > 0:
+            end = None if limit is None else offset + limit
+            ds = ds.iloc[offset:end].reset_index(drop=True)
+        return ds
+    
+    def __query_datasheet_for_scenarios(self, name, sids, args,
+                                        return_hidden, where=None):
+        
+        rows = (None, None, 0, where)
+        
+        # Read all Scenarios in one export, which tags rows with ScenarioId
+        if not return_hidden:
+            
+            sids_args = args + ["--sids=%s" % ",".join(map(str, sids))]
+            
+            try:
+                ds = self.__fast_query_datasheet(name, "Scenario", sids_args,
+                                                 rows=rows)
+            except RuntimeError:
+                ds = None
+                
+            if ds is not None and "ScenarioId" in ds.columns:
+                return ds
+            
+        # Otherwise read each Scenario and tag its rows
+        ds_list = []
+        
+        for sid in sids:
+            
             if return_hidden:
-                ds_full = self.__slow_query_datasheet(ds, scope, ids)
+                ds = self.__slow_query_datasheet(name, "Scenario", (sid,),
+                                                 rows=rows)
             else:
-                ds_full = self.__fast_query_datasheet(ds, scope, args)
+                ds = self.__fast_query_datasheet(name, "Scenario",
+                                                 args + ["--sid=%d" % sid],
+                                                 rows=rows)
                 
-            ds_list.append(ds_full)
+            if "ScenarioId" not in ds.columns:
+                ds.insert(0, "ScenarioId", sid)
+            ds_list.append(ds)
             
-        return ds_list
+        return pd.concat(ds_list, ignore_index=True)
     
-    def __fast_query_datasheet(self, name, scope, args):
+    def __aggregate_datasheet(self, name, scope, ids, by, metrics,
+                              where=None):
+        # Computes the metrics of each group of rows without keeping the
+        # rows, from the Library file or from the export in chunks
+        self.__validate_aggregate_inputs(by, metrics, where)
+        
+        name = self.__check_datasheet_name(name)
+        metrics = {col: stats if isinstance(stats, list) else [stats]
+                   for col, stats in metrics.items()}
+        where = self.__normalize_where(where)
+        
+        # Counts, sums, means, sums of squared deviations (m2), minima, and
+        # maxima of groups of rows can be combined. Only the partials of
+        # the requested metrics are computed. Quantiles need the values.
+        partials = {}
+        for col, stats in metrics.items():
+            kinds = ["count"] + [kind for stat in stats
+                                 for kind in self.__metric_partials.get(
+                                     stat, [])]
+            for kind in dict.fromkeys(kinds):
+                partials["%s__%s" % (col, kind)] = (kind, col)
+        quantile_cols = [col for col, stats in metrics.items()
+                         if any(self.__quantile(stat) is not None
+                                for stat in stats)]
+        
+        args = self.__initialize_export_args(scope, ids, False, False, False)
+        summary = None
+        values = None
+        
+        if self.__use_sqlite:
+            try:
+                summary = self.__database.aggregate(
+                    name, self.__get_datasheet_columns(name), scope=scope,
+                    ids=tuple(ids), by=by, aggregates=partials,
+                    predicates=where)
+            except (LookupError, sqlite3.Error, pd.errors.DatabaseError):
+                summary = None
+            
+            if summary is not None and len(quantile_cols) > 0:
+                values = self.__read_database_datasheet(
+                    name, scope, args, rows=(by + quantile_cols, None, 0,
+                                             where))
+                if values is None:
+                    summary = None
         
-        # Refresh datasheets
-        self.__datasheets=None
+        if summary is None:
+            
+            # The console can filter by one ID or number
+            rest, pushed = (None, None) if where is None else \
+                self.__split_where(where)
+            
+            if pushed is not None:
+                args += ["--filtercol=%s=%s" % self.__find_filter_column_args(
+                    *pushed, name, scope, ids)]
+            rest = self.__where_lookup_names(name, rest, scope, ids)
+            
+            # Reduce each chunk to its partial aggregates, and only keep 
+            # the values needed for quantiles
+            summaries = []
+            quantile_chunks = []
+            chunks = self.__fast_query_datasheet(
+                name, scope, args, self.__where_chunksize,
+                (list(dict.fromkeys(by + list(metrics))), None, 0, rest))
+            
+            for chunk in chunks:
+                summaries.append(self.__partial_aggregate(chunk, by,
+                                                          partials))
+                if len(quantile_cols) > 0:
+                    quantile_chunks.append(chunk[by + quantile_cols])
+            
+            summary = self.__combine_partials(summaries, by, partials)
+            
+            if len(quantile_cols) > 0:
+                values = pd.concat(quantile_chunks, ignore_index=True)
+        
+        return self.__summarize(summary, values, by, metrics)
+    
+    def __partial_aggregate(self, ds, by, partials):
+        # Reduces rows to the partial aggregates of each group
+        groups = [ds[col] for col in by]
+        summary = {}
+        
+        for output, (kind, col) in partials.items():
+            grouped = ds[col].groupby(groups, dropna=False)
+            summary[output] = grouped.var(ddof=0) * grouped.count() \
+                if kind == "m2" else getattr(grouped, kind)()
+        
+        return pd.DataFrame(summary).rename_axis(by).reset_index()
+    
+    def __combine_partials(self, summaries, by, partials):
+        # Combines the partial aggregates of the chunks of each group. Means
+        # are weighted by counts, and m2 gains the squared distance of each
+        # chunk mean from the group mean (Chan et al.)
+        ds = pd.concat(summaries, ignore_index=True)
+        means = {output: col for output, (kind, col) in partials.items()
+                 if kind == "mean"}
+        m2s = {output: col for output, (kind, col) in partials.items()
+               if kind == "m2"}
+        
+        weighted = ds.copy()
+        for output, col in means.items():
+            count = ds["%s__count" % col]
+            weighted[output] = (ds[output] * count).where(count > 0, 0)
+        
+        summary = weighted.groupby(by, dropna=False).agg(
+            {output: kind if kind in ["min", "max"] else "sum"
+             for output, (kind, col) in partials.items()})
+        for output, col in means.items():
+            summary[output] = summary[output] / summary["%s__count" % col]
+        
+        if len(m2s) > 0:
+            group_means = ds[by].merge(summary[list(means)].reset_index(),
+                                       on=by, how="left")
+            deviations = ds[by].copy()
+            for output, col in m2s.items():
+                count = ds["%s__count" % col]
+                mean = "%s__mean" % col
+                deviations[output] = (count * (
+                    ds[mean] - group_means[mean]) ** 2).where(count > 0, 0)
+            summary[list(m2s)] += deviations.groupby(
+                by, dropna=False)[list(m2s)].sum()
+        
+        return summary.reset_index()
+    
+    def __summarize(self, summary, values, by, metrics):
+        # Turns the partial aggregates and quantile values into the metrics
+        # of each group
+        summary = summary.sort_values(by).reset_index(drop=True)
+        result = summary[by].copy()
+        
+        for col, stats in metrics.items():
+            
+            count = summary["%s__count" % col]
+            
+            for stat in stats:
+                
+                quantile = self.__quantile(stat)
+                
+                if quantile is not None:
+                    output = "%s_median" % col if stat == "median" else \
+                        "%s_q%g" % (col, quantile * 100)
+                    quantiles = values.groupby(
+                        by, dropna=False)[col].quantile(quantile).rename(
+                            output).reset_index()
+                    result = result.merge(quantiles, on=by, how="left")
+                    continue
+                
+                if stat in ["var", "std"]:
+                    var = summary["%s__m2" % col] / (count - 1)
+                    value = var if stat == "var" else np.sqrt(var)
+                elif stat == "count":
+                    value = count
+                else:
+                    value = summary["%s__%s" % (col, stat)]
+                result["%s_%s" % (col, stat)] = value
+        
+        return result
+    
+    def __quantile(self, stat):
+        # Returns the quantile of a metric, or None for other metrics
+        if stat == "median":
+            return 0.5
+        if isinstance(stat, float):
+            return stat
+        return None
+    
+    def __read_database(self, kind, *args):
+        # Reads a listing from the Library file, or returns None if the
+        # console should be used instead
+        if not self.__use_sqlite:
+            return None
+        
+        try:
+            return getattr(self.__database, kind)(*args)
+        except (LookupError, sqlite3.Error, pd.errors.DatabaseError):
+            return None
+        
+    def __read_database_datasheet(self, name, scope, args, chunksize=None,
+                                  rows=(None, None, 0, None)):
+        # Translates export arguments into a read from the Library file, or
+        # returns None if the console should be used instead
+        if not self.__use_sqlite or "--extfilepaths" in args:
+            return None
+        
+        ids = self.__find_database_ids(args)
+        sids = [arg for arg in args if arg.startswith("--sids=")]
+        filter_column = None
+        filter_value = None
+        for arg in args:
+            if arg.startswith("--filtercol="):
+                filter_column, filter_value = arg.split("=", 2)[1:]
+        
+        try:
+            return self.__database.datasheet(
+                name, self.__get_datasheet_columns(name), scope=scope,
+                ids=tuple(ids), empty="--schemaonly" in args,
+                include_key="--includepk" in args,
+                include_scope_id=len(sids) > 0,
+                filter_column=filter_column, filter_value=filter_value,
+                chunksize=chunksize, usecols=rows[0], limit=rows[1],
+                offset=rows[2], predicates=rows[3])
+        except (LookupError, sqlite3.Error, pd.errors.DatabaseError):
+            return None
+        
+    def __read_database_datasheets(self, names, scope, args):
+        # Reads all Datasheets that can be resolved from the Library file in
+        # one transaction; the others are left to the console
+        if not self.__use_sqlite or "--extfilepaths" in args:
+            return {}
+        
+        try:
+            columns = {name: self.__get_datasheet_columns(name)
+                       for name in names}
+            return self.__database.datasheets(
+                columns, scope=scope, ids=tuple(self.__find_database_ids(args)),
+                empty="--schemaonly" in args,
+                include_key="--includepk" in args)
+        except (LookupError, sqlite3.Error, pd.errors.DatabaseError):
+            return {}
+        
+    def __find_database_ids(self, args):
+        # Finds the Project or Scenario IDs in export arguments
+        for arg in args:
+            if arg.startswith("--sids="):
+                return [int(sid) for sid in arg.split("=")[1].split(",")]
+        
+        return [int(arg.split("=")[1]) for arg in args
+                if arg.startswith("--sid=") or arg.startswith("--pid=")]
+        
+    def __get_datasheet_columns(self, name):
+        # Column information of a Datasheet does not change until the 
+        # Library packages change
+        args = ["--list", "--columns", "--lib=%s" % self.location,
+                "--sheet=%s" % name]
+        
+        return self.__cached(("columns", name),
+                             lambda: self.__console_to_csv(args), schema=True)
+    
+    def __cached(self, key, loader, schema=False):
+        # Returns cached Library information, loading it again once the 
+        # Library has been modified. Datasheet and column listings (schema) 
+        # only change with the Library packages.
+        kind = "schema" if schema else "data"
+        state = self.__cache_state(kind)
+        entries, entries_state = self.__cache.get(kind, ({}, None))
+        
+        if entries_state != state:
+            entries = {}
+            self.__cache[kind] = (entries, state)
+            
+        if key not in entries:
+            entries[key] = loader()
+            
+        return entries[key]
+    
+    def __cache_state(self, kind):
+        # Sessions count the console commands of this process that may 
+        # modify this Library; other processes only change the files
+        data_changes, schema_changes = \
+            self.session._Session__count_library_changes(self.__location)
+        state = [schema_changes if kind == "schema" else data_changes]
+        
+        if self.__check_modified:
+            for path in [self.__location, self.__location + "-wal"]:
+                if os.path.exists(path):
+                    stat = os.stat(path)
+                    state += [stat.st_mtime_ns, stat.st_size]
+            
+        return tuple(state)
+    
+    def __build_fast_query_args(self, name, args):
         
         # Add arguments
         fast_query_args = list(args)
@@ -1609,12 +2940,10 @@ class Library(object):
         if name.startswith("core"):
             fast_query_args += ["--includesys"]
             
-        self.__init_datasheets(scope=scope, summary=False,
-                               name=name, args=fast_query_args)
-        
-        return self.__datasheets
+        return fast_query_args
     
-    def __slow_query_datasheet(self, input_sheet_name, scope, ids):
+    def __slow_query_datasheet(self, input_sheet_name, scope, ids,
+                               chunksize=None, rows=(None, None, 0, None)):
         
         tempfile_path = self.__generate_tempfile_path()
         
@@ -1630,12 +2959,20 @@ class Library(object):
                 args += ["--includesys"]
             
             # Check the scope of the input_sheet_name
-            self.__init_datasheets(scope=scope, summary=True)
             args = self.__find_scope_id_args(input_sheet_name, scope, ids,
                                              args)
             
             self.session._Session__call_console(args)
-            ds = pd.read_csv(tempfile_path)
+            
+            if chunksize is not None:
+                # The chunk reader removes the file once it has been read,
+                # or once it is dropped without being read
+                ds = self.__read_csv_file_chunks(tempfile_path, chunksize,
+                                                 rows[0], rows[3])
+                weakref.finalize(ds, self.__remove_file, tempfile_path)
+                tempfile_path = None
+            else:
+                ds = self.__read_rows(tempfile_path, *rows)
             # ds = self.__remove_unnecessary_datasheet_columns(ds,
             #                                                  input_sheet_name)
         
@@ -1648,19 +2985,170 @@ class Library(object):
 
     def __delete_datasheet(self, scope, name, ids):
 
+        args = self.__build_delete_datasheet_args(scope, name, ids)
+        
+        result = self.__session._Session__call_console(args)
+
+        if result.returncode == 0:
+            print(f"{name} successfully deleted")
+        else:
+            raise RuntimeError(result.stderr)
+            
+    async def __adelete_datasheet(self, scope, name, ids):
+        
+        args = self.__build_delete_datasheet_args(scope, name, ids)
+        
+        result = await self.__session._Session__acall_console(args)
+
+        if result.returncode == 0:
+            print(f"{name} successfully deleted")
+        else:
+            raise RuntimeError(result.stderr)
+            
+    def __build_delete_datasheet_args(self, scope, name, ids):
+        
         args = ["--delete", "--data", "--lib=%s" % self.location,
                 "--sheet=%s" % name, "--force"]
         if scope == "Project":
             args += ["--pid=%d" % ids]
         if scope == "Scenario":
             args += ["--sid=%d" % ids]
+            
+        return args
+    
+    def __save_datasheet_changes(self, name, data, force, scope, ids,
+                                 key_columns):
+        # Saves only if the data differs from the stored Datasheet. The 
+        # console cannot change single rows, so inserted rows are appended
+        # and any update or deletion rewrites the Datasheet.
+        if not set(data.columns).issubset(
+                self.__get_datasheet_columns(name).Name):
+            raise ValueError(f"data has columns not in Datasheet {name}")
+        
+        args = self.__initialize_export_args(scope, ids, False, False, False)
+        stored = self.__fast_query_datasheet(
+            name, scope, args, rows=(list(data.columns), None, 0, None))
+        
+        changes = self.__find_datasheet_changes(stored, data, key_columns)
+        insert_rows = changes.pop("insert_rows")
+        
+        if changes["updated"] > 0 or changes["deleted"] > 0:
+            if self.__validate_delete_datasheet(
+                    force, False, scope, data) == "warn":
+                raise ValueError(
+                    "force must be True to overwrite or delete an existing "
+                    "Project or Library Datasheet")
+            self.save_datasheet(name, data, False, force, scope, *ids)
+        elif changes["inserted"] > 0:
+            self.save_datasheet(name, data[insert_rows], True, force, scope,
+                                *ids)
+        
+        return changes
+    
+    def __find_datasheet_changes(self, stored, data, key_columns):
+        # Parses the data like an export, so values compare equal to the 
+        # stored values
+        new = self.__read_console_csv(data.to_csv(index=False).encode(),
+                                      None)
+        stored = stored[list(data.columns)].copy()
+        self.__align_key_dtypes(stored, new, key_columns)
+        
+        merged = stored.merge(new, on=key_columns, how="outer",
+                              indicator=True, suffixes=("_stored", ""))
+        both = merged[merged["_merge"] == "both"]
+        deleted = int((merged["_merge"] == "left_only").sum())
+        
+        inserted_keys = merged.loc[merged["_merge"] == "right_only",
+                                   key_columns]
+        insert_rows = new[key_columns].merge(
+            inserted_keys, how="left", indicator=True
+            )["_merge"].eq("both").values
+        
+        # Deleted rows force a rewrite, so the kept rows are not compared
+        # and all count as updated
+        if deleted > 0:
+            updated = len(both)
+        else:
+            mask = pd.Series(False, index=both.index)
+            for col in data.columns:
+                if col in key_columns:
+                    continue
+                old_values = both[col + "_stored"]
+                new_values = both[col]
+                mask |= (old_values != new_values) & ~(
+                    old_values.isna() & new_values.isna())
+            updated = int(mask.sum())
+        
+        return {"inserted": int(insert_rows.sum()),
+                "updated": updated,
+                "deleted": deleted,
+                "insert_rows": insert_rows}
+    
+    def __align_key_dtypes(self, stored, new, key_columns):
+        # Key columns must have the same type on both sides of the merge,
+        # e.g. Integers and Floats with missing values
+        for col in key_columns:
+            if stored[col].dtype == new[col].dtype:
+                continue
+            if pd.api.types.is_numeric_dtype(stored[col]) and \
+                    pd.api.types.is_numeric_dtype(new[col]):
+                stored[col] = stored[col].astype(float)
+                new[col] = new[col].astype(float)
+            else:
+                stored[col] = stored[col].astype(str)
+                new[col] = new[col].astype(str)
+    
+    def __restore_datasheet(self, name, data, scope, ids):
+        # Replaces the values of a Datasheet with a previous export
+        self.__session._Session__call_console(
+            self.__build_delete_datasheet_args(scope, name, ids))
         
-        result = self.__session._Session__call_console(args)
+        if data.empty:
+            return
+        
+        fpath = self.__save_datasheet_to_temp(data)
+        
+        try:
+            self.__session._Session__call_console(
+                self.__build_import_args(name, fpath, False, scope, ids))
+            self.__check_datasheet_pipe(name, fpath)
+        finally:
+            self.__remove_datasheet_temp(fpath)
+            
+    def __build_import_args(self, name, fpath, append, scope, ids):
+        
+        args = ["--import", "--lib=%s" % self.location,
+                "--sheet=%s" % name, 
+                "--file=%s" % fpath]
 
-        if result.returncode == 0:
-            print(f"{name} successfully deleted")
-        else:
-            raise RuntimeError(result.stderr)
+        if append:
+            args += ["--append"]
+        if scope == "Project":
+            args += ["--pid=%d" % ids]
+        if scope == "Scenario":
+            args += ["--sid=%d" % ids]
+            
+        return args
+    
+    def __convert_logical_columns(self, data):
+        
+        # Convert boolean values to "Yes"/"No"
+        for col in data:
+            if data[col].dtype == bool:
+                data[col] = data[col].map({True: "Yes", False: "No"})
+                
+    def __save_datasheet_to_transfer(self, name, data, append):
+        
+        e = _environment()
+        transfer_dir = e.transfer_directory.item()
+        
+        # If running from user interface, save data to transfer directory
+        if (transfer_dir is not None) & (append is False):
+            fpath = os.path.join(transfer_dir, 'SSIM_OVERWRITE-{}.csv'.format(name))
+            data.to_csv(fpath, index=False)
+        elif (transfer_dir is not None) & (append is True):
+            fpath = os.path.join(transfer_dir, 'SSIM_APPEND-{}.csv'.format(name))
+            data.to_csv(fpath, index=False)
 
     def __validate_delete_datasheet(self, force, append, scope, data):
 
@@ -1686,6 +3174,16 @@ class Library(object):
 
         temp_folder = tempfile.mkdtemp(prefix="SyncroSim-")
         fpath = os.path.join(temp_folder, 'export.csv')
+        
+        if self.__stream_imports:
+            # The console reads the data while it is written to the pipe
+            os.mkfifo(fpath)
+            writer = threading.Thread(target=self.__write_datasheet_to_pipe,
+                                      args=(data, fpath), daemon=True)
+            self.__import_writers[fpath] = writer
+            writer.start()
+            return fpath
+        
         data.to_csv(fpath, index=False)
 
         if not os.path.isfile(fpath):
@@ -1693,23 +3191,65 @@ class Library(object):
 
         return fpath
     
+    def __write_datasheet_to_pipe(self, data, fpath):
+        # Blocks until the console opens the pipe for reading
+        try:
+            with open(fpath, "w", newline="", encoding="utf-8") as pipe:
+                data.to_csv(pipe, index=False)
+        except BrokenPipeError:
+            # The console stopped reading and reports its own error
+            pass
+        except Exception as e:
+            # Raised by the thread that called the console
+            self.__import_errors[fpath] = e
+    
+    def __join_datasheet_pipe(self, fpath):
+        
+        writer = self.__import_writers.pop(fpath, None)
+        
+        # Release a writer still waiting for the console to open the pipe
+        while writer is not None and writer.is_alive():
+            fd = os.open(fpath, os.O_RDONLY | os.O_NONBLOCK)
+            os.close(fd)
+            writer.join(0.1)
+    
+    def __check_datasheet_pipe(self, name, fpath):
+        # The console reads a pipe until it is closed, so it imports the 
+        # rows written before the writer failed
+        self.__join_datasheet_pipe(fpath)
+        error = self.__import_errors.pop(fpath, None)
+        
+        if error is not None:
+            raise RuntimeError(
+                f"Writing {name} to the console failed, so the Datasheet may "
+                f"only hold part of the data: {error}") from error
+    
+    def __remove_datasheet_temp(self, fpath):
+        
+        self.__join_datasheet_pipe(fpath)
+        self.__import_errors.pop(fpath, None)
+            
+        shutil.rmtree(os.path.dirname(fpath), ignore_errors=True)
+    
     def __generate_tempfile_path(self):
         
         temp_folder = self.location + "temp"
-
-        if not os.path.exists(temp_folder):
-            os.mkdir(temp_folder)
+        os.makedirs(temp_folder, exist_ok=True)
         
-        tempfile_path = os.path.join(temp_folder,
-                                     "temp.csv")
+        # Each call gets its own file, so concurrent queries on the same 
+        # Library do not overwrite each other
+        fd, tempfile_path = tempfile.mkstemp(prefix="temp-", suffix=".csv",
+                                             dir=temp_folder)
+        os.close(fd)
         
         return tempfile_path
     
     def __find_scope_id_args(self, input_sheet_name, scope, ids, args):
         
         scope_list = ["Project", "Scenario", "Library"]
+        datasheets = self.__list_datasheets(scope)
 
-        if (self.__datasheets.Name == input_sheet_name).any():
+        if (datasheets.Name == input_sheet_name).any():
             
             input_scope = scope
             
@@ -1768,6 +3308,186 @@ class Library(object):
     
             return scenario_list
         
+    def __run_concurrently(self, scenario_list, copy_external_inputs,
+                           max_workers, executor, on_event=None,
+                           timeout=None):
+        
+        sids = [int(scn.sid) for scn in scenario_list]
+        if len(set(sids)) < len(sids):
+            raise ValueError("Scenarios to run must have unique Scenario IDs")
+        if any(os.path.abspath(scn.library.location) != os.path.abspath(
+                self.location) for scn in scenario_list):
+            raise ValueError("Concurrent runs require Scenarios of this "
+                             "Library")
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers)
+            
+        try:
+            futures = {executor.submit(self.__run_scenario, scn,
+                                       copy_external_inputs, on_event,
+                                       timeout): int(scn.sid)
+                       for scn in scenario_list}
+            
+            # Capture the result or exception of each run
+            result_dict = {}
+            for future in concurrent.futures.as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    print(f"Scenario [{futures[future]}] failed: {error}")
+                    result_dict[futures[future]] = error
+                else:
+                    result_dict[futures[future]] = future.result()
+                    
+        finally:
+            if own_executor:
+                executor.shutdown()
+                
+        return {sid: result_dict[sid] for sid in sids}
+    
+    def __run_sharded(self, scenario_list, copy_external_inputs,
+                      max_workers, on_event=None, timeout=None):
+        
+        sids = [int(scn.sid) for scn in scenario_list]
+        if len(set(sids)) < len(sids):
+            raise ValueError("Scenarios to run must have unique Scenario IDs")
+        if any(os.path.abspath(scn.library.location) != os.path.abspath(
+                self.location) for scn in scenario_list):
+            raise ValueError("Sharded runs require Scenarios of this Library")
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        num_shards = min(max_workers, len(scenario_list))
+        shards = [scenario_list[i::num_shards] for i in range(num_shards)]
+        
+        folder = tempfile.mkdtemp(prefix="shards-",
+                                  dir=os.path.dirname(self.location))
+        result_dict = {}
+        progress = {"done": 0, "total": len(sids)}
+        print(f"Running {len(sids)} Scenarios on {num_shards} Library copies")
+        
+        def run_shard(index, shard):
+            try:
+                clone = self.__clone(os.path.join(folder, str(index)))
+            except Exception as e:
+                for scn in shard:
+                    result_dict[int(scn.sid)] = e
+                return
+            
+            for scn in shard:
+                try:
+                    with clone.__lock:
+                        clone_scn = clone.scenarios(sid=int(scn.sid))
+                    result_scn = clone.__run_scenario(
+                        clone_scn, copy_external_inputs, on_event, timeout)
+                    result_dict[int(scn.sid)] = self.__merge_result(
+                        result_scn, scn.project.pid)
+                except Exception as e:
+                    print(f"Scenario [{scn.sid}] failed: {e}")
+                    result_dict[int(scn.sid)] = e
+                    
+                with self.__lock:
+                    progress["done"] += 1
+                    print(f"Completed {progress['done']} of "
+                          f"{progress['total']} Scenarios")
+        
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=num_shards) as executor:
+                list(executor.map(run_shard, range(num_shards), shards))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+            
+        return {sid: result_dict[sid] for sid in sids}
+    
+    def __clone(self, folder):
+        # Copies this Library into folder, leaving out the external files of
+        # Results Scenarios. The backup API gives a consistent copy while
+        # other processes write to the Library.
+        os.makedirs(folder, exist_ok=True)
+        location = os.path.join(folder, os.path.basename(self.location))
+        
+        source_uri = "file:%s?mode=ro" % urllib.request.pathname2url(
+            os.path.abspath(self.location))
+        with contextlib.closing(sqlite3.connect(source_uri,
+                                                uri=True)) as source, \
+                contextlib.closing(sqlite3.connect(location)) as target:
+            source.backup(target)
+        
+        if os.path.isdir(self.location + ".data"):
+            with self.__lock:
+                scenarios = self.scenarios()
+            results = ["Scenario-%d" % sid for sid in scenarios[
+                scenarios["IsResult"] == "Yes"].ScenarioId]
+            shutil.copytree(self.location + ".data", location + ".data",
+                            ignore=lambda path, names: [
+                                name for name in names if name in results])
+        
+        return ps.Library(location=location, session=self.session,
+                          use_ssim_env=False)
+    
+    def __merge_result(self, result_scn, pid):
+        # Copies a Results Scenario from another Library into Project pid of
+        # this Library and returns the copy
+        with self.__lock:
+            before = set(self.scenarios().ScenarioId)
+            args = ["--copy", "--scenario",
+                    "--slib=%s" % result_scn.library.location,
+                    "--tlib=%s" % self.location,
+                    "--sid=%d" % result_scn.sid, "--pid=%d" % pid,
+                    "--name=%s" % result_scn.name]
+            self.session._Session__call_console(args)
+            
+            self.__scenarios = None
+            self.__init_scenarios()
+            s = self.__scenarios
+            new = s[~s["ScenarioId"].isin(before)]["ScenarioId"]
+            if new.empty:
+                raise RuntimeError(
+                    f"Copying Scenario [{result_scn.sid}] from "
+                    f"{result_scn.library.location} did not create a "
+                    f"Scenario in {self.location}")
+            sid = int(new.max())
+            
+            # Copy the external files if the console did not
+            source = os.path.join(result_scn.library.location + ".data",
+                                  "Scenario-%d" % result_scn.sid)
+            target = os.path.join(self.location + ".data",
+                                  "Scenario-%d" % sid)
+            if os.path.isdir(source) and not os.path.isdir(target):
+                shutil.copytree(source, target)
+            
+            return self.scenarios(sid=sid)
+    
+    def __find_run_result(self, scn):
+        # Library and Project information is not safe to update from 
+        # several threads at once
+        with scn.library._Library__lock:
+            return scn._Scenario__find_run_result()
+    
+    def __run_scenario(self, scn, copy_external_inputs, on_event=None,
+                       timeout=None, cancel=None):
+        # Runs one Scenario and raises an error if the run fails
+        args = scn._Scenario__build_run_args(copy_external_inputs)
+        
+        print(f"Running Scenario [{scn.sid}] {scn.name}")
+        if on_event is not None or timeout is not None or \
+                cancel is not None:
+            scn._Scenario__run_cancellable(args, on_event=on_event,
+                                           timeout=timeout, cancel=cancel)
+        else:
+            scn.library.session._Session__call_console(args)
+        
+        result_scn = self.__find_run_result(scn)
+            
+        if result_scn is None:
+            raise RuntimeError(
+                f"No Results Scenario found for Scenario [{scn.sid}]")
+            
+        return result_scn
+        
     def __find_scenarios_from_project(self, project):
         
         if project is None:
@@ -1799,7 +3519,9 @@ class Library(object):
 
         args = ["--list", "--library", "--lib=%s" % self.location,
                 "--tree"]
-        lib_structure = self.session._Session__call_console(args, decode=True)
+        lib_structure = self.__cached(
+            "structure",
+            lambda: self.session._Session__call_console(args, decode=True))
         lib_structure = lib_structure.replace("|", " ")
         lib_structure = lib_structure.split("\r\n")
         lib_structure.remove('')
@@ -0,0 +1,207 @@
+import re
+import time
+
+class RunMonitor(object):
+    """
+    A class to follow the progress of a running Scenario from the lines the
+    console writes to stdout. Lines of the SyncroSim progress protocol
+    (`ssim-task-start`, `ssim-task-step`, `ssim-task-end`,
+    `ssim-task-status`, `ssim-task-log`, `ssim-task-info`, and
+    `ssim-task-warning`) are turned into events.
+
+    """
+    # Event types of the progress protocol prefixes
+    _prefixes = {"ssim-task-start": "start",
+                 "ssim-task-step": "step",
+                 "ssim-task-end": "end",
+                 "ssim-task-status": "status",
+                 "ssim-task-log": "log",
+                 "ssim-task-info": "info",
+                 "ssim-task-warning": "warning"}
+
+    def __init__(self, sid=None, on_event=None, clock=time.monotonic):
+        """
+        Initializes a pysyncrosim RunMonitor instance.
+
+        Parameters
+        ----------
+        sid : Int, optional
+            Scenario ID added to each event. The default is None.
+        on_event : Function, optional
+            Function called with each event. The default is None, which
+            prints the progress.
+        clock : Function, optional
+            Function returning the time in seconds. The default is
+            time.monotonic.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__sid = sid
+        self.__on_event = on_event
+        self.__clock = clock
+        self.__started = clock()
+        self.__task_started = self.__started
+        self.__total_steps = None
+        self.__steps = 0
+        self.__iteration = None
+        self.__timestep = None
+        self.__reported = None
+
+    @property
+    def total_steps(self):
+        """
+        Retrieves the number of steps of the current task, if known.
+
+        Returns
+        -------
+        Int
+
+        """
+        return self.__total_steps
+
+    @property
+    def steps(self):
+        """
+        Retrieves the number of steps completed in the current task.
+
+        Returns
+        -------
+        Int
+
+        """
+        return self.__steps
+
+    @property
+    def rate(self):
+        """
+        Retrieves the number of steps completed per second in the current
+        task.
+
+        Returns
+        -------
+        Float
+
+        """
+        elapsed = self.__clock() - self.__task_started
+        if self.__steps == 0 or elapsed <= 0:
+            return None
+        return self.__steps / elapsed
+
+    @property
+    def eta(self):
+        """
+        Retrieves the estimated number of seconds until the current task
+        ends.
+
+        Returns
+        -------
+        Float
+
+        """
+        rate = self.rate
+        if rate is None or self.__total_steps is None:
+            return None
+        return max(self.__total_steps - self.__steps, 0) / rate
+
+    def feed(self, line):
+        """
+        Parses one line of console output and reports its event.
+
+        Parameters
+        ----------
+        line : String or Bytes
+            A line written by the console.
+
+        Returns
+        -------
+        Dictionary
+            The event, or None for empty lines. Events include the Type
+            ("start", "step", "end", "status", "log", "info", "warning", or
+            "output"), the Message, the ScenarioId, the Elapsed seconds, the
+            Steps and TotalSteps of the current task, the Rate in steps per
+            second, the ETA in seconds, and the last reported Iteration and
+            Timestep.
+
+        """
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        line = line.strip()
+        if line == "":
+            return None
+
+        prefix, _, message = line.partition("=")
+        kind = self._prefixes.get(prefix)
+
+        if kind is None:
+            kind = "output"
+            message = line
+        elif kind == "start":
+            self.__task_started = self.__clock()
+            self.__steps = 0
+            self.__total_steps = self.__parse_int(message)
+        elif kind == "step":
+            self.__steps += self.__parse_int(message) or 1
+        elif kind == "end" and self.__total_steps is not None:
+            self.__steps = self.__total_steps
+        elif kind == "status":
+            self.__parse_status(message)
+
+        event = {"Type": kind,
+                 "Message": message,
+                 "ScenarioId": self.__sid,
+                 "Elapsed": self.__clock() - self.__started,
+                 "Steps": self.__steps,
+                 "TotalSteps": self.__total_steps,
+                 "Rate": self.rate,
+                 "ETA": self.eta,
+                 "Iteration": self.__iteration,
+                 "Timestep": self.__timestep}
+
+        if self.__on_event is not None:
+            self.__on_event(dict(event))
+        else:
+            self.__print_event(event)
+
+        return event
+
+    def __parse_int(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    def __parse_status(self, message):
+        # Status messages of progress_bar(report_type="report")
+        iteration = re.search(r"Iteration is (\d+)", message)
+        timestep = re.search(r"Timestep is (\d+)", message)
+        if iteration is not None:
+            self.__iteration = int(iteration.group(1))
+        if timestep is not None:
+            self.__timestep = int(timestep.group(1))
+
+    def __print_event(self, event):
+        # Prints messages, and the progress each time another percent of
+        # the steps has been completed
+        if event["Type"] in ["log", "info", "warning", "output"]:
+            print(event["Message"], flush=True)
+            return
+
+        if event["Type"] not in ["step", "end"] or \
+                event["TotalSteps"] is None or event["TotalSteps"] == 0:
+            return
+
+        percent = int(100 * event["Steps"] / event["TotalSteps"])
+        if percent == self.__reported:
+            return
+        self.__reported = percent
+
+        progress = "%d of %d steps (%d%%)" % (event["Steps"],
+                                            event["TotalSteps"], percent)
+        if event["ETA"] is not None and event["Type"] == "step":
+            minutes, seconds = divmod(int(event["ETA"]), 60)
+            progress += ", %d:%02d:%02d remaining" % (
+                minutes // 60, minutes % 60, seconds)
+        print(progress, flush=True)
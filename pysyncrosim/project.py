@@ -252,7 +252,9 @@ class Project(object):
 
     def datasheets(self, name=None, summary=True, optional=False, empty=False,
                    filter_column=None, filter_value=None, include_key=False,
-                   show_full_paths=False, return_hidden=False):
+                   show_full_paths=False, return_hidden=False, chunksize=None,
+                   sids=None, as_dict=False, max_workers=None, columns=None,
+                   limit=None, offset=0, where=None):
         """
         Retrieves a DataFrame of Project Datasheets.
         
@@ -279,6 +281,32 @@ class Project(object):
         return_hidden : Logical, optional
             If set to True, returns all records in a Datasheet, including those
             hidden from the user. Results in a slower query. Default is False. 
+        chunksize : Int, optional
+            If given, returns an iterator that yields the Datasheet as 
+            DataFrames of at most this many rows. Requires a Datasheet name. 
+            The default is None.
+        sids : List of Ints, optional
+            Scenario IDs. If given, returns the Scenario Datasheet `name` for
+            all of these Scenarios in one DataFrame, with a ScenarioId column
+            identifying the Scenario of each row. The default is None.
+        as_dict : Logical, optional
+            If `summary=False`, returns a dictionary of Datasheet DataFrames 
+            keyed by Datasheet name instead of a list. The default is False.
+        max_workers : Int, optional
+            If `summary=False`, the number of Datasheets exported from the 
+            console at the same time. The default is None.
+        columns : List of Strings, optional
+            Only return these columns of the Datasheet `name`. The default 
+            is None.
+        limit : Int, optional
+            Only return at most this many rows of the Datasheet `name`. The
+            default is None.
+        offset : Int, optional
+            Number of rows of the Datasheet `name` to skip. The default is 0.
+        where : Dictionary, optional
+            Only return the rows of the Datasheet `name` that match all of 
+            these filters, keyed by column name, e.g. `{"Iteration": 
+            range(1, 11), "StratumId": "Forest"}`. The default is None.
 
         Returns
         -------
@@ -286,6 +314,7 @@ class Project(object):
             If `optional=False`, then returns a DataFrame of Datasheet 
             information including Package, Name, and Display Name.
             If `optional=True`, also returns Scope, Is Single, and Is Output.
+            If `chunksize` is given, returns an iterator of DataFrames.
 
         """
         
@@ -294,7 +323,15 @@ class Project(object):
                                                     filter_column, 
                                                     filter_value, include_key,
                                                     show_full_paths,
-                                                    return_hidden, self.pid)
+                                                    return_hidden, self.pid,
+                                                    chunksize=chunksize,
+                                                    sids=sids,
+                                                    as_dict=as_dict,
+                                                    max_workers=max_workers,
+                                                    columns=columns,
+                                                    limit=limit,
+                                                    offset=offset,
+                                                    where=where)
         return self.__datasheets
     
     def delete(self, scenario=None, datasheet=None, ids=None,
@@ -331,7 +368,8 @@ class Project(object):
             self.library.delete(project=self, force=force)
 
 
-    def save_datasheet(self, name, data, append=True, force=False):
+    def save_datasheet(self, name, data, append=True, force=False,
+                       key_columns=None):
         """
         Saves a Project-scoped Datasheet.
 
@@ -349,18 +387,55 @@ class Project(object):
             If True, overwrites existing Datasheet. The user should be aware that
             this may also delete other definitions and results, so this argument
             should be used with care. The default is False.
+        key_columns : List of Strings, optional
+            Columns that identify each row. If given, only saves the 
+            Datasheet if rows were inserted, updated, or deleted, and only 
+            appends the new rows if no stored rows changed. The default is 
+            None.
 
         Returns
         -------
-        None.
+        None or Dictionary
+            If `key_columns` is given, returns the number of "inserted", 
+            "updated", and "deleted" rows.
 
         """
         
-        self.library.save_datasheet(name, data, append, force, "Project", self.pid)
+        return self.library.save_datasheet(name, data, append, force,
+                                           "Project", self.pid,
+                                           key_columns=key_columns)
+        
+    def save_datasheets(self, data, append=True, force=False):
+        """
+        Saves several pandas DataFrames as SyncroSim Datasheets. Either all
+        Datasheets are saved, or none are: if saving a Datasheet fails, the
+        Datasheets already saved are restored before the error is raised.
+
+        Parameters
+        ----------
+        data : Dictionary
+            DataFrames of Datasheet values, keyed by Datasheet name.
+        append : Logical, optional
+            If True, appends data to existing Datasheets. The default is 
+            True.
+        force : Logical, optional
+            If True while append is False, overwrites the existing 
+            Datasheets. The default is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.library.save_datasheets(data, append, force, "Project",
+                                     self.pid)
         
-    def run(self, scenarios=None, copy_external_inputs=False):
+    def run(self, scenarios=None, copy_external_inputs=False,
+            max_workers=None, executor=None):
         """
-        Runs a list of Scenario objects.
+        Runs a list of Scenario objects. By default all Scenarios are run in
+        one console call. If `max_workers` or `executor` is given, the 
+        Scenarios are run concurrently as in `Library.run()`.
 
         Parameters
         ----------
@@ -373,11 +448,19 @@ class Project(object):
             is created for each job. Applies only when jobs > 1. The number of 
             jobs is set using the 'core_Multiprocessing' datasheet. The default is
             False.
+        max_workers : Int, optional
+            Maximum number of Scenarios to run at the same time. The default 
+            is None.
+        executor : concurrent.futures.Executor, optional
+            Thread-backed executor used to run the Scenarios. The default is 
+            None.
 
         Returns
         -------
         result_dict : Dictionary
-            Dictionary of Results Scenarios.
+            Dictionary of Results Scenarios. If `max_workers` or `executor` 
+            is given, a Dictionary mapping each Scenario ID to its Results 
+            Scenario, or to the exception raised by its run.
 
         """
         # Type checks
@@ -390,6 +473,14 @@ class Project(object):
             raise TypeError(
                 "scenarios must be Scenario instance, String, Integer, or List")
         
+        if max_workers is not None or executor is not None:
+            if scenarios is None:
+                scenarios = self.scenarios(summary=False)
+            return self.library.run(scenarios=scenarios, project=self,
+                                    copy_external_inputs=copy_external_inputs,
+                                    max_workers=max_workers,
+                                    executor=executor)
+        
         # Collect output in a dictionary
         result_list = []
         
@@ -1,8 +1,11 @@
 import pysyncrosim as ps
 from pysyncrosim.environment import _environment
+from pysyncrosim.monitor import RunMonitor
 import os
 import io
 import warnings
+import threading
+import concurrent.futures
 import pandas as pd
 import numpy as np
 
@@ -40,13 +43,12 @@ class Scenario(object):
         self.__date_modified = None
         self.__readonly = None
         self.__project_id = None
+        self.__is_result = None
+        self.__parent_id = None
         self.__info = None
-        # All None attributes assigned in __init_info()
-        self.__init_info()
-        self.__description = self.__init_description()
-        self.__is_result = self.__init_is_result()
-        self.__parent_id = self.__init_parent_id()
-        self.__dependencies = self.__init_dependencies()
+        # Attributes above are loaded on first access by __load_info(), and
+        # the description by the description property
+        self.__description = None
         
     @property
     def sid(self):
@@ -85,7 +87,7 @@ class Scenario(object):
                 "--name=%s" % value, "--sid=%d" % self.sid]
         self.library.session._Session__call_console(args)
         # Reset information
-        self.__init_info()
+        self.__info = None
         
     @property
     def project(self):
@@ -124,6 +126,7 @@ class Scenario(object):
             Scenario information.
 
         """
+        self.__load_info()
         return self.__info
     
     @property
@@ -137,6 +140,7 @@ class Scenario(object):
             Owner of this Scenario.
 
         """
+        self.__load_info()
         return self.__owner
     
     @owner.setter
@@ -145,7 +149,7 @@ class Scenario(object):
                 "--owner=%s" % value, "--sid=%d" % self.sid]
         self.library.session._Session__call_console(args)
         # Reset information
-        self.__init_info()
+        self.__info = None
         
     @property
     def date_modified(self):
@@ -158,6 +162,7 @@ class Scenario(object):
             Last date modified.
 
         """
+        self.__load_info()
         return self.__date_modified
     
     @property
@@ -171,6 +176,7 @@ class Scenario(object):
             "yes" if this Scenario is read-only, "no" otherwise.
 
         """
+        self.__load_info()
         return self.__readonly
     
     @readonly.setter
@@ -185,7 +191,7 @@ class Scenario(object):
                 "--readonly=%s" % ro, "--sid=%d" % self.sid]
         self.library.session._Session__call_console(args)
         # Reset information
-        self.__init_info()
+        self.__info = None
         
     @property
     def project_id(self):
@@ -198,6 +204,7 @@ class Scenario(object):
             Project ID.
 
         """
+        self.__load_info()
         return self.__project_id
     
     @property
@@ -211,6 +218,8 @@ class Scenario(object):
             Scenario description.
 
         """
+        if self.__description is None:
+            self.__description = self.__init_description()
         return self.__description
     
     @description.setter
@@ -218,7 +227,8 @@ class Scenario(object):
         args = ["--setprop", "--lib=%s" % self.library.location,
                 "--description=%s" % value, "--sid=%d" % self.sid]
         self.library.session._Session__call_console(args)
-        self.__description = self.__init_description()
+        # Reset information
+        self.__description = None
     
     @property
     def is_result(self):
@@ -232,6 +242,7 @@ class Scenario(object):
             Whether Scenario is a Results Scenario.
 
         """
+        self.__load_info()
         return self.__is_result
     
     @property
@@ -245,6 +256,7 @@ class Scenario(object):
             Parent ID of a Results Scenario.
 
         """
+        self.__load_info()
         return self.__parent_id
     
     @property
@@ -358,7 +370,9 @@ class Scenario(object):
     
     def datasheets(self, name=None, summary=True, optional=False, empty=False,
                    filter_column=None, filter_value=None, include_key=False,
-                   show_full_paths=False, return_hidden=False):
+                   show_full_paths=False, return_hidden=False, chunksize=None,
+                   as_dict=False, max_workers=None, columns=None,
+                   limit=None, offset=0, where=None):
         """
         Retrieves a DataFrame of Scenario Datasheets.
         
@@ -385,6 +399,28 @@ class Scenario(object):
         return_hidden : Logical, optional
             If set to True, returns all records in a Datasheet, including those
             hidden from the user. Results in a slower query. Default is False. 
+        chunksize : Int, optional
+            If given, returns an iterator that yields the Datasheet as 
+            DataFrames of at most this many rows. Requires a Datasheet name. 
+            The default is None.
+        as_dict : Logical, optional
+            If `summary=False`, returns a dictionary of Datasheet DataFrames 
+            keyed by Datasheet name instead of a list. The default is False.
+        max_workers : Int, optional
+            If `summary=False`, the number of Datasheets exported from the 
+            console at the same time. The default is None.
+        columns : List of Strings, optional
+            Only return these columns of the Datasheet `name`. The default 
+            is None.
+        limit : Int, optional
+            Only return at most this many rows of the Datasheet `name`. The
+            default is None.
+        offset : Int, optional
+            Number of rows of the Datasheet `name` to skip. The default is 0.
+        where : Dictionary, optional
+            Only return the rows of the Datasheet `name` that match all of 
+            these filters, keyed by column name, e.g. `{"Iteration": 
+            range(1, 11), "StratumId": "Forest"}`. The default is None.
 
         Returns
         -------
@@ -392,6 +428,7 @@ class Scenario(object):
             If `optional=False`, then returns a DataFrame of Datasheet 
             information including Package, Name, and Display Name.
             If `optional=True`, also returns Scope, Is Single, and Is Output.
+            If `chunksize` is given, returns an iterator of DataFrames.
 
         """
         
@@ -400,10 +437,52 @@ class Scenario(object):
                                                     filter_column, 
                                                     filter_value, include_key,
                                                     show_full_paths,
-                                                    return_hidden, self.sid)
+                                                    return_hidden, self.sid,
+                                                    chunksize=chunksize,
+                                                    as_dict=as_dict,
+                                                    max_workers=max_workers,
+                                                    columns=columns,
+                                                    limit=limit,
+                                                    offset=offset,
+                                                    where=where)
         return self.__datasheets
     
 
+    def aggregate(self, datasheet, by, metrics, where=None):
+        """
+        Summarizes a Scenario Datasheet by group without returning its rows.
+
+        With `use_sqlite=True` the groups are computed in the Library file.
+        Otherwise the Datasheet is reduced chunk by chunk as it is exported.
+        Only values needed for quantiles are kept in memory.
+
+        Parameters
+        ----------
+        datasheet : String
+            The name of a SyncroSim Datasheet.
+        by : List of Strings
+            Columns to group the rows by (e.g. `["Timestep",
+            "StateClassId"]`).
+        metrics : Dictionary
+            Metrics to compute, keyed by column. Each value is one or a List
+            of "count", "sum", "mean", "min", "max", "var", "std", "median",
+            or a quantile between 0 and 1 (e.g. `{"Amount": ["mean", 0.05,
+            0.95]}`).
+        where : Dictionary, optional
+            Only summarize rows that match these filters. See
+            `datasheets()`. The default is None.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per group, with the `by` columns and one column per
+            metric named after the column and metric (e.g. "Amount_mean",
+            "Amount_q5").
+
+        """
+        return self.library._Library__aggregate_datasheet(
+            datasheet, "Scenario", (self.sid,), by, metrics, where)
+
     def datasheet_rasters(self, datasheet, column=None, iteration=None,
                          timestep=None, filter_column=None, filter_value=None,
                          path_only=False):
@@ -443,19 +522,25 @@ class Scenario(object):
         # Check that Datasheet has package prefix
         datasheet = self.library._Library__check_datasheet_name(datasheet)
         
-        # Retrieve Datasheet as DataFrame
+        # Retrieve only the rows of the requested iterations and timesteps
+        where = {col: values for col, values in (("Iteration", iteration),
+                                                 ("Timestep", timestep))
+                 if values is not None}
         d = self.datasheets(name = datasheet, filter_column = filter_column,
-                            filter_value = filter_value, show_full_paths = False)
+                            filter_value = filter_value, show_full_paths = False,
+                            where = where)
         
-        if d.empty:
+        if d.empty and len(where) == 0:
             raise ValueError(f"Datasheet {datasheet} does not contain data.")
         
+        # Values that were not found may be outside of the Datasheet range
+        if d.empty or not self.__found_all(d, where):
+            self.__validate_filter_range(datasheet, filter_column,
+                                         filter_value, iteration, timestep,
+                                         where)
+        
         # Check if column is raster column
         column = self.__retrieve_raster_column(datasheet, column)
-        
-        # Filter data by iteration and timestep
-        d = self.__filter_by_iteration(iteration, d)
-        d = self.__filter_by_timestep(timestep, d)
                     
         # Determine which folder to look for raster tifs      
         if self.__env is None:                       
@@ -492,7 +577,7 @@ class Scenario(object):
         else:
             return raster_list
     
-    def save_datasheet(self, name, data, append=False):
+    def save_datasheet(self, name, data, append=False, key_columns=None):
         """
         Saves a pandas DataFrame as a SyncroSim Datasheet.
 
@@ -505,13 +590,44 @@ class Scenario(object):
         append : Logical, optional
             If True, appends data to existing Datasheet. The default is 
             False.
+        key_columns : List of Strings, optional
+            Columns that identify each row. If given, only saves the 
+            Datasheet if rows were inserted, updated, or deleted, and only 
+            appends the new rows if no stored rows changed. The default is 
+            None.
+
+        Returns
+        -------
+        None or Dictionary
+            If `key_columns` is given, returns the number of "inserted", 
+            "updated", and "deleted" rows.
+
+        """
+        return self.library.save_datasheet(name, data, append, False,
+                                           "Scenario", self.sid,
+                                           key_columns=key_columns)
+        
+    def save_datasheets(self, data, append=False):
+        """
+        Saves several pandas DataFrames as SyncroSim Datasheets. Either all
+        Datasheets are saved, or none are: if saving a Datasheet fails, the
+        Datasheets already saved are restored before the error is raised.
+
+        Parameters
+        ----------
+        data : Dictionary
+            DataFrames of Datasheet values, keyed by Datasheet name.
+        append : Logical, optional
+            If True, appends data to existing Datasheets. The default is 
+            False.
 
         Returns
         -------
         None.
 
         """
-        self.library.save_datasheet(name, data, append, False, "Scenario", self.sid)
+        self.library.save_datasheets(data, append, False, "Scenario",
+                                     self.sid)
     
     def delete(self, datasheet=None, ids=None, force=False):
         """
@@ -665,7 +781,8 @@ class Scenario(object):
         # Reset Scenario information
         self.library._Library__init_scenarios()
         
-    def run(self, copy_external_inputs=False):
+    def run(self, copy_external_inputs=False, stream=False, on_event=None,
+            timeout=None):
         """
         Runs a Scenario.
 
@@ -677,6 +794,24 @@ class Scenario(object):
             is created for each job. Applies only when jobs > 1. The number of 
             jobs is set using the 'core_Multiprocessing' datasheet. The default is
             False.
+        stream : Logical, optional
+            If True, reads the console output while the Scenario runs and 
+            prints progress, log, info, and warning messages as they arrive, 
+            with the estimated time remaining. The default is False.
+        on_event : Function, optional
+            Function called with a Dictionary for each line of console 
+            output while the Scenario runs, instead of printing it. Events 
+            include the Type ("start", "step", "end", "status", "log", 
+            "info", "warning", or "output"), the Message, the ScenarioId,
+            the Elapsed seconds, the Steps and TotalSteps of the current 
+            task, the Rate in steps per second, the ETA in seconds, and the 
+            last reported Iteration and Timestep. Implies `stream=True`. The
+            default is None.
+        timeout : Float, optional
+            Number of seconds after which the run is stopped. The console and
+            all processes it started are stopped, the incomplete Results 
+            Scenario is deleted, and a TimeoutError is raised. The default 
+            is None, which waits until the run ends.
 
         Returns
         -------
@@ -684,19 +819,23 @@ class Scenario(object):
             SyncroSim Scenario class instance.
 
         """    
-        # Runs the scenario
-        args = ["--run", "--lib=%s" % self.library.location,
-                "--sid=%d" % self.__sid]
+        self.__validate_run_inputs(stream, on_event, timeout)
         
-        if copy_external_inputs is True:
-            args += ["--copyextfiles=yes"]
+        # Runs the scenario
+        args = self.__build_run_args(copy_external_inputs)
         
         try:    
             print(f"Running Scenario [{self.sid}] {self.name}")
-            result = self.library.session._Session__call_console(args)
             
-            if result.returncode == 0:
+            if stream or on_event is not None or timeout is not None:
+                self.__run_cancellable(args, stream, on_event, timeout)
                 print("Run successful")
+            
+            else:
+                result = self.library.session._Session__call_console(args)
+            
+                if result.returncode == 0:
+                    print("Run successful")
 
         except RuntimeError as e:
             # TODO: add handling when the error message contains "You must be signed in" or "There has been an issue with your SyncroSim license file"
@@ -704,28 +843,42 @@ class Scenario(object):
             
             print(e)
 
-        finally:
-            
-            # Reset Project Scenarios
-            self.project._Project__scenarios = None
+        # A run that timed out raises its error instead of returning an
+        # earlier Results Scenario
+        result_scn = self.__find_run_result()
 
-            # Reset results
-            self.__results = None
+        if result_scn is not None:
             
-            # Retrieve Results Scenario ID
-            # Also resets scenarios and results info
-            results_df = self.results()
+            return result_scn
+    
+    def run_async(self, copy_external_inputs=False, timeout=None,
+                  on_event=None):
+        """
+        Starts running a Scenario in the background and returns a handle 
+        that can wait for or cancel the run.
 
-            if (not results_df.empty):
-            
-                result_id = results_df["ScenarioId"].values[-1]
-                
-                # Return Results Scenario
-                result_scn = self.library.scenarios(project=self.project,
-                                                    name=None,
-                                                    sid=result_id)
-                
-                return result_scn
+        Parameters
+        ----------
+        copy_external_inputs : Logical, optional
+            If False, then a copy of external input files (e.g. GeoTIFF files)
+            is not created for each job. See `run()`. The default is False.
+        timeout : Float, optional
+            Number of seconds after which the run is stopped. The default is
+            None.
+        on_event : Function, optional
+            Function called with the progress events of the run, from a 
+            background thread. See `run()`. The default is None.
+
+        Returns
+        -------
+        RunHandle
+            Handle of the running Scenario. `result()` returns the Results
+            Scenario and `cancel()` stops the run.
+
+        """
+        self.__validate_run_inputs(False, on_event, timeout)
+        
+        return ps.RunHandle(self, copy_external_inputs, timeout, on_event)
     
     def run_log(self):
         """
@@ -781,6 +934,102 @@ class Scenario(object):
             s = self.project.scenarios(optional = True)
             return s[(s.IsResult == "Yes") & (s.ParentId == self.__sid)]
         
+    def __validate_run_inputs(self, stream, on_event, timeout):
+        
+        if not isinstance(stream, bool):
+            raise TypeError("stream must be a Logical")
+        if on_event is not None and not callable(on_event):
+            raise TypeError("on_event must be a function or None")
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(
+                    timeout, (int, float)):
+                raise TypeError("timeout must be None or a number")
+            if timeout <= 0:
+                raise ValueError("timeout must be greater than 0")
+    
+    def __run_cancellable(self, args, stream=False, on_event=None,
+                          timeout=None, cancel=None):
+        # Runs the Scenario in a console that is stopped together with its
+        # child processes on timeout or cancel, reporting each line of 
+        # output if streamed
+        monitor = None
+        if stream or on_event is not None:
+            monitor = RunMonitor(self.sid, on_event)
+            
+        before = None
+        active_runs = self.library._Library__active_runs
+        if timeout is not None or cancel is not None:
+            with self.library._Library__lock:
+                before = set(self.results().ScenarioId)
+                active_runs[self.sid] = active_runs.get(self.sid, 0) + 1
+        
+        try:
+            self.library.session._Session__call_console_cancellable(
+                args, cancel, timeout, None if monitor is None else
+                monitor.feed)
+        except (TimeoutError, concurrent.futures.CancelledError):
+            self.__remove_partial_results(before)
+            raise
+        finally:
+            if before is not None:
+                with self.library._Library__lock:
+                    active_runs[self.sid] -= 1
+        
+    def __remove_partial_results(self, before):
+        # Deletes the Results Scenario of a run that was stopped, so the 
+        # Library does not keep incomplete results. The console does not 
+        # report the ID of an unfinished Results Scenario, so it is only 
+        # deleted if no other run of this Scenario can have created it.
+        with self.library._Library__lock:
+            self.project._Project__scenarios = None
+            self.__results = None
+            claimed = self.library._Library__claimed_results
+            new = [int(sid) for sid in self.results().ScenarioId
+                   if sid not in before and sid not in claimed]
+            shared = self.library._Library__active_runs.get(self.sid, 0) > 1
+            if len(new) == 1 and not shared:
+                claimed.add(new[0])
+            
+        if len(new) == 1 and not shared:
+            self.library.delete(scenario=new[0], force=True)
+        elif len(new) > 0:
+            print(f"WARNING: Results Scenarios {new} of Scenario "
+                  f"[{self.sid}] were kept, as other runs of this Scenario "
+                  "may have created them.")
+        
+    def __build_run_args(self, copy_external_inputs):
+        
+        args = ["--run", "--lib=%s" % self.library.location,
+                "--sid=%d" % self.__sid]
+        
+        if copy_external_inputs is True:
+            args += ["--copyextfiles=yes"]
+            
+        return args
+    
+    def __find_run_result(self):
+        
+        # Reset Project Scenarios
+        self.project._Project__scenarios = None
+
+        # Reset results
+        self.__results = None
+        
+        # Retrieve Results Scenario ID
+        # Also resets scenarios and results info
+        results_df = self.results()
+
+        if results_df.empty:
+            return None
+    
+        result_id = results_df["ScenarioId"].values[-1]
+        with self.library._Library__lock:
+            self.library._Library__claimed_results.add(int(result_id))
+        
+        # Return Results Scenario
+        return self.library.scenarios(project=self.project, name=None,
+                                      sid=result_id)
+        
     def __retrieve_scenario_folder_id(self):
 
         lib_structure = self.library._Library__get_library_structure()   
@@ -834,15 +1083,20 @@ class Scenario(object):
             self.__folder_id = folder_id
             print(f"Scenario {self.sid} added to folder with id {folder_id}")
                 
+    def __load_info(self):
+        # Loads Scenario information on first access
+        if self.__info is None:
+            self.__init_info()
+        
     def __init_info(self):
-        # Set Scenario information
-        scn_info = self.library.scenarios(project=self.project.pid,
-                                          optional=True)
-        scn_info = scn_info[scn_info["ScenarioId"] == self.sid]
+        # Set Scenario information from the Library's shared Scenario list
+        scn_info = self.library._Library__get_scenario_info(self.sid)
         self.__owner = scn_info["Owner"].item()
         self.__date_modified = scn_info["DateLastModified"].item()
         self.__readonly = scn_info["IsReadOnly"].item()
         self.__project_id = scn_info["ProjectId"].item()
+        self.__is_result = self.__init_is_result(scn_info)
+        self.__parent_id = self.__init_parent_id(scn_info)
         self.__info = scn_info.set_axis(
             ["Value"], axis=0
             ).T.rename_axis("Property").reset_index()
@@ -852,18 +1106,14 @@ class Scenario(object):
                 "--sid=%d" % self.sid]
         return self.library.session._Session__call_console(args, decode=True)
     
-    def __init_is_result(self):
+    def __init_is_result(self, scn_info):
         
         # Find out if result scenario
-        scn_info = self.library._Library__scenarios
-        scn_info = scn_info[scn_info["ScenarioId"] == self.sid]
         return scn_info["IsResult"].values[0]
     
-    def __init_parent_id(self):
+    def __init_parent_id(self, scn_info):
         
         # Find out parent ID if result scenario
-        scn_info = self.library._Library__scenarios
-        scn_info = scn_info[scn_info["ScenarioId"] == self.sid]
         parent_id = scn_info["ParentId"].values[0]
         if type(parent_id) == float:
             return int(parent_id)
@@ -935,6 +1185,32 @@ class Scenario(object):
                     
         return rpaths
     
+    def __found_all(self, d, where):
+        
+        for col, values in where.items():
+            
+            if not isinstance(values, (list, range)):
+                values = [values]
+                
+            if not set(values).issubset(d[col]):
+                return False
+            
+        return True
+    
+    def __validate_filter_range(self, datasheet, filter_column, filter_value,
+                                iteration, timestep, where):
+        
+        # Only read the iteration and timestep columns
+        d = self.datasheets(name = datasheet, filter_column = filter_column,
+                            filter_value = filter_value,
+                            columns = list(where))
+        
+        if d.empty:
+            raise ValueError(f"Datasheet {datasheet} does not contain data.")
+        
+        d = self.__filter_by_iteration(iteration, d)
+        self.__filter_by_timestep(timestep, d)
+    
     def __filter_by_iteration(self, iteration, d):
 
         if iteration is None:
@@ -0,0 +1,835 @@
+import os
+import json
+import time
+import shutil
+import socket
+import tempfile
+import sqlite3
+import threading
+import contextlib
+import concurrent.futures
+import pandas as pd
+import pysyncrosim as ps
+
+class Scheduler(object):
+    """
+    A class to represent a persistent queue of Scenario runs. Runs from any
+    number of Libraries are kept in a SQLite file, so the queue survives a
+    restart, and are run with limits on the number of runs per node and per
+    Library.
+
+    Several machines can share the queue file on a shared filesystem. Each
+    machine runs a Scheduler with a `work_dir`, so its runs use a private
+    copy of the Library, and a coordinator submits jobs and waits for them
+    with `wait()`.
+
+    """
+    # Queue table; times are seconds since the epoch
+    _schema = """
+        CREATE TABLE IF NOT EXISTS Job (
+            JobId INTEGER PRIMARY KEY AUTOINCREMENT,
+            Library TEXT NOT NULL,
+            ScenarioId INTEGER NOT NULL,
+            Priority INTEGER NOT NULL DEFAULT 0,
+            Resources TEXT NOT NULL DEFAULT '{}',
+            CopyExternalInputs INTEGER NOT NULL DEFAULT 0,
+            Timeout REAL,
+            MaxRetries INTEGER NOT NULL,
+            Status TEXT NOT NULL DEFAULT 'queued',
+            Attempts INTEGER NOT NULL DEFAULT 0,
+            NotBefore REAL NOT NULL DEFAULT 0,
+            Worker TEXT,
+            Heartbeat REAL,
+            ResultsBefore TEXT,
+            Interrupted INTEGER NOT NULL DEFAULT 0,
+            Private INTEGER NOT NULL DEFAULT 0,
+            ResultId INTEGER,
+            Error TEXT,
+            Submitted REAL NOT NULL,
+            Started REAL,
+            Finished REAL);
+        CREATE TABLE IF NOT EXISTS MergeLock (
+            Library TEXT PRIMARY KEY,
+            Worker TEXT NOT NULL,
+            Heartbeat REAL NOT NULL);"""
+
+    # Console errors that may succeed when the run is tried again
+    _transient_messages = ["database is locked", "database is busy",
+                           "being used by another process",
+                           "unable to open database"]
+
+    _statuses = ["queued", "running", "done", "failed", "cancelled"]
+
+    def __init__(self, path, session=None, max_workers=1, max_per_library=1,
+                 resources=None, max_retries=2, retry_delay=60,
+                 stale_after=60, poll_interval=1, retry_on=None,
+                 work_dir=None):
+        """
+        Initializes a pysyncrosim Scheduler instance. The queue file is
+        created if it does not exist.
+
+        Parameters
+        ----------
+        path : String
+            Filepath of the SQLite queue file.
+        session : Session, optional
+            pysyncrosim Session used to open Libraries. If None, then
+            creates a Session class instance using the default installation
+            path. The default is None.
+        max_workers : Int, optional
+            Maximum number of Scenarios run at the same time by this
+            Scheduler. The default is 1.
+        max_per_library : Int, optional
+            Maximum number of Scenarios of the same Library run at the same
+            time by all Schedulers sharing the queue file. Runs on private
+            copies of the Library are not counted. The default is 1.
+        resources : Dictionary, optional
+            Amount of each resource available to this Scheduler, e.g.
+            `{"cpus": 16, "memory_gb": 64}`. A run only starts if the
+            resources it asks for are available. Jobs asking for more than
+            the Scheduler has in total are rejected by `submit()`, or marked
+            failed by `run()`. The default is None.
+        max_retries : Int, optional
+            Number of times a run that failed with a transient error is
+            tried again. The default is 2.
+        retry_delay : Float, optional
+            Seconds to wait before the first retry; the delay doubles with
+            each retry. The default is 60.
+        stale_after : Float, optional
+            Seconds after which a running job whose Scheduler stopped
+            reporting is queued again. The default is 60.
+        poll_interval : Float, optional
+            Seconds between checks of the queue. The default is 1.
+        retry_on : Function, optional
+            Function called with the error of a failed run that returns True
+            if the run should be tried again. The default is None, which
+            retries timeouts, operating system errors, and console errors
+            about locked or busy Libraries.
+        work_dir : String, optional
+            Local folder for private copies of the Libraries. If given, each
+            run uses a copy of its Library taken after the job was submitted,
+            and the Results Scenario is copied back into the Library when
+            the run ends. The copies are removed when `run()` returns. The
+            default is None, which runs on the Library itself.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__validate_scheduler_inputs(max_workers, max_per_library,
+                                         resources, max_retries,
+                                         retry_delay, stale_after,
+                                         poll_interval, retry_on, work_dir)
+
+        self.__path = os.path.abspath(path)
+        self.__session = session
+        self.__max_workers = max_workers
+        self.__max_per_library = max_per_library
+        self.__resources = dict(resources or {})
+        self.__max_retries = max_retries
+        self.__retry_delay = retry_delay
+        self.__stale_after = stale_after
+        self.__poll_interval = poll_interval
+        self.__retry_on = retry_on
+        self.__work_dir = None
+        if work_dir is not None:
+            self.__work_dir = os.path.abspath(work_dir)
+            os.makedirs(self.__work_dir, exist_ok=True)
+        self.__worker = "%s:%d:%d" % (socket.gethostname(), os.getpid(),
+                                      id(self))
+        self.__libraries = {}
+        self.__private_copies = {}
+        self.__running = {}
+        self.__lock = threading.RLock()
+        self.__stopping = threading.Event()
+
+        with contextlib.closing(self.__connect()) as conn, conn:
+            conn.executescript(self._schema)
+
+    @property
+    def path(self):
+        """
+        Retrieves the filepath of the queue file.
+
+        Returns
+        -------
+        String
+            Queue filepath.
+
+        """
+        return self.__path
+
+    @property
+    def worker(self):
+        """
+        Retrieves the name this Scheduler uses to claim jobs, made of the
+        host name, process ID, and Scheduler ID.
+
+        Returns
+        -------
+        String
+            Worker name.
+
+        """
+        return self.__worker
+
+    def submit(self, scenarios, priority=0, resources=None,
+               copy_external_inputs=False, timeout=None, max_retries=None):
+        """
+        Adds Scenario runs to the queue.
+
+        Parameters
+        ----------
+        scenarios : Scenario, Project, or List
+            Scenario to run, Project whose Scenarios are run, or a List of
+            these. Results Scenarios are skipped.
+        priority : Int, optional
+            Jobs with a higher priority are run first. The default is 0.
+        resources : Dictionary, optional
+            Amount of each Scheduler resource the run uses, e.g.
+            `{"cpus": 4}`. The default is None.
+        copy_external_inputs : Logical, optional
+            If True, a copy of external input files is created for each job.
+            See `Scenario.run()`. The default is False.
+        timeout : Float, optional
+            Number of seconds after which a run is stopped. The default is
+            None.
+        max_retries : Int, optional
+            Number of retries of this run. The default is None, which uses
+            the `max_retries` of the Scheduler.
+
+        Returns
+        -------
+        List of Ints
+            Job IDs.
+
+        """
+        scenario_list = self.__find_scenarios_to_submit(scenarios)
+        self.__validate_submit_inputs(priority, resources,
+                                      copy_external_inputs, timeout,
+                                      max_retries)
+        too_large = self.__exceeds_capacity(resources or {})
+        if too_large is not None:
+            raise ValueError(too_large)
+
+        if max_retries is None:
+            max_retries = self.__max_retries
+
+        job_ids = []
+        with contextlib.closing(self.__connect()) as conn, conn:
+            for scn in scenario_list:
+                cursor = conn.execute(
+                    "INSERT INTO Job (Library, ScenarioId, Priority, "
+                    "Resources, CopyExternalInputs, Timeout, MaxRetries, "
+                    "Submitted) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [os.path.abspath(scn.library.location), int(scn.sid),
+                     priority, json.dumps(resources or {}),
+                     int(copy_external_inputs), timeout, max_retries,
+                     time.time()])
+                job_ids.append(cursor.lastrowid)
+
+        return job_ids
+
+    def jobs(self, status=None):
+        """
+        Retrieves the jobs in the queue.
+
+        Parameters
+        ----------
+        status : String, optional
+            Only return jobs with this status: "queued", "running", "done",
+            "failed", or "cancelled". The default is None.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per job, including the JobId, Library, ScenarioId,
+            Priority, Status, number of Attempts, Results Scenario ID
+            (ResultId), Error, and the Submitted, Started, and Finished
+            times.
+
+        """
+        if status is not None and status not in self._statuses:
+            raise ValueError("status must be one of %s" % self._statuses)
+
+        query = "SELECT JobId, Library, ScenarioId, Priority, Resources, " \
+            "Status, Attempts, Worker, ResultId, Error, Submitted, " \
+            "Started, Finished FROM Job"
+        params = []
+        if status is not None:
+            query += " WHERE Status = ?"
+            params.append(status)
+        query += " ORDER BY JobId"
+
+        with contextlib.closing(self.__connect()) as conn:
+            jobs = pd.read_sql_query(query, conn, params=params)
+
+        for col in ["Submitted", "Started", "Finished"]:
+            jobs[col] = pd.to_datetime(jobs[col], unit="s")
+
+        return jobs
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job, or stops a job run by this Scheduler.
+
+        Parameters
+        ----------
+        job_id : Int
+            Job ID.
+
+        Returns
+        -------
+        Logical
+            True if the job was cancelled, False if it had already ended or
+            is run by another Scheduler.
+
+        """
+        with contextlib.closing(self.__connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE Job SET Status = 'cancelled', Finished = ? "
+                "WHERE JobId = ? AND Status = 'queued'",
+                [time.time(), int(job_id)])
+            if cursor.rowcount > 0:
+                return True
+
+        with self.__lock:
+            running = self.__running.get(int(job_id))
+        if running is None:
+            return False
+
+        running["cancel"].set()
+        return True
+
+    def run(self, until_empty=True):
+        """
+        Runs the queued jobs. Jobs left running by a Scheduler that stopped
+        reporting, e.g. after a crash, are queued again first.
+
+        Parameters
+        ----------
+        until_empty : Logical, optional
+            If True, returns once no jobs are queued or running. If False,
+            keeps waiting for new jobs until `stop()` is called. The default
+            is True.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The jobs in the queue. See `jobs()`.
+
+        """
+        if not isinstance(until_empty, bool):
+            raise TypeError("until_empty must be a Logical")
+
+        self.__stopping.clear()
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.__max_workers)
+
+        try:
+            while True:
+                self.__heartbeat()
+                self.__recover_stale_jobs()
+
+                if not self.__stopping.is_set():
+                    for job in self.__claim_jobs():
+                        cancel = threading.Event()
+                        future = executor.submit(self.__execute, job, cancel)
+                        with self.__lock:
+                            self.__running[job["JobId"]] = {
+                                "future": future, "cancel": cancel,
+                                "job": job}
+
+                with self.__lock:
+                    futures = [running["future"]
+                               for running in self.__running.values()]
+
+                if len(futures) == 0 and (self.__stopping.is_set() or (
+                        until_empty and not self.__has_pending_jobs())):
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    futures, timeout=self.__poll_interval,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+                if len(futures) == 0:
+                    time.sleep(self.__poll_interval)
+
+                for future in done:
+                    self.__finish(future)
+
+        finally:
+            executor.shutdown()
+            self.__remove_private_copies()
+
+        return self.jobs()
+
+    def stop(self, cancel=False):
+        """
+        Stops `run()` from starting new jobs. `run()` returns once the jobs
+        it started have ended.
+
+        Parameters
+        ----------
+        cancel : Logical, optional
+            If True, stops the running jobs too. These jobs are queued again,
+            so a later `run()` resumes them. The default is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__stopping.set()
+
+        if cancel:
+            with self.__lock:
+                for running in self.__running.values():
+                    running["requeue"] = True
+                    running["cancel"].set()
+
+    def wait(self, job_ids=None, timeout=None):
+        """
+        Waits for jobs run by other Schedulers sharing the queue file to
+        end, without running any jobs. Their Results Scenarios are added to
+        the Libraries by other processes, so call `refresh()` on Library
+        instances opened with `check_modified=False` before listing them.
+
+        Parameters
+        ----------
+        job_ids : List of Ints, optional
+            Job IDs to wait for. The default is None, which waits for all
+            jobs.
+        timeout : Float, optional
+            Number of seconds to wait. The default is None, which waits
+            until the jobs end.
+
+        Raises
+        ------
+        TimeoutError
+            Raises error if the jobs have not ended within the timeout.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The jobs waited for. See `jobs()`.
+
+        """
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(
+                    timeout, (int, float)):
+                raise TypeError("timeout must be None or a number")
+            if timeout < 0:
+                raise ValueError("timeout must be at least 0")
+
+        start = time.monotonic()
+        while True:
+            jobs = self.jobs()
+            if job_ids is not None:
+                jobs = jobs[jobs.JobId.isin(job_ids)].reset_index(drop=True)
+            if not jobs.Status.isin(["queued", "running"]).any():
+                return jobs
+            if timeout is not None and time.monotonic() - start >= timeout:
+                raise TimeoutError(
+                    f"Jobs did not end within {timeout} seconds")
+            time.sleep(self.__poll_interval)
+
+    def __connect(self):
+        # Several Schedulers and threads may use the queue file at once
+        conn = sqlite3.connect(self.__path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def __claim_jobs(self):
+        # Marks the next jobs that fit within the limits as run by this
+        # Scheduler, highest priority first
+        with self.__lock:
+            free_slots = self.__max_workers - len(self.__running)
+            used = {}
+            for running in self.__running.values():
+                for name, amount in json.loads(
+                        running["job"]["Resources"]).items():
+                    used[name] = used.get(name, 0) + amount
+        if free_slots <= 0:
+            return []
+
+        claimed = []
+        now = time.time()
+
+        with contextlib.closing(self.__connect()) as conn:
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                per_library = dict(conn.execute(
+                    "SELECT Library, COUNT(*) FROM Job WHERE Status = "
+                    "'running' AND Private = 0 GROUP BY Library").fetchall())
+                candidates = conn.execute(
+                    "SELECT * FROM Job WHERE Status = 'queued' AND "
+                    "NotBefore <= ? ORDER BY Priority DESC, JobId",
+                    [now]).fetchall()
+
+                for job in candidates:
+                    if len(claimed) == free_slots:
+                        break
+                    if self.__work_dir is None and per_library.get(
+                            job["Library"], 0) >= self.__max_per_library:
+                        continue
+                    resources = json.loads(job["Resources"])
+                    too_large = self.__exceeds_capacity(resources)
+                    if too_large is not None:
+                        conn.execute(
+                            "UPDATE Job SET Status = 'failed', Error = ?, "
+                            "Finished = ? WHERE JobId = ?",
+                            [too_large, now, job["JobId"]])
+                        continue
+                    if not self.__fits(resources, used):
+                        continue
+
+                    conn.execute(
+                        "UPDATE Job SET Status = 'running', Worker = ?, "
+                        "Heartbeat = ?, Started = ?, Attempts = Attempts + 1"
+                        ", Error = NULL, ResultId = NULL, Private = ? WHERE "
+                        "JobId = ?",
+                        [self.__worker, now, now,
+                         int(self.__work_dir is not None), job["JobId"]])
+                    if self.__work_dir is None:
+                        per_library[job["Library"]] = \
+                            per_library.get(job["Library"], 0) + 1
+                    for name, amount in resources.items():
+                        used[name] = used.get(name, 0) + amount
+                    job = dict(job)
+                    job["Attempts"] += 1
+                    claimed.append(job)
+
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return claimed
+
+    def __exceeds_capacity(self, resources):
+        # Describes the first resource a job asks more of than the
+        # Scheduler has in total, or returns None
+        for name, amount in resources.items():
+            if name in self.__resources and amount > self.__resources[name]:
+                return (f"Job requires {amount} {name}, but the Scheduler "
+                        f"has {self.__resources[name]}")
+        return None
+
+    def __fits(self, resources, used):
+        # Resources the Scheduler does not list are not limited
+        for name, amount in resources.items():
+            if name in self.__resources and \
+                    used.get(name, 0) + amount > self.__resources[name]:
+                return False
+        return True
+
+    def __execute(self, job, cancel):
+        # Runs one job in a worker thread and returns its Results Scenario
+        library = self.__open_library(job["Library"])
+
+        with library._Library__lock:
+            scn = library.scenarios(sid=job["ScenarioId"])
+
+        # Remove what an interrupted earlier attempt left in the Library. An
+        # attempt on a private copy only changed the Library if it was 
+        # merging, which is done under the merge lock.
+        if job["Interrupted"] and job["ResultsBefore"] is not None:
+            if job["Private"]:
+                with self.__merge_lock(library.location):
+                    self.__remove_partial_results(scn, job)
+            else:
+                self.__remove_partial_results(scn, job)
+
+        # Note the Results Scenarios that exist before a run in the Library
+        before = None
+        if self.__work_dir is None:
+            with library._Library__lock:
+                before = json.dumps(
+                    [int(sid) for sid in scn.results().ScenarioId])
+        with contextlib.closing(self.__connect()) as conn, conn:
+            conn.execute("UPDATE Job SET ResultsBefore = ?, Interrupted = 0 "
+                         "WHERE JobId = ?", [before, job["JobId"]])
+
+        if self.__work_dir is None:
+            return library._Library__run_scenario(
+                scn, bool(job["CopyExternalInputs"]), None, job["Timeout"],
+                cancel)
+
+        private = self.__private_copy(job)
+        with private._Library__lock:
+            private_scn = private.scenarios(sid=job["ScenarioId"])
+        result_scn = private._Library__run_scenario(
+            private_scn, bool(job["CopyExternalInputs"]), None,
+            job["Timeout"], cancel)
+
+        return self.__merge_results(library, scn, result_scn, job)
+
+    def __remove_partial_results(self, scn, job):
+        # Results Scenarios recorded by other jobs are kept
+        with contextlib.closing(self.__connect()) as conn:
+            recorded = [row[0] for row in conn.execute(
+                "SELECT ResultId FROM Job WHERE Library = ? AND ResultId IS "
+                "NOT NULL AND JobId != ?", [job["Library"], job["JobId"]])]
+        scn._Scenario__remove_partial_results(
+            set(json.loads(job["ResultsBefore"])) | set(recorded))
+
+    def __private_copy(self, job):
+        # Each worker thread keeps its own copy of a Library, taken again
+        # when the job was submitted after the copy was made
+        key = (job["Library"], threading.get_ident())
+        with self.__lock:
+            copy = self.__private_copies.get(key)
+        if copy is not None and copy["taken"] >= job["Submitted"]:
+            return copy["library"]
+        if copy is not None:
+            shutil.rmtree(os.path.dirname(copy["library"].location),
+                          ignore_errors=True)
+
+        taken = time.time()
+        library = self.__open_library(job["Library"])._Library__clone(
+            tempfile.mkdtemp(dir=self.__work_dir))
+        with self.__lock:
+            self.__private_copies[key] = {"library": library, "taken": taken}
+
+        return library
+
+    def __remove_private_copies(self):
+        with self.__lock:
+            copies = list(self.__private_copies.values())
+            self.__private_copies.clear()
+        for copy in copies:
+            shutil.rmtree(os.path.dirname(copy["library"].location),
+                          ignore_errors=True)
+
+    def __merge_results(self, library, scn, result_scn, job):
+        # Copies the Results Scenario of a private run into the Library,
+        # one Scheduler at a time across all machines. The merged Results 
+        # Scenario is recorded at once, so the job is not run again if this
+        # Scheduler stops; a merge that stopped half way is removed.
+        with self.__merge_lock(library.location):
+            with library._Library__lock:
+                before = [int(sid) for sid in scn.results().ScenarioId]
+            with contextlib.closing(self.__connect()) as conn, conn:
+                conn.execute("UPDATE Job SET ResultsBefore = ? WHERE JobId = "
+                             "?", [json.dumps(before), job["JobId"]])
+            merged_scn = library._Library__merge_result(result_scn,
+                                                        scn.project.pid)
+            with contextlib.closing(self.__connect()) as conn, conn:
+                conn.execute("UPDATE Job SET ResultId = ? WHERE JobId = ?",
+                             [int(merged_scn.sid), job["JobId"]])
+
+        # Keep the private copy small for the next runs. The job is done
+        # even if this fails, as run() removes the copy at the end.
+        private = result_scn.library
+        try:
+            with private._Library__lock:
+                private.delete(scenario=result_scn.sid, force=True)
+        except RuntimeError:
+            pass
+
+        return merged_scn
+
+    @contextlib.contextmanager
+    def __merge_lock(self, location):
+        # Lock held in the queue file so it applies to every machine; locks
+        # of Schedulers that stopped reporting are removed
+        while True:
+            with contextlib.closing(self.__connect()) as conn, conn:
+                conn.execute("DELETE FROM MergeLock WHERE Heartbeat < ?",
+                             [time.time() - self.__stale_after])
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO MergeLock (Library, Worker, "
+                    "Heartbeat) VALUES (?, ?, ?)",
+                    [location, self.__worker, time.time()])
+            if cursor.rowcount > 0:
+                break
+            time.sleep(self.__poll_interval)
+
+        try:
+            yield
+        finally:
+            with contextlib.closing(self.__connect()) as conn, conn:
+                conn.execute("DELETE FROM MergeLock WHERE Library = ? AND "
+                             "Worker = ?", [location, self.__worker])
+
+    def __finish(self, future):
+        # Records the outcome of a job and schedules a retry if needed
+        with self.__lock:
+            job_id = next(job_id for job_id, running in self.__running.items()
+                          if running["future"] is future)
+            running = self.__running.pop(job_id)
+
+        job = running["job"]
+        error = future.exception()
+        now = time.time()
+
+        if error is None:
+            update = ("Status = 'done', ResultId = ?, Finished = ?",
+                      [int(future.result().sid), now])
+        elif running.get("requeue"):
+            update = ("Status = 'queued', Attempts = Attempts - 1, "
+                      "Worker = NULL", [])
+        elif isinstance(error, concurrent.futures.CancelledError):
+            update = ("Status = 'cancelled', Error = ?, Finished = ?",
+                      [str(error), now])
+        elif job["Attempts"] <= job["MaxRetries"] and \
+                self.__is_transient(error):
+            delay = self.__retry_delay * 2 ** (job["Attempts"] - 1)
+            update = ("Status = 'queued', Worker = NULL, Error = ?, "
+                      "NotBefore = ?", [str(error), now + delay])
+        else:
+            update = ("Status = 'failed', Error = ?, Finished = ?",
+                      [str(error), now])
+
+        with contextlib.closing(self.__connect()) as conn, conn:
+            conn.execute("UPDATE Job SET %s WHERE JobId = ?" % update[0],
+                         update[1] + [job_id])
+
+    def __is_transient(self, error):
+        if self.__retry_on is not None:
+            return bool(self.__retry_on(error))
+        if isinstance(error, OSError):
+            return True
+        message = str(error).lower()
+        return isinstance(error, RuntimeError) and any(
+            text in message for text in self._transient_messages)
+
+    def __heartbeat(self):
+        # Shows other Schedulers that the jobs of this one are still running
+        with self.__lock:
+            job_ids = list(self.__running)
+        if len(job_ids) == 0:
+            return
+
+        with contextlib.closing(self.__connect()) as conn, conn:
+            conn.execute(
+                "UPDATE Job SET Heartbeat = ? WHERE Status = 'running' AND "
+                "JobId IN (%s)" % ", ".join("?" for i in job_ids),
+                [time.time()] + job_ids)
+            conn.execute("UPDATE MergeLock SET Heartbeat = ? WHERE Worker = ?",
+                         [time.time(), self.__worker])
+
+    def __recover_stale_jobs(self):
+        # Queues jobs again whose Scheduler stopped reporting. The attempt
+        # counts as a failure, and its partial results are removed before
+        # the job runs again. Jobs whose results were already merged are 
+        # done.
+        stale = time.time() - self.__stale_after
+
+        with contextlib.closing(self.__connect()) as conn, conn:
+            conn.execute(
+                "UPDATE Job SET Status = 'done', Finished = ?, Worker = NULL "
+                "WHERE Status = 'running' AND Heartbeat < ? AND ResultId IS "
+                "NOT NULL AND (Worker IS NULL OR Worker != ?)",
+                [time.time(), stale, self.__worker])
+            conn.execute(
+                "UPDATE Job SET Status = CASE WHEN Attempts <= MaxRetries "
+                "THEN 'queued' ELSE 'failed' END, Finished = CASE WHEN "
+                "Attempts <= MaxRetries THEN NULL ELSE ? END, Worker = NULL, "
+                "Interrupted = 1, Error = 'Scheduler stopped while running' "
+                "WHERE Status = 'running' AND Heartbeat < ? AND "
+                "(Worker IS NULL OR Worker != ?)",
+                [time.time(), stale, self.__worker])
+
+    def __has_pending_jobs(self):
+        with contextlib.closing(self.__connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM Job WHERE Status IN ('queued', "
+                "'running')").fetchone()
+        return row[0] > 0
+
+    def __open_library(self, location):
+        # Libraries are opened once and shared by the jobs of this Scheduler
+        with self.__lock:
+            if location not in self.__libraries:
+                self.__libraries[location] = ps.Library(
+                    location=location, session=self.__open_session(),
+                    use_ssim_env=False)
+            return self.__libraries[location]
+
+    def __open_session(self):
+        with self.__lock:
+            if self.__session is None:
+                self.__session = ps.Session()
+            return self.__session
+
+    def __find_scenarios_to_submit(self, scenarios):
+
+        if not isinstance(scenarios, list):
+            scenarios = [scenarios]
+
+        scenario_list = []
+        for item in scenarios:
+            if isinstance(item, ps.Project):
+                item = item.scenarios(summary=False)
+            elif isinstance(item, ps.Scenario):
+                item = [item]
+            else:
+                raise TypeError(
+                    "scenarios must be Scenario or Project instances")
+            scenario_list += [scn for scn in item if scn.is_result != "Yes"]
+
+        return scenario_list
+
+    def __validate_submit_inputs(self, priority, resources,
+                                 copy_external_inputs, timeout, max_retries):
+
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise TypeError("priority must be an Integer")
+        self.__validate_resources(resources)
+        if not isinstance(copy_external_inputs, bool):
+            raise TypeError("copy_external_inputs must be a Logical")
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(
+                    timeout, (int, float)):
+                raise TypeError("timeout must be None or a number")
+            if timeout <= 0:
+                raise ValueError("timeout must be greater than 0")
+        if max_retries is not None:
+            if isinstance(max_retries, bool) or not isinstance(
+                    max_retries, int):
+                raise TypeError("max_retries must be None or an Integer")
+            if max_retries < 0:
+                raise ValueError("max_retries must be at least 0")
+
+    def __validate_resources(self, resources):
+
+        if resources is None:
+            return
+        if not isinstance(resources, dict) or not all(
+                isinstance(name, str) and not isinstance(amount, bool) and
+                isinstance(amount, (int, float))
+                for name, amount in resources.items()):
+            raise TypeError("resources must be a Dictionary of numbers "
+                            "keyed by resource name")
+
+    def __validate_scheduler_inputs(self, max_workers, max_per_library,
+                                    resources, max_retries, retry_delay,
+                                    stale_after, poll_interval, retry_on,
+                                    work_dir):
+
+        for name, value in [("max_workers", max_workers),
+                            ("max_per_library", max_per_library)]:
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise TypeError(f"{name} must be an Integer")
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1")
+        self.__validate_resources(resources)
+        if isinstance(max_retries, bool) or not isinstance(max_retries, int):
+            raise TypeError("max_retries must be an Integer")
+        if max_retries < 0:
+            raise ValueError("max_retries must be at least 0")
+        for name, value in [("retry_delay", retry_delay),
+                            ("stale_after", stale_after),
+                            ("poll_interval", poll_interval)]:
+            if isinstance(value, bool) or not isinstance(value,
+                                                         (int, float)):
+                raise TypeError(f"{name} must be a number")
+            if value < 0:
+                raise ValueError(f"{name} must be at least 0")
+        if retry_on is not None and not callable(retry_on):
+            raise TypeError("retry_on must be a function or None")
+        if work_dir is not None and not isinstance(work_dir, str):
+            raise TypeError("work_dir must be a String or None")
@@ -1,19 +1,34 @@
 import os
 import io
+import sys
 import time
+import asyncio
+import threading
+import tempfile
+import signal
+import contextlib
 import subprocess
+import importlib.util
+import concurrent.futures
 import shutil
 import pandas as pd
 import pysyncrosim as ps
 from pysyncrosim._version import __version__
 from pysyncrosim import helper
+from pysyncrosim import worker
+
+# Console commands that may modify each Library, counted across all Sessions
+# of this process
+_library_changes = {}
+_library_changes_lock = threading.Lock()
 
 class Session(object):
     """
     A class to represent a SyncroSim Session.
     
     """    
-    def __init__(self, location=None, silent=True, print_cmd=False, conda_filepath=None, mono_path=None):
+    def __init__(self, location=None, silent=True, print_cmd=False, conda_filepath=None, mono_path=None,
+                 workers=None, worker_command=None, record_calls=False):
         """
         Initializes a pysyncrosim Session instance.
 
@@ -34,6 +49,23 @@ class Session(object):
             Path to mono executable on Linux. If None, automatically searches PATH.
             Specify custom path if mono is not in your PATH.
             Example: Session(location="/opt/syncrosim", mono_path="/usr/local/bin/mono")
+        workers : Int, optional
+            Number of long-lived console worker processes launched with
+            `worker_command`. Console commands are sent to the workers 
+            instead of launching a new console process for every call; 
+            commands whose output is streamed still launch their own 
+            process. If None, then each call launches its own console 
+            process. The default is None.
+        worker_command : List, optional
+            Command used to launch a console worker host that keeps the 
+            console loaded between requests and speaks the pysyncrosim 
+            worker protocol (see `pysyncrosim._worker_main.serve()`). 
+            Required when `workers` is set; pysyncrosim does not include a
+            persistent SyncroSim console. The default is None.
+        record_calls : Logical, optional
+            If True, records the arguments, calling pysyncrosim method, wall
+            time, output sizes, and return code of every console call. See
+            `call_stats()`. The default is False.
 
         Raises
         ------
@@ -57,6 +89,15 @@ class Session(object):
         self.__silent = silent
         self.__print_cmd = print_cmd
         self.__conda_filepath = conda_filepath
+        self.__validate_worker_inputs(workers, worker_command)
+        self.__worker_pool = None
+        self.__batches = []
+        self.__record_calls = False
+        self.record_calls = record_calls
+        self.__call_records = []
+        self.__call_records_lock = threading.Lock()
+        self.__before_call = None
+        self.__after_call = None
         
         # Add check to make sure that correct version of SyncroSim is being used
         ssim_required_version = "3.1.0"
@@ -75,6 +116,12 @@ class Session(object):
                                "is required to run pysyncrosim v" +
                                __version__ + ", but you have SyncroSim v" + 
                                ssim_current_version + " installed")
+        
+        # Workers are only launched once the Session is valid, so a failed
+        # check does not leave worker processes behind
+        if workers is not None:
+            self.__worker_pool = worker.ConsoleWorkerPool(worker_command,
+                                                          workers)
      
     @property
     def location(self):
@@ -132,6 +179,87 @@ class Session(object):
             raise AttributeError("print_cmd must be a Logical")
         self.__print_cmd = value
 
+    @property
+    def record_calls(self):
+        """
+        Gets or sets whether console calls are recorded for this Session.
+
+        Returns
+        -------
+        Logical
+            record_calls status.
+
+        """
+        return self.__record_calls
+
+    @record_calls.setter
+    def record_calls(self, value):
+        if value is None:
+            raise AttributeError("The record_calls status cannot be None.")
+        elif not isinstance(value, bool):
+            raise AttributeError("record_calls must be a Logical")
+        self.__record_calls = value
+
+    @property
+    def before_call(self):
+        """
+        Gets or sets a function called before every console call. The
+        function receives a dictionary with the Args of the call, the
+        outermost pysyncrosim method that led to it (Api), the pysyncrosim
+        method that issued it (Caller), and its Start time.
+
+        Returns
+        -------
+        Function
+            Function called before every console call, or None.
+
+        """
+        return self.__before_call
+
+    @before_call.setter
+    def before_call(self, value):
+        if value is not None and not callable(value):
+            raise AttributeError("before_call must be a function or None")
+        self.__before_call = value
+
+    @property
+    def after_call(self):
+        """
+        Gets or sets a function called after every console call. The
+        function receives the same dictionary as `before_call`, with the
+        Duration in seconds, StdoutBytes, StderrBytes, and ReturnCode of the
+        call added.
+
+        Returns
+        -------
+        Function
+            Function called after every console call, or None.
+
+        """
+        return self.__after_call
+
+    @after_call.setter
+    def after_call(self, value):
+        if value is not None and not callable(value):
+            raise AttributeError("after_call must be a function or None")
+        self.__after_call = value
+
+    @property
+    def workers(self):
+        """
+        Retrieves the number of console workers for this Session.
+
+        Returns
+        -------
+        Int
+            Number of console workers, or None if each console call launches
+            its own process.
+
+        """
+        if self.__worker_pool is None:
+            return None
+        return len(self.__worker_pool.workers)
+
     @property
     def conda_filepath(self):
         """
@@ -477,6 +605,60 @@ class Session(object):
         result = self.__call_console(args)
         print(result.stdout.decode('utf-8'))
 
+    def call_stats(self, reset=False):
+        """
+        Retrieves the console calls recorded for this Session. Set 
+        `record_calls=True` to record console calls.
+
+        Parameters
+        ----------
+        reset : Logical, optional
+            If True, clears the recorded console calls after retrieving them.
+            The default is False.
+
+        Returns
+        -------
+        pandas.DataFrame
+            DataFrame with one row per console call, including the outermost
+            pysyncrosim method that led to the call (Api), the pysyncrosim 
+            method that issued it (Caller), the console Args, the Start time,
+            the Duration in seconds, the size of the console output in bytes
+            (StdoutBytes, StderrBytes), and the ReturnCode.
+
+        """
+        if not isinstance(reset, bool):
+            raise TypeError("reset must be a Logical")
+
+        with self.__call_records_lock:
+            records = list(self.__call_records)
+            if reset:
+                self.__call_records = []
+
+        stats = pd.DataFrame(records, columns=[
+            "Api", "Caller", "Args", "Start", "Duration", "StdoutBytes",
+            "StderrBytes", "ReturnCode"])
+        stats["Start"] = pd.to_datetime(stats["Start"], unit="s")
+
+        return stats
+
+    def close(self):
+        """
+        Stops the console workers of this Session, if any.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.__worker_pool is not None:
+            self.__worker_pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _validate_mono(self, skip_if_in_environment=False):
         """Validate Mono is available on Linux systems"""
         # Skip validation if running inside a SyncroSim environment
@@ -590,8 +772,378 @@ class Session(object):
 
         else:
             raise ValueError("No executable assigned")
+
+    def __validate_worker_inputs(self, workers, worker_command):
+        
+        if workers is None:
+            if worker_command is not None:
+                raise ValueError("worker_command requires workers to be set")
+            return
+
+        if isinstance(workers, bool) or not isinstance(workers, int):
+            raise TypeError("workers must be None or an Integer")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if worker_command is None:
+            raise ValueError("workers requires a worker_command that keeps "
+                             "the console loaded")
+        if not isinstance(worker_command, list) or not all(
+                isinstance(c, str) for c in worker_command):
+            raise TypeError("worker_command must be a List of Strings")
+
+    def __run_console(self, final_args):
+        # Runs the console command, using a console worker when available.
+        # Package manager commands always launch their own process.
+        if self.__worker_pool is not None and \
+                final_args[0] == self.__init_console(console=True):
+            return self.__worker_pool.call(final_args[1:])
+
+        if not self.__is_windows:
+            final_args = [self.__mono_path] + final_args
+
+        return subprocess.run(
+            final_args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE)
     
     def __call_console(self, args, csv=False, decode=False):
+        batch = self.__find_batch(args)
+        if batch is not None:
+            return batch._Batch__defer(args, decode)
+
+        final_args = self.__build_console_args(args, csv)
+        call_info = self.__start_call_record(final_args, sys._getframe(1))
+
+        result = None
+        try:
+            result = self.__run_console(final_args)
+        finally:
+            self.__end_call_record(call_info, result)
+            self.__record_library_changes(args)
+
+        return self.__check_console_result(final_args, result, decode)
+
+    @contextlib.contextmanager
+    def __stream_console(self, args, csv=False, read_all=True):
+        # Yields the stdout of a console call as a binary stream, so large
+        # outputs can be parsed while the console writes them. Raises the
+        # console error once the stream has been read. If read_all is 
+        # False, the console is stopped once the caller is done reading.
+        # Console workers return the whole output at once, so streamed 
+        # calls always launch their own console process
+        final_args = self.__build_console_args(args, csv)
+        call_info = self.__start_call_record(final_args, sys._getframe(1))
+
+        process_args = list(final_args)
+        if not self.__is_windows:
+            process_args = [self.__mono_path] + process_args
+
+        result = None
+        stopped = False
+
+        # stderr goes to a file so a full stderr pipe cannot block the
+        # console while stdout is being read
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(process_args, stdout=subprocess.PIPE,
+                                       stderr=stderr)
+            try:
+                yield process.stdout
+                if read_all:
+                    process.stdout.read()
+                elif process.poll() is None:
+                    # The rest of the output is not needed
+                    process.kill()
+                    stopped = True
+            except BaseException as e:
+                # Stop the console if the stream is abandoned, but report
+                # the console error if the console failed by itself
+                killed = process.poll() is None
+                if killed:
+                    process.kill()
+                if killed or process.wait() == 0 or \
+                        isinstance(e, GeneratorExit):
+                    raise
+            finally:
+                process.wait()
+                process.stdout.close()
+                stderr.seek(0)
+                result = subprocess.CompletedProcess(
+                    process_args, process.returncode, b"", stderr.read())
+                self.__end_call_record(call_info, result)
+                self.__record_library_changes(args)
+
+        if not stopped:
+            self.__check_console_result(final_args, result, False)
+
+    def __call_console_cancellable(self, args, cancel=None, timeout=None,
+                                   on_line=None):
+        # Runs a console command in its own process group. The console and
+        # every process it started are stopped if cancel is set or the 
+        # timeout passes. Lines of output are passed to on_line as the 
+        # console writes them.
+        final_args = self.__build_console_args(args, False)
+        call_info = self.__start_call_record(final_args, sys._getframe(1))
+
+        process_args = list(final_args)
+        if not self.__is_windows:
+            process_args = [self.__mono_path] + process_args
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        output = {"error": None}
+        result = None
+        stopped = None
+
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(process_args, stdout=subprocess.PIPE,
+                                       stderr=stderr,
+                                       **self.__process_group_options())
+            reader = threading.Thread(
+                target=self.__read_lines,
+                args=(process.stdout, on_line, output), daemon=True)
+            reader.start()
+            try:
+                while process.poll() is None:
+                    if cancel is not None and cancel.is_set():
+                        stopped = "cancelled"
+                    elif deadline is not None and \
+                            time.monotonic() >= deadline:
+                        stopped = "timeout"
+                    if stopped is not None:
+                        self.__kill_process_tree(process)
+                        break
+                    try:
+                        process.wait(timeout=0.1)
+                    except subprocess.TimeoutExpired:
+                        pass
+            except BaseException:
+                self.__kill_process_tree(process)
+                raise
+            finally:
+                process.wait()
+                reader.join()
+                process.stdout.close()
+                stderr.seek(0)
+                result = subprocess.CompletedProcess(
+                    process_args, process.returncode, b"", stderr.read())
+                self.__end_call_record(call_info, result)
+                self.__record_library_changes(args)
+
+        if stopped == "timeout":
+            raise TimeoutError(
+                f"Console call stopped after {timeout} seconds")
+        if stopped == "cancelled":
+            raise concurrent.futures.CancelledError("Console call cancelled")
+        if output["error"] is not None:
+            raise output["error"]
+
+        return self.__check_console_result(final_args, result, False)
+
+    def __read_lines(self, stdout, on_line, output):
+        # Keeps reading the output even if on_line fails, so the console
+        # never blocks on a full pipe
+        for line in stdout:
+            if on_line is not None and output["error"] is None:
+                try:
+                    on_line(line)
+                except Exception as e:
+                    output["error"] = e
+
+    def __process_group_options(self):
+        # Starts the console as the leader of a new process group
+        if self.__is_windows:
+            return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        return {"start_new_session": True}
+
+    def __kill_process_tree(self, process, grace=5):
+        # Stops the console and every process it started, including 
+        # transformers hosted in conda environments. psutil, if installed,
+        # also finds children that left the process group.
+        children = []
+        if importlib.util.find_spec("psutil") is not None:
+            import psutil
+            try:
+                children = psutil.Process(process.pid).children(
+                    recursive=True)
+            except psutil.Error:
+                children = []
+
+        if self.__is_windows:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+        else:
+            # Give the console a moment to stop by itself first
+            self.__signal_process_group(process, signal.SIGTERM)
+            try:
+                process.wait(timeout=grace)
+            except subprocess.TimeoutExpired:
+                pass
+            self.__signal_process_group(process, signal.SIGKILL)
+
+        for child in children:
+            try:
+                child.kill()
+            except psutil.Error:
+                pass
+
+        process.wait()
+
+    def __signal_process_group(self, process, sig):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def __acall_console(self, args, csv=False, decode=False):
+        # Non-blocking equivalent of __call_console for use with asyncio
+        batch = self.__find_batch(args)
+        if batch is not None:
+            return batch._Batch__defer(args, decode)
+
+        final_args = self.__build_console_args(args, csv)
+        call_info = self.__start_call_record(final_args, sys._getframe(1))
+
+        result = None
+        try:
+            result = await self.__arun_console(final_args)
+        finally:
+            self.__end_call_record(call_info, result)
+            self.__record_library_changes(args)
+
+        return self.__check_console_result(final_args, result, decode)
+
+    async def __arun_console(self, final_args):
+        if self.__worker_pool is not None and \
+                final_args[0] == self.__init_console(console=True):
+            result = await asyncio.to_thread(self.__worker_pool.call,
+                                             final_args[1:])
+        else:
+            process_args = list(final_args)
+            if not self.__is_windows:
+                process_args = [self.__mono_path] + process_args
+
+            process = await asyncio.create_subprocess_exec(
+                *process_args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE)
+
+            try:
+                stdout, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                # Do not leave the console running when the caller gives up
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+
+            result = subprocess.CompletedProcess(
+                process_args, process.returncode, stdout, stderr)
+
+        return result
+
+    def __start_batch(self, batch):
+        # Defers console commands accepted by the batch until it ends
+        self.__batches.append(batch)
+
+    def __end_batch(self, batch):
+        if batch in self.__batches:
+            self.__batches.remove(batch)
+
+    def __find_batch(self, args):
+        for batch in list(self.__batches):
+            if batch._Batch__accepts(args):
+                return batch
+        return None
+
+    def __record_library_changes(self, args):
+        # Counts console commands that may modify a Library, so cached 
+        # Library information is loaded again after them
+        if "--list" in args or "--export" in args:
+            return
+
+        schema = "--package" in args or "--update" in args
+
+        for arg in args:
+            key, _, value = arg.partition("=")
+            if key == "--name" and "--create" in args and \
+                    "--library" in args:
+                key = "--lib"
+            if key in ["--lib", "--tlib"] and value != "":
+                location = os.path.normcase(os.path.abspath(value))
+                with _library_changes_lock:
+                    data_changes, schema_changes = \
+                        _library_changes.get(location, (0, 0))
+                    _library_changes[location] = (
+                        data_changes + 1, schema_changes + int(schema))
+
+    def __count_library_changes(self, location):
+        # Returns the number of data and package changes made to a Library
+        location = os.path.normcase(os.path.abspath(location))
+        with _library_changes_lock:
+            return _library_changes.get(location, (0, 0))
+
+    def __start_call_record(self, final_args, frame):
+        # Collects information about a console call for call_stats and hooks
+        if not self.__record_calls and self.__before_call is None and \
+                self.__after_call is None:
+            return None
+
+        api, caller = self.__find_calling_methods(frame)
+        call_info = {"Api": api,
+                     "Caller": caller,
+                     "Args": list(final_args[1:]),
+                     "Start": time.time()}
+
+        if self.__before_call is not None:
+            self.__before_call(dict(call_info))
+
+        call_info["_timer"] = time.perf_counter()
+
+        return call_info
+
+    def __end_call_record(self, call_info, result):
+        if call_info is None:
+            return
+
+        call_info["Duration"] = time.perf_counter() - call_info.pop("_timer")
+        if result is None:
+            call_info.update({"StdoutBytes": None, "StderrBytes": None,
+                              "ReturnCode": None})
+        else:
+            call_info.update({"StdoutBytes": len(result.stdout or b""),
+                              "StderrBytes": len(result.stderr or b""),
+                              "ReturnCode": result.returncode})
+
+        if self.__record_calls:
+            with self.__call_records_lock:
+                self.__call_records.append(dict(call_info))
+
+        if self.__after_call is not None:
+            self.__after_call(dict(call_info))
+
+    def __find_calling_methods(self, frame):
+        # Walks up the stack to find the pysyncrosim method that issued the
+        # console call and the outermost pysyncrosim method that led to it
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        api = None
+        caller = None
+
+        while frame is not None:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if os.path.dirname(filename) != package_dir:
+                if caller is not None:
+                    break
+            else:
+                code = frame.f_code
+                name = getattr(code, "co_qualname", code.co_name)
+                if caller is None:
+                    caller = name
+                api = name
+            frame = frame.f_back
+
+        return api, caller
+
+    def __build_console_args(self, args, csv):
         final_args = []
 
         final_args.append(self.console_exe)
@@ -603,14 +1155,9 @@ class Session(object):
         if self.__print_cmd:
             print(final_args)
 
-        if not self.__is_windows:
-            final_args = [self.__mono_path] + final_args
-
-        result = subprocess.run(
-            final_args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
+        return final_args
 
+    def __check_console_result(self, final_args, result, decode):
         if result.returncode != 0:
             error_msg = result.stderr.decode('utf-8')
 
@@ -0,0 +1,228 @@
+import sys
+import json
+import queue
+import threading
+import subprocess
+
+class ConsoleWorker(object):
+    """
+    A class to represent a long-lived SyncroSim console worker process.
+
+    """
+    def __init__(self, command):
+        """
+        Initializes a pysyncrosim ConsoleWorker instance. The worker process
+        is started on the first call.
+
+        Parameters
+        ----------
+        command : List
+            Command used to launch the console worker host. The host reads one
+            JSON request per line from stdin. For each request, it writes one
+            JSON line with the return code and output sizes to stdout,
+            followed by the stdout and stderr bytes. See
+            `pysyncrosim._worker_main.serve()`.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__command = list(command)
+        self.__process = None
+        self.__request_id = 0
+        self.__lock = threading.Lock()
+
+    @property
+    def command(self):
+        """
+        Retrieves the command used to launch this worker.
+
+        Returns
+        -------
+        List
+            Worker host command.
+
+        """
+        return self.__command
+
+    @property
+    def pid(self):
+        """
+        Retrieves the process ID of this worker.
+
+        Returns
+        -------
+        Int
+            Process ID, or None if the worker is not running.
+
+        """
+        if self.__process is None or self.__process.poll() is not None:
+            return None
+        return self.__process.pid
+
+    def call(self, args):
+        """
+        Sends console arguments to the worker and waits for the result.
+
+        Parameters
+        ----------
+        args : List
+            Console arguments, excluding the console executable.
+
+        Raises
+        ------
+        RuntimeError
+            Raises error if the worker process exits before responding.
+
+        Returns
+        -------
+        subprocess.CompletedProcess
+            Return code, stdout, and stderr of the console command.
+
+        """
+        with self.__lock:
+            process = self.__start()
+            self.__request_id += 1
+            request = {"id": self.__request_id, "args": list(args)}
+
+            try:
+                process.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                process.stdin.flush()
+                response = self.__read_response(process.stdout)
+            except OSError:
+                response = None
+
+            if response is None:
+                self.__stop()
+                raise RuntimeError("The console worker exited unexpectedly: " +
+                                   " ".join(self.__command))
+
+        return subprocess.CompletedProcess(args=list(args), **response)
+
+    def close(self):
+        """
+        Stops the worker process.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.__lock:
+            self.__stop()
+
+    def __read_response(self, stream):
+        # Reads the response header line and the output bytes that follow
+        # it, or returns None if the worker stopped before writing them all
+        line = stream.readline()
+        if not line:
+            return None
+
+        header = json.loads(line)
+        stdout = stream.read(header["stdout"])
+        stderr = stream.read(header["stderr"])
+        if len(stdout) < header["stdout"] or len(stderr) < header["stderr"]:
+            return None
+
+        return {"returncode": header["returncode"], "stdout": stdout,
+                "stderr": stderr}
+
+    def __start(self):
+        # Starts the worker process if it is not already running
+        if self.__process is None or self.__process.poll() is not None:
+            self.__process = subprocess.Popen(
+                self.__command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE)
+        return self.__process
+
+    def __stop(self):
+        # Closing stdin ends the worker loop; kill it if it does not exit
+        if self.__process is None:
+            return
+        try:
+            self.__process.stdin.close()
+            self.__process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.__process.kill()
+            self.__process.wait()
+        self.__process = None
+
+class ConsoleWorkerPool(object):
+    """
+    A class to represent a pool of SyncroSim console workers.
+
+    """
+    def __init__(self, command, size):
+        """
+        Initializes a pysyncrosim ConsoleWorkerPool instance.
+
+        Parameters
+        ----------
+        command : List
+            Command used to launch each console worker host.
+        size : Int
+            Number of console workers in the pool.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.__workers = [ConsoleWorker(command) for i in range(size)]
+        self.__idle = queue.Queue()
+
+        for worker in self.__workers:
+            self.__idle.put(worker)
+
+    @property
+    def workers(self):
+        """
+        Retrieves the console workers in this pool.
+
+        Returns
+        -------
+        List
+            List of ConsoleWorker instances.
+
+        """
+        return self.__workers
+
+    def call(self, args):
+        """
+        Sends console arguments to the next idle worker and waits for the
+        result.
+
+        Parameters
+        ----------
+        args : List
+            Console arguments, excluding the console executable.
+
+        Returns
+        -------
+        subprocess.CompletedProcess
+            Return code, stdout, and stderr of the console command.
+
+        """
+        worker = self.__idle.get()
+        try:
+            return worker.call(args)
+        finally:
+            self.__idle.put(worker)
+
+    def close(self):
+        """
+        Stops all workers in this pool.
+
+        Returns
+        -------
+        None.
+
+        """
+        for worker in self.__workers:
+            worker.close()
+
+def _standin_worker_command():
+    # Worker host that answers requests with the stand-in console
+    return [sys.executable, "-m", "pysyncrosim._worker_main", "--standin"]
@@ -25,5 +25,6 @@ setup(
     install_requires=["numpy", "pandas", "rasterio"],
     extras_require={
         "dev": ["pytest", "build", "twine"],
+        "arrow": ["pyarrow"],
     },
 )
@@ -1,12 +1,16 @@
 import os
+import sys
+import subprocess
 import pysyncrosim as ps
 import pytest
+import concurrent.futures
 import pandas as pd
 import math
 import numpy as np
 import rasterio
 import tempfile
 import shutil
+from pysyncrosim.monitor import RunMonitor
 
 temp_path = tempfile.TemporaryDirectory()
 session_path = None
@@ -116,7 +120,88 @@ def test_session_restore_function():
         force_update=True)
     myLibrary.delete(force=True)
     os.rmdir(test_output_folder)
-    
+
+def test_session_workers():
+
+    from pysyncrosim import worker
+
+    # Test worker protocol against the stand-in console
+    pool = worker.ConsoleWorkerPool(worker._standin_worker_command(), 2)
+    result = pool.call(["--version"])
+    assert result.returncode == 0
+    assert result.stdout.decode("utf-8").startswith("Version is:")
+    assert pool.call(["--fail"]).returncode == 1
+
+    # Test that the worker process is reused between calls
+    myWorker = pool.workers[0]
+    first_pid = myWorker.call(["--processid"]).stdout
+    assert myWorker.call(["--processid"]).stdout == first_pid
+    pool.close()
+    assert myWorker.pid is None
+
+    # Test Session inputs
+    with pytest.raises(TypeError, match="workers must be None or an Integer"):
+        ps.Session(session_path, workers="2")
+
+    with pytest.raises(ValueError, match="workers must be at least 1"):
+        ps.Session(session_path, workers=0)
+
+    with pytest.raises(ValueError,
+                       match="worker_command requires workers to be set"):
+        ps.Session(session_path,
+                   worker_command=worker._standin_worker_command())
+
+    with pytest.raises(ValueError,
+                       match="workers requires a worker_command"):
+        ps.Session(session_path, workers=2)
+
+    # Test Session with console workers
+    with ps.Session(session_path, workers=2,
+                    worker_command=worker._standin_worker_command()
+                    ) as mySession:
+        assert mySession.workers == 2
+        assert "Version is:" in mySession.version()
+
+def test_session_call_stats():
+
+    # Test Session inputs
+    with pytest.raises(AttributeError, match="record_calls must be a Logical"):
+        ps.Session(session_path, record_calls="True")
+
+    mySession = ps.Session(session_path, record_calls=True)
+
+    with pytest.raises(AttributeError,
+                       match="before_call must be a function or None"):
+        mySession.before_call = "print"
+
+    with pytest.raises(TypeError, match="reset must be a Logical"):
+        mySession.call_stats(reset="True")
+
+    # Test that console calls are recorded with the calling method
+    started = []
+    finished = []
+    mySession.before_call = started.append
+    mySession.after_call = finished.append
+    mySession.call_stats(reset=True)
+    mySession.packages()
+
+    stats = mySession.call_stats()
+    assert isinstance(stats, pd.DataFrame)
+    assert len(stats) == 1
+    assert stats.Api[0] == "Session.packages"
+    assert stats.ReturnCode[0] == 0
+    assert stats.StdoutBytes[0] > 0
+    assert stats.Duration[0] >= 0
+    assert len(started) == 1 and len(finished) == 1
+    assert finished[0]["Args"] == stats.Args[0]
+
+    # Test reset and disabling the recorder
+    assert len(mySession.call_stats(reset=True)) == 1
+    mySession.record_calls = False
+    mySession.packages()
+    assert len(mySession.call_stats()) == 0
+    assert len(finished) == 2
+
 def test_helper():
     
     mySession = ps.Session(session_path)
@@ -318,10 +403,31 @@ def test_library_datasheets():
         myLibrary.datasheets(name="core_Option", filter_column="Test",
                              filter_value=1)
         
+    with pytest.raises(TypeError, match="as_dict must be a Logical"):
+        myLibrary.datasheets(summary=False, as_dict="True")
+        
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        myLibrary.datasheets(summary=False, max_workers=0)
+        
     # Test datasheets method outputs
     assert isinstance(myLibrary.datasheets(), pd.DataFrame)
     assert isinstance(myLibrary.datasheets(name="core_Backup"), pd.DataFrame)
     assert isinstance(myLibrary.datasheets(summary=False), list)
+    ds_dict = myLibrary.datasheets(summary=False, as_dict=True)
+    assert isinstance(ds_dict, dict)
+    assert ds_dict["core_Backup"].equals(
+        myLibrary.datasheets(name="core_Backup"))
+    assert list(ds_dict) == list(myLibrary.datasheets(
+        summary=False, as_dict=True, max_workers=4))
+    
+    # Test concurrent hidden-record queries use separate temporary files
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        hidden = list(executor.map(
+            lambda name: myLibrary.datasheets(name=name, return_hidden=True),
+            ["core_Backup", "core_Option"] * 4))
+    assert all(ds.equals(hidden[i % 2]) for i, ds in enumerate(hidden))
+    assert not hidden[0].equals(hidden[1])
+    assert os.listdir(myLibrary.location + "temp") == []
     assert len(myLibrary.datasheets().columns) == 3
     assert len(myLibrary.datasheets(optional=True).columns) == 6
     assert myLibrary.datasheets(name="core_Backup", empty=True).empty
@@ -329,6 +435,16 @@ def test_library_datasheets():
         myLibrary.datasheets(scope="Project"))
     assert not myLibrary.datasheets().equals(
         myLibrary.datasheets(scope="Scenario"))
+
+    # Test console output parser
+    assert myLibrary.csv_engine == "c"
+    with pytest.raises(ValueError, match="csv_engine must be 'c' or 'pyarrow'"):
+        myLibrary.csv_engine = "python"
+
+    pytest.importorskip("pyarrow")
+    backup = myLibrary.datasheets(name="core_Backup")
+    myLibrary.csv_engine = "pyarrow"
+    assert myLibrary.datasheets(name="core_Backup").equals(backup)
     
 def test_library_delete():
 
@@ -519,6 +635,26 @@ def test_library_save_datasheet():
     myLibrary.save_datasheet(name="core_Backup", data=pd.DataFrame(), force=True)
     assert myLibrary.datasheets(name="core_Backup").empty
     
+    # Test streaming saved Datasheets through a named pipe
+    with pytest.raises(TypeError, match="stream_imports must be a Logical"):
+        myLibrary.stream_imports = "True"
+    
+    if hasattr(os, "mkfifo"):
+        myLibrary.stream_imports = True
+        myLibrary.save_datasheet(name="core_Backup", data=myLibDF)
+        assert myLibrary.datasheets(name="core_Backup").equals(myLibDF)
+        
+        # Errors of the pipe writer are raised once the console is done
+        class Unwritable(object):
+            def __str__(self):
+                raise ValueError("cannot write value")
+        
+        badDF = myLibDF.astype(object)
+        badDF.iloc[0, 0] = Unwritable()
+        with pytest.raises(RuntimeError, match="only hold part of the data"):
+            myLibrary.save_datasheet(name="core_Backup", data=badDF)
+        myLibrary.stream_imports = False
+    
 def test_library_run():
     
     mySession = ps.Session(session_path)
@@ -557,7 +693,94 @@ def test_library_run():
     num_scns += 1
     assert len(myLibrary.scenarios()) == num_scns     
     assert myLibrary.scenarios().iloc[-1]["IsResult"] == "Yes"
-    
+
+    # Test concurrent runs
+    with pytest.raises(TypeError, match="max_workers must be None or an Integer"):
+        myLibrary.run(project=proj_id, max_workers="2")
+
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        myLibrary.run(project=proj_id, max_workers=0)
+
+    with pytest.raises(ValueError, match="Specify either max_workers or executor"):
+        myLibrary.run(project=proj_id, max_workers=2,
+                      executor=concurrent.futures.ThreadPoolExecutor())
+
+    with pytest.raises(ValueError, match="require Scenarios of this Library"):
+        ps.library(name=test_lib_path, session=mySession, overwrite=True,
+                   packages=["stsim"]).run(
+                       scenarios=[myLibrary.scenarios(sid=scn_id)],
+                       max_workers=2)
+
+    parent_ids = all_scns[all_scns["IsResult"] == "No"].ScenarioId.tolist()
+    result_dict = myLibrary.run(project=proj_id, scenarios=parent_ids,
+                                max_workers=2)
+    num_scns += num_parent_scns
+    assert list(result_dict.keys()) == parent_ids
+    assert all(scn.is_result == "Yes" and scn.parent_id == sid
+               for sid, scn in result_dict.items())
+    assert len(myLibrary.scenarios()) == num_scns
+
+    # Test streaming run events
+    with pytest.raises(TypeError, match="on_event must be a function"):
+        myLibrary.run(project=proj_id, scenarios=scn_id, on_event="print")
+
+    events = []
+    myLibrary.run(project=proj_id, scenarios=scn_id, on_event=events.append)
+    num_scns += 1
+    assert len(myLibrary.scenarios()) == num_scns
+    assert all(event["ScenarioId"] == scn_id for event in events)
+
+    monitor = RunMonitor(sid=1, on_event=events.append)
+    for line in [b"ssim-task-start=4\r\n", b"ssim-task-step=1\r\n", b"\r\n",
+                 b"ssim-task-status=Simulating -> Iteration is 2 - " +
+                 b"Timestep is 2001\r\n", b"ssim-task-warning=check"]:
+        monitor.feed(line)
+    assert [e["Type"] for e in events[-4:]] == ["start", "step", "status",
+                                                "warning"]
+    assert events[-1]["Iteration"] == 2 and events[-1]["Timestep"] == 2001
+    assert monitor.steps == 1 and monitor.total_steps == 4
+    assert monitor.eta is None or monitor.eta >= 0
+
+    # Test run timeouts and cancelling runs
+    myScenario = myLibrary.scenarios(sid=scn_id)
+    with pytest.raises(ValueError, match="timeout must be greater than 0"):
+        myScenario.run(timeout=0)
+
+    with pytest.raises(TimeoutError):
+        myScenario.run(timeout=0.01)
+    assert len(myLibrary.scenarios()) == num_scns
+
+    handle = myScenario.run_async()
+    assert isinstance(handle, ps.RunHandle)
+    assert handle.cancel()
+    assert handle.done() and handle.cancelled()
+    with pytest.raises(concurrent.futures.CancelledError):
+        handle.result()
+    assert len(myLibrary.scenarios()) == num_scns
+
+    handle = myScenario.run_async(timeout=3600)
+    assert handle.result().parent_id == scn_id
+    assert not handle.cancel()
+    num_scns += 1
+
+    # Test sharded runs
+    with pytest.raises(TypeError, match="shard must be a Logical"):
+        myLibrary.run(project=proj_id, shard="yes")
+
+    with pytest.raises(ValueError, match="Specify either shard or executor"):
+        myLibrary.run(project=proj_id, shard=True,
+                      executor=concurrent.futures.ThreadPoolExecutor())
+
+    result_dict = myLibrary.run(project=proj_id, scenarios=parent_ids,
+                                max_workers=2, shard=True)
+    num_scns += num_parent_scns
+    assert list(result_dict.keys()) == parent_ids
+    assert all(isinstance(scn, ps.Scenario)
+               for scn in result_dict.values())
+    assert len(myLibrary.scenarios()) == num_scns
+    assert not any(name.startswith("shards-") for name in os.listdir(
+        os.path.dirname(myLibrary.location)))
+
     myLibrary.projects(name="New Project")
     with pytest.raises(
             ValueError,
@@ -566,6 +789,275 @@ def test_library_run():
 
     myLibrary.delete(force=True)
 
+def test_library_async():
+
+    import asyncio
+
+    mySession = ps.Session(session_path)
+    myLibrary = ps.library(name=test_lib_path, overwrite=True,
+                           packages=["stsim"], session=mySession)
+    myLibrary.scenarios(name="test")
+
+    async def gather_library_info():
+        return await asyncio.gather(
+            myLibrary.adatasheets(),
+            myLibrary.adatasheets(name="core_Backup"),
+            myLibrary.ascenarios(),
+            myLibrary.ascenarios(name="test"))
+
+    datasheets, backup, scenarios, scenario = asyncio.run(
+        gather_library_info())
+    assert datasheets.equals(myLibrary.datasheets())
+    assert backup.equals(myLibrary.datasheets(name="core_Backup"))
+    assert scenarios.equals(myLibrary.scenarios())
+    assert isinstance(scenario, ps.Scenario)
+
+    backup["IncludeData"] = "No"
+    asyncio.run(myLibrary.asave_datasheet("core_Backup", backup))
+    assert (myLibrary.datasheets(name="core_Backup")["IncludeData"] == "No").item()
+
+def test_library_batch():
+
+    mySession = ps.Session(session_path)
+    myLibrary = ps.library(name=test_lib_path, overwrite=True,
+                           packages=["stsim"], session=mySession)
+    myScenario1 = myLibrary.scenarios(name="test1")
+    myScenario2 = myLibrary.scenarios(name="test2")
+
+    with myLibrary.batch() as myBatch:
+        for scn in [myScenario1, myScenario2]:
+            scn.owner = "Batch Owner"
+            scn.description = "Batch description"
+        assert len(myBatch.commands) == 4
+
+    # Property changes on the same Scenario are combined into one call
+    assert len(myBatch.results) == 4
+    assert myBatch.results["Call"].nunique() == 2
+    assert (myBatch.results["ReturnCode"] == 0).all()
+    assert (myLibrary.scenarios(optional=True)["Owner"] == "Batch Owner").all()
+
+    # Test that console calls of other threads are not deferred
+    with myLibrary.batch() as myBatch:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(setattr, myScenario1, "owner",
+                            "Thread Owner").result()
+        assert len(myBatch.commands) == 0
+    assert "Thread Owner" in myLibrary.scenarios(
+        optional=True)["Owner"].values
+
+    # Test that queued commands are discarded when the block fails
+    with pytest.raises(ValueError, match="stop"):
+        with myLibrary.batch() as myBatch:
+            myScenario1.owner = "Discarded Owner"
+            raise ValueError("stop")
+    assert "Discarded Owner" not in myLibrary.scenarios(
+        optional=True)["Owner"].values
+
+    # Test that Library information is available after a batch
+    pid = myLibrary.projects().iloc[0].ProjectId
+    assert myLibrary.projects(pid=pid).pid == pid
+    myLibrary.delete(scenario=myScenario2.sid, force=True)
+    assert myScenario2.sid not in myLibrary.scenarios().ScenarioId.values
+
+    # Test aggregated errors
+    with pytest.raises(RuntimeError, match="1 of 1 batched console calls failed"):
+        with myLibrary.batch() as myBatch:
+            myBatch.add(["--setprop", "--lib=%s" % myLibrary.location,
+                         "--readonly=yes", "--sid=999"])
+    assert myBatch.results["ReturnCode"].item() == 1
+
+def test_scheduler():
+
+    mySession = ps.Session(session_path)
+    mySession.restore(lib_backup_path)
+    myLibrary = ps.library(name=lib_path,
+                           session=mySession,
+                           force_update=True)
+    all_scns = myLibrary.scenarios()
+    parent_ids = all_scns[all_scns["IsResult"] == "No"].ScenarioId.tolist()
+    myProject = myLibrary.projects(pid=myLibrary.projects().iloc[0].ProjectId)
+    queue_path = os.path.join(temp_path.name, "queue.db")
+
+    with pytest.raises(ValueError, match="max_workers must be at least 1"):
+        ps.Scheduler(queue_path, session=mySession, max_workers=0)
+
+    myScheduler = ps.Scheduler(queue_path, session=mySession, max_workers=2,
+                               resources={"cpus": 1}, poll_interval=0.1)
+
+    with pytest.raises(TypeError,
+                       match="scenarios must be Scenario or Project"):
+        myScheduler.submit(parent_ids)
+
+    # Jobs are run highest priority first, one per Library by default
+    job_ids = myScheduler.submit(myProject, resources={"cpus": 1})
+    top_id = myScheduler.submit(myLibrary.scenarios(sid=parent_ids[-1]),
+                                priority=10)[0]
+    cancelled_id = myScheduler.submit(
+        myLibrary.scenarios(sid=parent_ids[0]))[0]
+    assert len(job_ids) == len(parent_ids)
+    assert myScheduler.cancel(cancelled_id)
+    assert not myScheduler.cancel(cancelled_id)
+
+    jobs = myScheduler.run()
+    assert jobs.set_index("JobId").Status.to_dict() == {
+        **{job_id: "done" for job_id in job_ids + [top_id]},
+        cancelled_id: "cancelled"}
+    done = jobs[jobs.Status == "done"]
+    assert done.sort_values("Started").JobId.iloc[0] == top_id
+    assert (done.Attempts == 1).all()
+    assert all(myLibrary.scenarios(sid=sid).parent_id == parent_id
+               for sid, parent_id in zip(done.ResultId, done.ScenarioId))
+
+    # Test jobs asking for more resources than the Scheduler has
+    with pytest.raises(ValueError, match="requires 2 cpus"):
+        myScheduler.submit(myLibrary.scenarios(sid=parent_ids[0]),
+                           resources={"cpus": 2})
+
+    job_id = ps.Scheduler(queue_path, session=mySession).submit(
+        myLibrary.scenarios(sid=parent_ids[0]), resources={"cpus": 2})[0]
+    jobs = myScheduler.run().set_index("JobId")
+    assert jobs.Status[job_id] == "failed"
+    assert "requires 2 cpus" in jobs.Error[job_id]
+
+    # Test that a timed out run without retries fails
+    job_id = myScheduler.submit(myLibrary.scenarios(sid=parent_ids[0]),
+                                timeout=0.01, max_retries=0)[0]
+    jobs = ps.Scheduler(queue_path, session=mySession).run()
+    assert jobs.set_index("JobId").Status[job_id] == "failed"
+    assert "stopped after" in jobs.set_index("JobId").Error[job_id]
+    assert len(myLibrary.scenarios()) == len(all_scns) + len(done)
+
+    # Test worker processes running on private copies of the Library
+    work_dir = os.path.join(temp_path.name, "farm")
+    with pytest.raises(TypeError, match="work_dir must be a String or None"):
+        ps.Scheduler(queue_path, session=mySession, work_dir=1)
+
+    num_scns = len(myLibrary.scenarios())
+    job_ids = myScheduler.submit(myProject)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as pool:
+        workers = [pool.submit(run_farm_worker, queue_path,
+                               os.path.join(work_dir, str(i)))
+                   for i in range(2)]
+        jobs = myScheduler.wait(job_ids, timeout=3600)
+        assert all(len(worker.result()) > 0 for worker in workers)
+    myLibrary.refresh()
+    assert (jobs.Status == "done").all()
+    assert len(myLibrary.scenarios()) == num_scns + len(job_ids)
+    assert set(jobs.ResultId).issubset(myLibrary.scenarios().ScenarioId)
+    assert all(os.listdir(os.path.join(work_dir, str(i))) == []
+               for i in range(2))
+
+    myLibrary.delete(force=True)
+
+def run_farm_worker(queue_path, work_dir):
+
+    mySession = ps.Session(session_path)
+    return ps.Scheduler(queue_path, session=mySession, work_dir=work_dir,
+                        poll_interval=0.1).run()
+
+def test_library_sqlite():
+
+    mySession = ps.Session(session_path)
+    myLibrary = ps.library(name=test_lib_path, overwrite=True,
+                           packages=["stsim"], session=mySession)
+    myProject = myLibrary.projects(name="Definitions")
+    myScenario = myLibrary.scenarios(name="test")
+    myProject.save_datasheet(name="stsim_Stratum", data=pd.DataFrame({
+        "Name": ["a1", "a2"], "Id": [1, 2]}))
+
+    with pytest.raises(TypeError, match="use_sqlite must be a Logical"):
+        ps.library(name=test_lib_path, session=mySession, use_sqlite="True")
+
+    sqlLibrary = ps.library(name=test_lib_path, session=mySession,
+                            use_sqlite=True)
+    assert sqlLibrary.use_sqlite is True
+
+    # Test that the Library file gives the same results as the console
+    myProject.folders(folder="New Folder", create=True)
+    pd.testing.assert_frame_equal(sqlLibrary.projects(),
+                                  myLibrary.projects())
+    pd.testing.assert_frame_equal(sqlLibrary.scenarios(),
+                                  myLibrary.scenarios())
+    pd.testing.assert_frame_equal(sqlLibrary.scenarios(optional=True),
+                                  myLibrary.scenarios(optional=True))
+    pd.testing.assert_frame_equal(sqlLibrary.folders(), myLibrary.folders())
+    assert sqlLibrary.datasheets(name="core_Backup").equals(
+        myLibrary.datasheets(name="core_Backup"))
+    assert sqlLibrary.projects(name="Definitions").datasheets(
+        name="stsim_Stratum").equals(myProject.datasheets(
+            name="stsim_Stratum"))
+    assert sqlLibrary.scenarios(name="test").datasheets(
+        name="stsim_RunControl", empty=True).columns.equals(
+            myScenario.datasheets(name="stsim_RunControl",
+                                  empty=True).columns)
+
+def test_library_cache():
+
+    mySession = ps.Session(session_path, record_calls=True)
+    myLibrary = ps.library(name=test_lib_path, overwrite=True,
+                           packages=["stsim"], session=mySession)
+    myLibrary.scenarios(name="test")
+
+    with pytest.raises(TypeError, match="check_modified must be a Logical"):
+        myLibrary.check_modified = "True"
+
+    # Test that repeated listings are answered from the cache
+    mySession.call_stats(reset=True)
+    for i in range(5):
+        myLibrary.projects()
+        myLibrary.scenarios()
+        myLibrary.datasheets()
+    assert len(mySession.call_stats()) <= 3
+
+    # Test that names in filter_value are resolved to IDs from the cache
+    myProject = myLibrary.scenarios(name="test").project
+    myProject.save_datasheet("stsim_Stratum",
+                             pd.DataFrame({"Name": ["a1", "a2"]}))
+    myProject.datasheets(name="stsim_Stratum", filter_column="Name",
+                         filter_value="a1")
+    mySession.call_stats(reset=True)
+    for i in range(3):
+        for name in ["a1", "a2"]:
+            assert myProject.datasheets(
+                name="stsim_Stratum", filter_column="Name",
+                filter_value=name).Name.tolist() == [name]
+    assert len(mySession.call_stats()) <= 6
+
+    myProject.save_datasheet("stsim_Stratum",
+                             pd.DataFrame({"Name": ["a1", "a2", "a3"]}))
+    assert myProject.datasheets(name="stsim_Stratum", filter_column="Name",
+                                filter_value="a3").Name.tolist() == ["a3"]
+
+    # Test that modifying the Library invalidates the cache
+    myLibrary.scenarios(name="test2")
+    assert "test2" in myLibrary.scenarios().Name.values
+
+    # Test that changes from another Session are found without checking
+    # the Library file
+    assert myLibrary.check_modified
+    myLibrary.check_modified = False
+    otherLibrary = ps.library(name=test_lib_path,
+                              session=ps.Session(session_path))
+    otherLibrary.scenarios(name="test3")
+    assert "test3" in myLibrary.scenarios().Name.values
+
+    # Test that changes from another process are found with check_modified
+    subprocess.run([sys.executable, "-c",
+                    "import pysyncrosim as ps; ps.library(name=%r, "
+                    "session=ps.Session(%r)).scenarios(name='test4')" % (
+                        test_lib_path, session_path)], check=True)
+    assert "test4" not in myLibrary.scenarios().Name.values
+    myLibrary.check_modified = True
+    assert "test4" in myLibrary.scenarios().Name.values
+
+    subprocess.run([sys.executable, "-c",
+                    "import pysyncrosim as ps; ps.library(name=%r, "
+                    "session=ps.Session(%r)).scenarios(name='test5')" % (
+                        test_lib_path, session_path)], check=True)
+    myLibrary.check_modified = False
+    myLibrary.refresh()
+    assert "test5" in myLibrary.scenarios().Name.values
+
 def test_library_compact():
     
     mySession = ps.Session(session_path)
@@ -803,6 +1295,15 @@ def test_scenarios_attributes():
     assert isinstance(myScenario.is_result, str)
     assert myScenario.is_result == "No"
     assert math.isnan(myScenario.parent_id)
+
+    # Test that Scenario handles are created without console calls
+    for i in range(5):
+        myLibrary.scenarios(f"Test Scenario {i}")
+    mySession.record_calls = True
+    scn_list = myLibrary.scenarios(summary=False)
+    assert len(scn_list) == 6
+    assert len(mySession.call_stats()) <= 2
+    assert scn_list[-1].owner == myScenario.owner
     
 def test_scenario_datasheets():
     
@@ -851,6 +1352,97 @@ def test_scenario_datasheets():
     assert myScenario.datasheets(name="stsim_RunControl").empty is False
     assert myScenario.datasheets(name="stsim_RunControl", empty=True).empty
 
+    # Test chunked reads
+    with pytest.raises(TypeError, match="chunksize must be None or an Integer"):
+        myScenario.datasheets(name="stsim_RunControl", chunksize="1")
+
+    with pytest.raises(ValueError, match="chunksize requires a Datasheet name"):
+        myScenario.datasheets(chunksize=1)
+
+    stratum = pd.DataFrame({"Name": ["a1", "a2", "a3"]})
+    myScenario.project.save_datasheet("stsim_Stratum", stratum)
+    chunks = list(myScenario.project.datasheets(name="stsim_Stratum",
+                                                chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert pd.concat(chunks, ignore_index=True).equals(
+        myScenario.project.datasheets(name="stsim_Stratum"))
+
+    # Test reading a slice of a Datasheet
+    with pytest.raises(ValueError, match="limit must be at least 0"):
+        myScenario.project.datasheets(name="stsim_Stratum", limit=-1)
+        
+    with pytest.raises(ValueError, match="cannot be combined with chunksize"):
+        myScenario.project.datasheets(name="stsim_Stratum", limit=1,
+                                      chunksize=1)
+    
+    full = myScenario.project.datasheets(name="stsim_Stratum")
+    part = myScenario.project.datasheets(name="stsim_Stratum",
+                                         columns=["Name"], limit=1, offset=1)
+    assert part.equals(full[["Name"]].iloc[1:2].reset_index(drop=True))
+    assert myScenario.project.datasheets(name="stsim_Stratum",
+                                         offset=2)["Name"].tolist() == ["a3"]
+
+    # Test filtering a Datasheet by several columns
+    with pytest.raises(TypeError, match="where must be a Dictionary"):
+        myScenario.project.datasheets(name="stsim_Stratum", where=["Name"])
+
+    with pytest.raises(TypeError, match="where values must be Strings"):
+        myScenario.project.datasheets(name="stsim_Stratum",
+                                      where={"Name": None})
+
+    matched = myScenario.project.datasheets(
+        name="stsim_Stratum", where={"Name": ["a1", "a3"]})
+    assert matched.equals(
+        full[full.Name.isin(["a1", "a3"])].reset_index(drop=True))
+    assert myScenario.project.datasheets(
+        name="stsim_Stratum", where={"Name": "a2"}, limit=1)[
+            "Name"].tolist() == ["a2"]
+
+    # Lookup columns can be filtered by ID on the console path
+    stratum_ids = myScenario.project.datasheets(
+        name="stsim_Stratum", include_key=True).set_index("Name")[
+            "StratumId"]
+    myScenario.project.save_datasheet(
+        "stsim_StateAttributeType", pd.DataFrame({"Name": ["attr"]}))
+    myScenario.save_datasheet("stsim_StateAttributeValue", pd.DataFrame(
+        {"StratumId": ["a1", "a2", "a3"],
+         "StateAttributeTypeId": ["attr"] * 3, "Value": [1.0, 2.0, 3.0]}))
+    matched = myScenario.datasheets(
+        name="stsim_StateAttributeValue",
+        where={"StratumId": [int(stratum_ids["a1"]),
+                             int(stratum_ids["a3"])],
+               "StateAttributeTypeId": "attr"})
+    assert matched["StratumId"].tolist() == ["a1", "a3"]
+
+    # Lookup IDs in where are matched when filter_column is also given
+    matched = myScenario.datasheets(
+        name="stsim_StateAttributeValue",
+        filter_column="StateAttributeTypeId", filter_value="attr",
+        where={"StratumId": [int(stratum_ids["a2"])]})
+    assert matched["StratumId"].tolist() == ["a2"]
+
+    # Project Datasheets are only rewritten with force
+    with pytest.raises(ValueError, match="force must be True"):
+        myScenario.project.save_datasheet(
+            "stsim_Stratum", pd.DataFrame({"Name": ["a1"]}), append=False,
+            key_columns=["Name"])
+    assert myScenario.project.datasheets(name="stsim_Stratum").equals(full)
+
+    # Test reading a Datasheet for several Scenarios at once
+    with pytest.raises(TypeError, match="sids must be a List of Integers"):
+        myLibrary.datasheets(name="stsim_RunControl", sids=myScenario.sid)
+
+    with pytest.raises(ValueError, match="sids requires a Datasheet name"):
+        myLibrary.datasheets(sids=[myScenario.sid])
+
+    myScenario2 = myScenario.copy("test2")
+    sids = [myScenario.sid, myScenario2.sid]
+    runcontrols = myScenario.project.datasheets(name="stsim_RunControl",
+                                                sids=sids)
+    assert runcontrols["ScenarioId"].tolist() == sids
+    assert runcontrols.drop(columns="ScenarioId").iloc[[0]].reset_index(
+        drop=True).equals(myScenario.datasheets(name="stsim_RunControl"))
+
 def test_scenario_save_datasheet():
 
     mySession = ps.Session(session_path)
@@ -892,6 +1484,53 @@ def test_scenario_save_datasheet():
     myScenario.save_datasheet(name="helloworld_InputDatasheet", data=pd.DataFrame())
     assert myScenario.datasheets(name="helloworld_InputDatasheet").empty
     
+    # Test saving only changed rows
+    with pytest.raises(ValueError, match="key_columns must be columns of data"):
+        myScenario.save_datasheet(name="helloworld_InputDatasheet",
+                                  data=myDataFrame, key_columns=["y"])
+    
+    # Keys of an empty Datasheet are read without a type
+    myScenario.save_datasheet(name="helloworld_InputDatasheet",
+                              data=pd.DataFrame())
+    changes = myScenario.save_datasheet(name="helloworld_InputDatasheet",
+                                        data=myDataFrame, key_columns=["a"])
+    assert changes == {"inserted": 1, "updated": 0, "deleted": 0}
+    
+    changes = myScenario.save_datasheet(name="helloworld_InputDatasheet",
+                                        data=myDataFrame, key_columns=["a"])
+    assert changes == {"inserted": 0, "updated": 0, "deleted": 0}
+    
+    changes = myScenario.save_datasheet(
+        name="helloworld_InputDatasheet",
+        data=pd.DataFrame({'x': [1.5, 3.5], 'a': [2, 3]}), key_columns=["a"])
+    assert changes == {"inserted": 1, "updated": 0, "deleted": 0}
+    
+    changes = myScenario.save_datasheet(name="helloworld_InputDatasheet",
+                                        data=myDataFrame2, key_columns=["a"])
+    assert changes == {"inserted": 0, "updated": 1, "deleted": 1}
+    assert myScenario.datasheets(name="helloworld_InputDatasheet").equals(myDataFrame2)
+    
+    # Test saving several Datasheets at once
+    with pytest.raises(TypeError, match="data must be a Dictionary"):
+        myScenario.save_datasheets(myDataFrame)
+    
+    myScenario.save_datasheets({"helloworld_InputDatasheet": myDataFrame})
+    assert myScenario.datasheets(name="helloworld_InputDatasheet").equals(myDataFrame)
+    
+    # A failed save restores the Datasheets already saved
+    pipeline = myScenario.datasheets(name="core_Pipeline")
+    with pytest.raises(RuntimeError):
+        myScenario.save_datasheets({
+            "helloworld_InputDatasheet": myDataFrame2,
+            "core_Pipeline": pd.DataFrame({"StageNameId": ["Missing Stage"],
+                                           "RunOrder": [1]})})
+    assert myScenario.datasheets(name="helloworld_InputDatasheet").equals(myDataFrame)
+    assert myScenario.datasheets(name="core_Pipeline").equals(pipeline)
+    
+    # Project and Library Datasheets are only overwritten with force
+    with pytest.raises(ValueError, match="force must be True"):
+        myLibrary.save_datasheets({"core_Option": pd.DataFrame()})
+    
 def test_scenario_run_and_results():
     
     mySession = ps.Session(session_path)
@@ -930,7 +1569,26 @@ def test_scenario_run_and_results():
     myResultsScenario = myScenario.results(sid=res_sid)
     assert isinstance(myResultsScenario.run_log(), pd.DataFrame)
     assert not isinstance(myScenario.run_log(), pd.DataFrame)
-    
+
+    # Test aggregate
+    with pytest.raises(TypeError, match="by must be a non-empty List"):
+        myResultsScenario.aggregate("stsim_OutputStratum", by="Timestep",
+                                    metrics={"Amount": "mean"})
+
+    with pytest.raises(ValueError, match="metric mode not supported"):
+        myResultsScenario.aggregate("stsim_OutputStratum", by=["Timestep"],
+                                    metrics={"Amount": "mode"})
+
+    output = myResultsScenario.datasheets(name="stsim_OutputStratum")
+    summary = myResultsScenario.aggregate(
+        "stsim_OutputStratum", by=["Timestep", "StratumId"],
+        metrics={"Amount": ["mean", "max", 0.5]})
+    expected = output.groupby(["Timestep", "StratumId"], as_index=False
+                              ).Amount.agg(["mean", "max", "median"])
+    assert np.allclose(summary.Amount_mean, expected["mean"])
+    assert np.allclose(summary.Amount_max, expected["max"])
+    assert np.allclose(summary.Amount_q50, expected["median"])
+
     # Test datasheet_rasters
     with pytest.raises(TypeError, match="datasheet must be a String"):
         myResultsScenario.datasheet_rasters(datasheet=1, column="test")